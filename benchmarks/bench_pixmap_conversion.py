@@ -0,0 +1,113 @@
+"""
+Benchmark de la conversion pixmap PyMuPDF -> image PIL
+
+Compare, pour des pages rendues à 300 DPI :
+- l'ancien chemin du viewer : pix.tobytes("ppm") + Image.open ;
+- l'ancien chemin de la prévisualisation : pix.tobytes() (PNG) + Image.open ;
+- utils.pdf_render.pixmap_to_image (Image.frombuffer sur pix.samples).
+
+Sans --pdf, un document de pages « scannées » (bruit en niveaux de gris
+converti en RGB, format A4) est généré dans un répertoire temporaire.
+
+Usage :
+    python benchmarks/bench_pixmap_conversion.py [--pdf FICHIER] [--pages 3] [--dpi 300] [--repeat 5]
+"""
+import argparse
+import io
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from utils.pdf_render import pixmap_to_image
+
+
+def make_scanned_pdf(path: str, pages: int):
+    """Créer un PDF dont chaque page est une image A4 bruitée à 300 DPI"""
+    document = fitz.open()
+    for index in range(pages):
+        scan = Image.effect_noise((2480, 3508), 40 + index).convert("RGB")
+        buffer = io.BytesIO()
+        scan.save(buffer, "JPEG", quality=80)
+        page = document.new_page(width=595, height=842)
+        page.insert_image(page.rect, stream=buffer.getvalue())
+    document.save(path)
+    document.close()
+
+
+def via_ppm(pix) -> Image.Image:
+    img = Image.open(io.BytesIO(pix.tobytes("ppm")))
+    img.load()
+    return img
+
+
+def via_png(pix) -> Image.Image:
+    img = Image.open(io.BytesIO(pix.tobytes()))
+    img.load()
+    return img
+
+
+METHODS = [
+    ("tobytes('ppm') + Image.open", via_ppm),
+    ("tobytes() PNG + Image.open", via_png),
+    ("pixmap_to_image (frombuffer)", pixmap_to_image),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparer les conversions pixmap -> PIL")
+    parser.add_argument("--pdf", default=None, help="PDF à utiliser (par défaut, scan synthétique)")
+    parser.add_argument("--pages", type=int, default=3, help="Nombre de pages mesurées")
+    parser.add_argument("--dpi", type=int, default=300, help="Résolution du rendu")
+    parser.add_argument("--repeat", type=int, default=5, help="Répétitions par page et par méthode")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_pixmap_")
+    try:
+        pdf_path = args.pdf
+        if pdf_path is None:
+            pdf_path = os.path.join(work_dir, "scan.pdf")
+            make_scanned_pdf(pdf_path, args.pages)
+
+        document = fitz.open(pdf_path)
+        zoom = args.dpi / 72
+        pixmaps = []
+        render_times = []
+        for page_num in range(min(args.pages, len(document))):
+            start = time.perf_counter()
+            pixmaps.append(document[page_num].get_pixmap(matrix=fitz.Matrix(zoom, zoom)))
+            render_times.append((time.perf_counter() - start) * 1000)
+
+        width, height = pixmaps[0].width, pixmaps[0].height
+        print(f"📄 {len(pixmaps)} page(s) à {args.dpi} DPI ({width}x{height}, "
+              f"{pixmaps[0].stride * height / (1024 * 1024):.1f} Mo par page)")
+        print(f"   rendu get_pixmap: {statistics.median(render_times):.1f} ms / page (médiane)")
+        print()
+
+        reference = pixmap_to_image(pixmaps[0]).tobytes()
+        print(f"{'Méthode':<32}{'médiane (ms)':>14}{'min (ms)':>12}")
+        for name, convert in METHODS:
+            timings = []
+            for pix in pixmaps:
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    convert(pix)
+                    timings.append((time.perf_counter() - start) * 1000)
+            # Toutes les méthodes doivent produire les mêmes pixels
+            assert convert(pixmaps[0]).convert("RGB").tobytes() == reference, name
+            print(f"{name:<32}{statistics.median(timings):>14.1f}{min(timings):>12.1f}")
+
+        document.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark des profils de connexion SQLite (database.PRAGMA_PROFILES)
+
+Mesure pour chaque profil, sur une base temporaire :
+- le démarrage (ouverture, migrations, création des tables) ;
+- un import en masse et des écritures unitaires (une transaction par fichier) ;
+- des recherches paginées ;
+- la latence d'un lecteur pendant qu'un autre thread écrit (blocages).
+
+Usage :
+    python benchmarks/bench_sqlite_profiles.py [--rows 20000] [--dir CHEMIN]
+
+--dir permet de lancer le benchmark sur le lecteur réseau réel.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database, PRAGMA_PROFILES
+
+
+def timed(func) -> float:
+    """Durée d'exécution en millisecondes"""
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def run_profile(profile: str, base_dir: str, rows: int, single_writes: int) -> dict:
+    """Exécuter tous les scénarios pour un profil"""
+    work_dir = tempfile.mkdtemp(prefix=f"bench_{profile}_", dir=base_dir)
+    db_path = os.path.join(work_dir, "bench.db")
+    results = {}
+    cwd = os.getcwd()
+    os.chdir(work_dir)  # encryption.key est créé dans le répertoire courant
+    try:
+        holder = {}
+        results['startup_ms'] = timed(lambda: holder.update(db=Database(db_path, profile=profile)))
+        db = holder['db']
+        folder_id = db.create_folder("Bench", panel="autre")
+
+        bulk = [(folder_id, f"doc_{i}.pdf", f"uploads/doc_{i}.pdf", 1024 + i, f"{i:064x}")
+                for i in range(rows)]
+        results['bulk_insert_ms'] = timed(lambda: db.add_files_bulk(bulk))
+
+        def single():
+            for i in range(single_writes):
+                db.add_file(folder_id, f"single_{i}.pdf", f"uploads/single_{i}.pdf", 10, f"s{i:063x}")
+        results['single_write_ms'] = timed(single) / single_writes
+
+        def searches():
+            for i in range(50):
+                db.search_files_page(filename=f"doc_{i}", limit=100)
+        results['search_ms'] = timed(searches) / 50
+
+        # Lecteur pendant des écritures concurrentes
+        stop = threading.Event()
+        latencies = []
+
+        def reader():
+            conn = db.new_connection()
+            try:
+                while not stop.is_set():
+                    start = time.perf_counter()
+                    conn.execute("SELECT COUNT(*) FROM files WHERE folder_id = ?", (folder_id,)).fetchone()
+                    latencies.append((time.perf_counter() - start) * 1000)
+            finally:
+                conn.close()
+
+        def writer():
+            conn = db.new_connection()
+            try:
+                for i in range(single_writes):
+                    conn.execute(
+                        "INSERT INTO files (folder_id, filename, filepath, file_size, file_hash) VALUES (?, ?, ?, ?, ?)",
+                        (folder_id, f"w_{i}.pdf", f"uploads/w_{i}.pdf", 10, f"w{i:063x}")
+                    )
+                    conn.commit()
+            finally:
+                conn.close()
+
+        reader_thread = threading.Thread(target=reader)
+        writer_thread = threading.Thread(target=writer)
+        reader_thread.start()
+        writer_thread.start()
+        writer_thread.join()
+        stop.set()
+        reader_thread.join()
+
+        latencies.sort()
+        results['reader_p50_ms'] = latencies[len(latencies) // 2] if latencies else 0
+        results['reader_max_ms'] = latencies[-1] if latencies else 0
+        results['journal'] = db.conn.execute("PRAGMA journal_mode").fetchone()[0]
+        db.close()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparer les profils SQLite du portail")
+    parser.add_argument("--rows", type=int, default=20000, help="Nombre de fichiers importés en masse")
+    parser.add_argument("--writes", type=int, default=200, help="Nombre d'écritures unitaires")
+    parser.add_argument("--dir", default=None, help="Répertoire de travail (ex. lecteur réseau)")
+    parser.add_argument("--profiles", nargs="+", default=list(PRAGMA_PROFILES), help="Profils à comparer")
+    args = parser.parse_args()
+
+    columns = [
+        ('journal', "journal", "{}"),
+        ('startup_ms', "démarrage ms", "{:.1f}"),
+        ('bulk_insert_ms', "import ms", "{:.1f}"),
+        ('single_write_ms', "écriture ms", "{:.2f}"),
+        ('search_ms', "recherche ms", "{:.2f}"),
+        ('reader_p50_ms', "lecteur p50", "{:.2f}"),
+        ('reader_max_ms', "lecteur max", "{:.1f}"),
+    ]
+
+    all_results = {}
+    for profile in args.profiles:
+        print(f"⏱️ Profil {profile}...")
+        all_results[profile] = run_profile(profile, args.dir, args.rows, args.writes)
+
+    print()
+    print(f"{'profil':<12}" + "".join(f"{title:>15}" for _, title, _ in columns))
+    for profile, results in all_results.items():
+        print(f"{profile:<12}" + "".join(f"{fmt.format(results[key]):>15}" for key, _, fmt in columns))
+
+
+if __name__ == "__main__":
+    main()
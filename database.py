@@ -1,8 +1,10 @@
 import sqlite3
 import os
-import hashlib
+import re
+import threading
+import functools
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import bcrypt
 try:
     from cryptography.fernet import Fernet
@@ -10,9 +12,87 @@ try:
 except ImportError:
     print("⚠️ cryptography non installé - chiffrement désactivé")
     CRYPTO_AVAILABLE = False
+from utils.text_extractor import TextExtractor
+from utils.metadata_backfill import PENDING_CONDITION
+from utils.hashing import HashingService
+from utils.blob_store import BlobStore
+from schema import SchemaInfo
+
+# Profils de connexion SQLite : PRAGMA appliqués à chaque connexion ouverte
+PRAGMA_PROFILES = {
+    # Base locale : WAL (les lectures ne sont plus bloquées par les écritures)
+    'performance': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -65536,        # 64 Mo (valeur négative = Kio)
+        'mmap_size': 268435456,      # 256 Mo
+        'temp_store': 'MEMORY',
+        'foreign_keys': 'ON',
+        'busy_timeout': 5000,
+    },
+    # Base sur un partage réseau : WAL exige une mémoire partagée sur une seule
+    # machine et peut corrompre la base via SMB/NFS ; on garde le journal
+    # classique et on attend les verrous au lieu d'échouer
+    'network': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'cache_size': -65536,
+        'mmap_size': 0,
+        'temp_store': 'MEMORY',
+        'foreign_keys': 'ON',
+        'busy_timeout': 15000,
+    },
+    # Comportement historique, sans réglage (référence pour les benchmarks)
+    'default': {},
+}
+
+
+def is_network_path(path: str) -> bool:
+    """Détecter (au mieux) si un fichier se trouve sur un lecteur réseau"""
+    path = os.path.abspath(path)
+    if path.startswith('\\\\') or path.startswith('//'):
+        return True
+    
+    if os.name == 'nt':
+        try:
+            import ctypes
+            drive = os.path.splitdrive(path)[0] + '\\'
+            return ctypes.windll.kernel32.GetDriveTypeW(drive) == 4  # DRIVE_REMOTE
+        except Exception:
+            return False
+    
+    # Linux : type du système de fichiers du point de montage le plus long
+    try:
+        best, fstype = "", ""
+        with open('/proc/mounts', 'r') as mounts:
+            for line in mounts:
+                parts = line.split()
+                mount_point = parts[1] if len(parts) >= 3 else ""
+                if mount_point and (path == mount_point or path.startswith(mount_point.rstrip('/') + '/')) \
+                        and len(mount_point) > len(best):
+                    best, fstype = parts[1], parts[2]
+        return fstype in ('nfs', 'nfs4', 'cifs', 'smbfs', 'smb3', 'fuse.sshfs', '9p')
+    except OSError:
+        return False
+
+
+def serialized_write(method):
+    """Exécuter une méthode d'écriture sous le verrou d'écriture de la base"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.write_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 
 class Database:
-    """Gestion de la base de données SQLite avec sécurité renforcée et système de panels"""
+    """
+    Gestion de la base de données SQLite avec sécurité renforcée et système de panels
+    
+    Utilisable depuis plusieurs threads : `conn` et `cursor` désignent la
+    connexion du thread appelant (ouverte à la première utilisation), et les
+    écritures sont sérialisées par `write_lock`, un seul écrivain à la fois.
+    """
     
     # Définition des panels disponibles
     PANELS = {
@@ -22,10 +102,44 @@ class Database:
         'autre': 'Autre'
     }
     
-    def __init__(self, db_path: str = "portal.db"):
+    # Migrations ordonnées (version, description, méthode), enregistrées dans
+    # la table schema_version ; ne jamais renuméroter, seulement ajouter
+    MIGRATIONS = [
+        (1, "Colonnes des bases historiques", '_migrate_legacy_columns'),
+        (2, "Tables de base", '_create_base_tables'),
+        (3, "Index de recherche", '_create_indexes'),
+        (4, "Index plein texte du contenu", '_create_content_index'),
+        (5, "Agrégats par dossier", '_create_folder_aggregates'),
+        (6, "Fichiers à compléter (file_size, file_hash)", '_prepare_metadata_backfill'),
+        (7, "Cache des hash de fichiers", '_create_hash_cache'),
+    ]
+    SCHEMA_VERSION = MIGRATIONS[-1][0]
+    
+    def __init__(self, db_path: str = "portal.db", profile: str = "auto"):
+        """
+        Args:
+            db_path: Chemin de la base SQLite
+            profile: Profil PRAGMA_PROFILES, ou "auto" (network si la base est
+                sur un lecteur réseau, performance sinon)
+        """
         self.db_path = db_path
+        if profile == "auto":
+            profile = "network" if is_network_path(db_path) else "performance"
+        if profile not in PRAGMA_PROFILES:
+            raise ValueError(f"Profil SQLite inconnu: {profile}")
+        self.profile = profile
+        self.pragmas = PRAGMA_PROFILES[profile]
+        
+        # Une connexion par thread ; verrou réentrant pour l'écrivain unique
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self.write_lock = threading.RLock()
         self.conn = None
-        self.cursor = None
+        self.fts_available = False
+        self.schema = SchemaInfo()
+        self.text_extractor = TextExtractor()
+        self.hasher = HashingService()
         
         if CRYPTO_AVAILABLE:
             self.encryption_key = self._get_or_create_encryption_key()
@@ -35,8 +149,10 @@ class Database:
             self.fernet = None
             
         self.connect()
-        self.migrate_database()
-        self.create_tables()
+        # Base à jour : aucune migration, le démarrage se limite à la lecture du schéma
+        if self.needs_migration():
+            with self.write_lock:
+                self.migrate_database()
         self.create_default_admin()
     
     def _get_or_create_encryption_key(self) -> bytes:
@@ -70,138 +186,557 @@ class Database:
         except:
             return encrypted_data
     
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Connexion du thread courant (créée à la première utilisation)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self.new_connection()
+            self.conn = conn
+        return conn
+    
+    @conn.setter
+    def conn(self, conn: Optional[sqlite3.Connection]):
+        self._local.conn = conn
+        self._local.cursor = conn.cursor() if conn is not None else None
+        if conn is not None:
+            with self._connections_lock:
+                self._connections.append(conn)
+    
+    @property
+    def cursor(self) -> sqlite3.Cursor:
+        """Curseur du thread courant"""
+        if getattr(self._local, 'conn', None) is None:
+            self.conn = self.new_connection()
+        return self._local.cursor
+    
     def connect(self):
         """Établir la connexion à la base de données"""
         try:
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.row_factory = sqlite3.Row
-            self.cursor = self.conn.cursor()
-            print(f"✅ Connexion à la base de données réussie: {self.db_path}")
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=self.pragmas.get('busy_timeout', 5000) / 1000,
+                check_same_thread=False
+            )
+            conn.row_factory = sqlite3.Row
+            self.conn = conn
+            
+            # Le mode de journal est persistant dans le fichier : seule la
+            # connexion principale le fixe
+            if 'journal_mode' in self.pragmas:
+                self.cursor.execute(f"PRAGMA journal_mode = {self.pragmas['journal_mode']}")
+                journal_mode = self.cursor.fetchone()[0]
+            else:
+                journal_mode = self.cursor.execute("PRAGMA journal_mode").fetchone()[0]
+            self.configure_connection(self.conn)
+            
+            self.fts_available = self._check_fts5()
+            self.refresh_schema()
+            print(f"✅ Connexion à la base de données réussie: {self.db_path} "
+                  f"(profil {self.profile}, journal {journal_mode})")
         except sqlite3.Error as e:
             print(f"❌ Erreur de connexion à la base de données: {e}")
             raise
     
-    def migrate_database(self):
-        """Migration automatique de la base de données avec support panels"""
+    def configure_connection(self, conn: sqlite3.Connection):
+        """Appliquer les PRAGMA du profil propres à chaque connexion"""
+        for name in ('synchronous', 'cache_size', 'mmap_size', 'temp_store', 'foreign_keys', 'busy_timeout'):
+            if name in self.pragmas:
+                conn.execute(f"PRAGMA {name} = {self.pragmas[name]}")
+    
+    def new_connection(self) -> sqlite3.Connection:
+        """
+        Ouvrir une connexion supplémentaire configurée selon le profil
+        
+        check_same_thread est désactivé pour que `close()` puisse fermer les
+        connexions des autres threads ; chacune reste utilisée par un seul thread.
+        """
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.pragmas.get('busy_timeout', 5000) / 1000,
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        self.configure_connection(conn)
+        return conn
+    
+    def release_connection(self):
+        """Fermer la connexion du thread courant (à appeler à la fin d'un thread de travail)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        self._local.cursor = None
+        with self._connections_lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        conn.close()
+    
+    def refresh_schema(self):
+        """Relire le schéma (à appeler après toute modification de structure)"""
+        self.schema = SchemaInfo.load(self.conn)
+    
+    def _check_fts5(self) -> bool:
+        """Vérifier que SQLite a été compilé avec FTS5"""
         try:
-            # Vérifier si la table folders existe
-            self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='folders'")
-            folders_exist = self.cursor.fetchone()
-            
-            if folders_exist:
-                # Vérifier si la colonne panel existe
-                self.cursor.execute("PRAGMA table_info(folders)")
-                columns = [column[1] for column in self.cursor.fetchall()]
-                
-                if 'panel' not in columns:
-                    print("🔄 Ajout de la colonne panel aux dossiers...")
-                    self.cursor.execute("ALTER TABLE folders ADD COLUMN panel TEXT DEFAULT 'interface_emp'")
-                    self.conn.commit()
-            
-            # Vérifier la table files
-            self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='files'")
-            if self.cursor.fetchone():
-                self.cursor.execute("PRAGMA table_info(files)")
-                columns = [column[1] for column in self.cursor.fetchall()]
-                
-                # Ajouter file_size si elle n'existe pas
-                if 'file_size' not in columns:
-                    print("🔄 Ajout de la colonne file_size...")
-                    self.cursor.execute("ALTER TABLE files ADD COLUMN file_size INTEGER DEFAULT 0")
-                    
-                    self.cursor.execute("SELECT id, filepath FROM files")
-                    files = self.cursor.fetchall()
-                    
-                    for file_id, filepath in files:
-                        try:
-                            if os.path.exists(filepath):
-                                size = os.path.getsize(filepath)
-                                self.cursor.execute("UPDATE files SET file_size = ? WHERE id = ?", (size, file_id))
-                        except Exception as e:
-                            print(f"⚠️ Erreur calcul taille pour {filepath}: {e}")
-                
-                # Ajouter file_hash si elle n'existe pas
-                if 'file_hash' not in columns:
-                    print("🔄 Ajout de la colonne file_hash...")
-                    self.cursor.execute("ALTER TABLE files ADD COLUMN file_hash TEXT DEFAULT ''")
-            
-            # Vérifier la table admins pour bcrypt
-            self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='admins'")
-            if self.cursor.fetchone():
-                self.cursor.execute("PRAGMA table_info(admins)")
-                admin_columns = [column[1] for column in self.cursor.fetchall()]
-                
-                if 'password' in admin_columns and 'password_hash' not in admin_columns:
-                    print("🔄 Migration des mots de passe vers bcrypt...")
-                    self.cursor.execute("ALTER TABLE admins ADD COLUMN password_hash TEXT")
-                    
-                    self.cursor.execute("SELECT id, password FROM admins WHERE password_hash IS NULL OR password_hash = ''")
-                    admins = self.cursor.fetchall()
-                    
-                    for admin_id, old_password in admins:
-                        if old_password:
-                            password_hash = bcrypt.hashpw(old_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-                            self.cursor.execute("UPDATE admins SET password_hash = ? WHERE id = ?", (password_hash, admin_id))
-            
+            self.cursor.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts5_probe USING fts5(x)")
+            self.cursor.execute("DROP TABLE temp.fts5_probe")
+            return True
+        except sqlite3.Error:
+            print("⚠️ FTS5 non disponible - recherche dans le contenu désactivée")
+            return False
+    
+    def migrate_database(self) -> int:
+        """
+        Appliquer, dans l'ordre, les migrations de MIGRATIONS non encore enregistrées
+        
+        Chaque migration est idempotente et enregistrée dans `schema_version`
+        dès qu'elle se termine : une migration interrompue est simplement
+        rejouée au lancement suivant.
+        
+        Returns:
+            Nombre de migrations appliquées
+        """
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self.conn.commit()
+        
+        applied = 0
+        for version, description, method in self.MIGRATIONS:
+            if version <= self.schema.version:
+                continue
+            print(f"🔄 Migration {version}: {description}...")
+            try:
+                getattr(self, method)()
+                self.cursor.execute(
+                    "INSERT OR REPLACE INTO schema_version (version, description) VALUES (?, ?)",
+                    (version, description)
+                )
+                self.conn.commit()
+            except Exception as e:
+                print(f"❌ Erreur lors de la migration {version}: {e}")
+                self.conn.rollback()
+                raise
+            self.refresh_schema()
+            applied += 1
+        
+        # SQLite mis à jour depuis la migration : l'index plein texte devient disponible
+        if self.fts_available and not self.schema.has_table('files_fts'):
+            self._create_content_index()
             self.conn.commit()
-            print("✅ Migration automatique terminée")
+            self.refresh_schema()
+        
+        if applied:
+            print(f"✅ Schéma migré en version {self.schema.version}")
+        return applied
+    
+    def needs_migration(self) -> bool:
+        """La base est-elle en retard sur MIGRATIONS ?"""
+        return (self.schema.version < self.SCHEMA_VERSION
+                or (self.fts_available and not self.schema.has_table('files_fts')))
+    
+    def _migrate_legacy_columns(self):
+        """Ajouter aux bases historiques les colonnes apparues depuis"""
+        schema = self.schema
+        
+        # Vérifier si la colonne panel existe
+        if schema.has_table('folders') and not schema.has_column('folders', 'panel'):
+            print("🔄 Ajout de la colonne panel aux dossiers...")
+            self.cursor.execute("ALTER TABLE folders ADD COLUMN panel TEXT DEFAULT 'interface_emp'")
+        
+        # Sans valeur par défaut : NULL marque les lignes à compléter par
+        # utils.metadata_backfill
+        if schema.has_table('files'):
+            if not schema.has_column('files', 'file_size'):
+                print("🔄 Ajout de la colonne file_size...")
+                self.cursor.execute("ALTER TABLE files ADD COLUMN file_size INTEGER")
+            if not schema.has_column('files', 'file_hash'):
+                print("🔄 Ajout de la colonne file_hash...")
+                self.cursor.execute("ALTER TABLE files ADD COLUMN file_hash TEXT")
+        
+        # Vérifier la table admins pour bcrypt
+        admin_columns = schema.columns('admins')
+        if 'password' in admin_columns and 'password_hash' not in admin_columns:
+            print("🔄 Migration des mots de passe vers bcrypt...")
+            self.cursor.execute("ALTER TABLE admins ADD COLUMN password_hash TEXT")
             
-        except Exception as e:
-            print(f"⚠️ Erreur lors de la migration: {e}")
-            self.conn.rollback()
+            self.cursor.execute("SELECT id, password FROM admins WHERE password_hash IS NULL OR password_hash = ''")
+            admins = self.cursor.fetchall()
+            
+            for admin_id, old_password in admins:
+                if old_password:
+                    password_hash = bcrypt.hashpw(old_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+                    self.cursor.execute("UPDATE admins SET password_hash = ? WHERE id = ?", (password_hash, admin_id))
     
-    def create_tables(self):
+    def _create_base_tables(self):
         """Créer les tables nécessaires avec support des panels"""
-        try:
-            # Table admins avec hash bcrypt
+        # Table admins avec hash bcrypt
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS admins (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                email TEXT NOT NULL UNIQUE,
+                password TEXT,
+                password_hash TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Table folders avec panel
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS folders (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                parent_id INTEGER DEFAULT NULL,
+                panel TEXT DEFAULT 'interface_emp',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (parent_id) REFERENCES folders(id) ON DELETE CASCADE
+            )
+        """)
+        
+        # Table files avec métadonnées
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                folder_id INTEGER NOT NULL,
+                filename TEXT NOT NULL,
+                filepath TEXT NOT NULL,
+                file_size INTEGER DEFAULT 0,
+                file_hash TEXT DEFAULT '',
+                uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (folder_id) REFERENCES folders(id) ON DELETE CASCADE
+            )
+        """)
+    
+    def _create_indexes(self):
+        """Index pour optimiser la recherche"""
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_filename ON files(filename)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_uploaded_at ON files(uploaded_at)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_size ON files(file_size)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_filepath ON files(filepath)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_folders_panel ON folders(panel)")
+        # Parcours récursifs de l'arborescence (WITH RECURSIVE)
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_folders_parent ON folders(parent_id)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_folder ON files(folder_id)")
+    
+    def _create_content_index(self):
+        """Index plein texte du contenu des fichiers (rowid = files.id)"""
+        if not self.fts_available:
+            print("⚠️ FTS5 non disponible - index du contenu non créé")
+            return
+        
+        self.cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(
+                filename,
+                content,
+                tokenize = 'unicode61 remove_diacritics 1'
+            )
+        """)
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_files_fts_delete
+            AFTER DELETE ON files
+            BEGIN
+                DELETE FROM files_fts WHERE rowid = old.id;
+            END
+        """)
+        
+        # File persistante des fichiers à (ré)indexer en arrière-plan
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS index_queue (
+                file_id INTEGER PRIMARY KEY,
+                file_hash TEXT DEFAULT '',
+                enqueued_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                attempts INTEGER DEFAULT 0,
+                last_error TEXT
+            )
+        """)
+        
+        # Hash du contenu effectivement indexé pour chaque fichier
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS content_index_state (
+                file_id INTEGER PRIMARY KEY,
+                file_hash TEXT DEFAULT '',
+                indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_files_enqueue_insert
+            AFTER INSERT ON files
+            BEGIN
+                INSERT OR REPLACE INTO index_queue (file_id, file_hash)
+                VALUES (new.id, new.file_hash);
+            END
+        """)
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_files_enqueue_update
+            AFTER UPDATE OF file_hash, filepath ON files
+            WHEN new.file_hash IS NOT old.file_hash OR new.filepath IS NOT old.filepath
+            BEGIN
+                INSERT OR REPLACE INTO index_queue (file_id, file_hash)
+                VALUES (new.id, new.file_hash);
+            END
+        """)
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_files_index_cleanup
+            AFTER DELETE ON files
+            BEGIN
+                DELETE FROM index_queue WHERE file_id = old.id;
+                DELETE FROM content_index_state WHERE file_id = old.id;
+            END
+        """)
+    
+    def _prepare_metadata_backfill(self):
+        """
+        Marquer les fichiers sans hash et indexer les lignes à compléter
+        
+        Le calcul lui-même (utils.metadata_backfill) tourne en arrière-plan
+        après l'ouverture de l'interface : l'index partiel le rend immédiat
+        quand il ne reste rien à faire.
+        
+        L'UPDATE déclenche trg_files_enqueue_update : les fichiers déjà indexés
+        (sous un hash vide) n'ont pas changé de contenu, leur entrée de file
+        est retirée dans la même étape.
+        """
+        self.cursor.execute("UPDATE files SET file_hash = NULL WHERE file_hash = ''")
+        if self.schema.has_table('index_queue'):
             self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS admins (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    email TEXT NOT NULL UNIQUE,
-                    password TEXT,
-                    password_hash TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                DELETE FROM index_queue WHERE file_hash IS NULL AND file_id IN (
+                    SELECT file_id FROM content_index_state WHERE file_hash = '' OR file_hash IS NULL
                 )
             """)
-            
-            # Table folders avec panel
+            self.cursor.execute("UPDATE content_index_state SET file_hash = NULL WHERE file_hash = ''")
+        self.cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_files_pending_metadata ON files(id) WHERE {PENDING_CONDITION}"
+        )
+    
+    def _create_hash_cache(self):
+        """Hash connus par chemin, valides tant que taille et mtime sont inchangées (utils.hashing)"""
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS file_hash_cache (
+                filepath TEXT PRIMARY KEY,
+                file_size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                file_hash TEXT NOT NULL
+            ) WITHOUT ROWID
+        """)
+    
+    def _create_folder_aggregates(self):
+        """
+        Créer les agrégats matérialisés par dossier et leurs triggers
+        
+        - `folder_closure` : table de fermeture (ancêtre, descendant, profondeur),
+          les triggers SQLite ne pouvant pas utiliser WITH RECURSIVE ;
+        - `folder_stats` : nombre de fichiers et taille, directs et récursifs,
+          et date de dernière modification du contenu.
+        
+        Chaque écriture sur `files` met à jour le dossier et ses ancêtres en
+        O(profondeur) : la lecture des compteurs est ensuite en O(1).
+        """
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS folder_closure (
+                ancestor_id INTEGER NOT NULL,
+                descendant_id INTEGER NOT NULL,
+                depth INTEGER NOT NULL,
+                PRIMARY KEY (ancestor_id, descendant_id)
+            ) WITHOUT ROWID
+        """)
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_folder_closure_descendant ON folder_closure(descendant_id, ancestor_id)"
+        )
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS folder_stats (
+                folder_id INTEGER PRIMARY KEY,
+                file_count INTEGER NOT NULL DEFAULT 0,
+                total_size INTEGER NOT NULL DEFAULT 0,
+                recursive_file_count INTEGER NOT NULL DEFAULT 0,
+                recursive_size INTEGER NOT NULL DEFAULT 0,
+                last_modified TIMESTAMP,
+                recursive_last_modified TIMESTAMP
+            )
+        """)
+        
+        # Dossiers : fermeture et ligne de statistiques
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_folders_aggregate_insert
+            AFTER INSERT ON folders
+            BEGIN
+                INSERT OR IGNORE INTO folder_closure (ancestor_id, descendant_id, depth)
+                SELECT ancestor_id, new.id, depth + 1 FROM folder_closure WHERE descendant_id = new.parent_id
+                UNION ALL SELECT new.id, new.id, 0;
+                INSERT OR IGNORE INTO folder_stats (folder_id, last_modified, recursive_last_modified)
+                VALUES (new.id, new.created_at, new.created_at);
+            END
+        """)
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_folders_aggregate_delete
+            AFTER DELETE ON folders
+            BEGIN
+                DELETE FROM folder_closure WHERE descendant_id = old.id OR ancestor_id = old.id;
+                DELETE FROM folder_stats WHERE folder_id = old.id;
+            END
+        """)
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_folders_aggregate_move
+            AFTER UPDATE OF parent_id ON folders
+            WHEN new.parent_id IS NOT old.parent_id
+            BEGIN
+                UPDATE folder_stats SET
+                    recursive_file_count = recursive_file_count
+                        - (SELECT recursive_file_count FROM folder_stats WHERE folder_id = old.id),
+                    recursive_size = recursive_size
+                        - (SELECT recursive_size FROM folder_stats WHERE folder_id = old.id)
+                WHERE folder_id IN (
+                    SELECT ancestor_id FROM folder_closure WHERE descendant_id = old.id AND depth > 0
+                );
+                DELETE FROM folder_closure
+                WHERE descendant_id IN (SELECT descendant_id FROM folder_closure WHERE ancestor_id = old.id)
+                  AND ancestor_id NOT IN (SELECT descendant_id FROM folder_closure WHERE ancestor_id = old.id);
+                INSERT OR IGNORE INTO folder_closure (ancestor_id, descendant_id, depth)
+                SELECT sup.ancestor_id, sub.descendant_id, sup.depth + sub.depth + 1
+                FROM folder_closure sup, folder_closure sub
+                WHERE sup.descendant_id = new.parent_id AND sub.ancestor_id = new.id;
+                UPDATE folder_stats SET
+                    recursive_file_count = recursive_file_count
+                        + (SELECT recursive_file_count FROM folder_stats WHERE folder_id = new.id),
+                    recursive_size = recursive_size
+                        + (SELECT recursive_size FROM folder_stats WHERE folder_id = new.id),
+                    recursive_last_modified = CURRENT_TIMESTAMP
+                WHERE folder_id IN (
+                    SELECT ancestor_id FROM folder_closure WHERE descendant_id = new.id AND depth > 0
+                );
+            END
+        """)
+        
+        # Fichiers : mise à jour du dossier et de tous ses ancêtres
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_files_aggregate_insert
+            AFTER INSERT ON files
+            BEGIN
+                UPDATE folder_stats SET
+                    file_count = file_count + 1,
+                    total_size = total_size + COALESCE(new.file_size, 0),
+                    last_modified = CURRENT_TIMESTAMP
+                WHERE folder_id = new.folder_id;
+                UPDATE folder_stats SET
+                    recursive_file_count = recursive_file_count + 1,
+                    recursive_size = recursive_size + COALESCE(new.file_size, 0),
+                    recursive_last_modified = CURRENT_TIMESTAMP
+                WHERE folder_id IN (SELECT ancestor_id FROM folder_closure WHERE descendant_id = new.folder_id);
+            END
+        """)
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_files_aggregate_delete
+            AFTER DELETE ON files
+            BEGIN
+                UPDATE folder_stats SET
+                    file_count = file_count - 1,
+                    total_size = total_size - COALESCE(old.file_size, 0),
+                    last_modified = CURRENT_TIMESTAMP
+                WHERE folder_id = old.folder_id;
+                UPDATE folder_stats SET
+                    recursive_file_count = recursive_file_count - 1,
+                    recursive_size = recursive_size - COALESCE(old.file_size, 0),
+                    recursive_last_modified = CURRENT_TIMESTAMP
+                WHERE folder_id IN (SELECT ancestor_id FROM folder_closure WHERE descendant_id = old.folder_id);
+            END
+        """)
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_files_aggregate_update
+            AFTER UPDATE OF folder_id, file_size ON files
+            WHEN new.folder_id IS NOT old.folder_id OR new.file_size IS NOT old.file_size
+            BEGIN
+                UPDATE folder_stats SET
+                    file_count = file_count - 1,
+                    total_size = total_size - COALESCE(old.file_size, 0),
+                    last_modified = CURRENT_TIMESTAMP
+                WHERE folder_id = old.folder_id;
+                UPDATE folder_stats SET
+                    recursive_file_count = recursive_file_count - 1,
+                    recursive_size = recursive_size - COALESCE(old.file_size, 0)
+                WHERE folder_id IN (SELECT ancestor_id FROM folder_closure WHERE descendant_id = old.folder_id);
+                UPDATE folder_stats SET
+                    file_count = file_count + 1,
+                    total_size = total_size + COALESCE(new.file_size, 0),
+                    last_modified = CURRENT_TIMESTAMP
+                WHERE folder_id = new.folder_id;
+                UPDATE folder_stats SET
+                    recursive_file_count = recursive_file_count + 1,
+                    recursive_size = recursive_size + COALESCE(new.file_size, 0),
+                    recursive_last_modified = CURRENT_TIMESTAMP
+                WHERE folder_id IN (SELECT ancestor_id FROM folder_closure WHERE descendant_id = new.folder_id);
+            END
+        """)
+        
+        # Base existante (ou agrégats désynchronisés) : reconstruire une fois
+        self.cursor.execute(
+            "SELECT (SELECT COUNT(*) FROM folders) != (SELECT COUNT(*) FROM folder_stats)"
+        )
+        if self.cursor.fetchone()[0]:
+            self.rebuild_folder_aggregates(commit=False)
+    
+    @serialized_write
+    def rebuild_folder_aggregates(self, commit: bool = True) -> bool:
+        """Recalculer entièrement `folder_closure` et `folder_stats` depuis les tables sources"""
+        try:
+            self.cursor.execute("DELETE FROM folder_closure")
             self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS folders (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    parent_id INTEGER DEFAULT NULL,
-                    panel TEXT DEFAULT 'interface_emp',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (parent_id) REFERENCES folders(id) ON DELETE CASCADE
+                INSERT INTO folder_closure (ancestor_id, descendant_id, depth)
+                WITH RECURSIVE closure(ancestor_id, descendant_id, depth) AS (
+                    SELECT id, id, 0 FROM folders
+                    UNION
+                    SELECT c.ancestor_id, f.id, c.depth + 1
+                    FROM folders f
+                    JOIN closure c ON f.parent_id = c.descendant_id
+                    -- `depth` empêche UNION de dédupliquer : borne contre un cycle de parent_id
+                    WHERE c.depth < (SELECT COUNT(*) FROM folders)
                 )
+                SELECT ancestor_id, descendant_id, MIN(depth) FROM closure
+                GROUP BY ancestor_id, descendant_id
             """)
             
-            # Table files avec métadonnées
+            self.cursor.execute("DELETE FROM folder_stats")
             self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS files (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    folder_id INTEGER NOT NULL,
-                    filename TEXT NOT NULL,
-                    filepath TEXT NOT NULL,
-                    file_size INTEGER DEFAULT 0,
-                    file_hash TEXT DEFAULT '',
-                    uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (folder_id) REFERENCES folders(id) ON DELETE CASCADE
-                )
+                INSERT INTO folder_stats (folder_id, file_count, total_size, last_modified)
+                SELECT fo.id, COUNT(f.id), COALESCE(SUM(f.file_size), 0),
+                       COALESCE(MAX(f.uploaded_at), fo.created_at)
+                FROM folders fo
+                LEFT JOIN files f ON f.folder_id = fo.id
+                GROUP BY fo.id
             """)
-            
-            # Index pour optimiser la recherche
-            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_filename ON files(filename)")
-            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_uploaded_at ON files(uploaded_at)")
-            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_size ON files(file_size)")
-            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_folders_panel ON folders(panel)")
-            
-            self.conn.commit()
-            print("✅ Tables créées avec succès")
+            self.cursor.execute("""
+                UPDATE folder_stats SET
+                    recursive_file_count = (
+                        SELECT COALESCE(SUM(s.file_count), 0) FROM folder_closure c
+                        JOIN folder_stats s ON s.folder_id = c.descendant_id
+                        WHERE c.ancestor_id = folder_stats.folder_id
+                    ),
+                    recursive_size = (
+                        SELECT COALESCE(SUM(s.total_size), 0) FROM folder_closure c
+                        JOIN folder_stats s ON s.folder_id = c.descendant_id
+                        WHERE c.ancestor_id = folder_stats.folder_id
+                    ),
+                    recursive_last_modified = (
+                        SELECT MAX(s.last_modified) FROM folder_closure c
+                        JOIN folder_stats s ON s.folder_id = c.descendant_id
+                        WHERE c.ancestor_id = folder_stats.folder_id
+                    )
+            """)
+            if commit:
+                self.conn.commit()
+            print("✅ Statistiques des dossiers recalculées")
+            return True
         except sqlite3.Error as e:
-            print(f"❌ Erreur lors de la création des tables: {e}")
-            raise
+            print(f"❌ Erreur lors du recalcul des statistiques des dossiers: {e}")
+            if commit:
+                self.conn.rollback()
+            return False
     
+    @serialized_write
     def create_default_admin(self):
         """Créer un compte admin par défaut avec bcrypt"""
         try:
@@ -237,6 +772,7 @@ class Database:
     
     # ==================== GESTION DES DOSSIERS AVEC PANELS ====================
     
+    @serialized_write
     def create_folder(self, name: str, parent_id: Optional[int] = None, panel: str = 'interface_emp') -> int:
         """Créer un nouveau dossier dans un panel spécifique"""
         try:
@@ -256,6 +792,22 @@ class Database:
             print(f"❌ Erreur lors de la création du dossier: {e}")
             raise
     
+    def get_folder_stats(self, folder_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Statistiques matérialisées d'un dossier (lecture en O(1))
+        
+        Returns:
+            Dictionnaire avec file_count, total_size, recursive_file_count,
+            recursive_size, last_modified et recursive_last_modified
+        """
+        try:
+            self.cursor.execute("SELECT * FROM folder_stats WHERE folder_id = ?", (folder_id,))
+            row = self.cursor.fetchone()
+            return dict(row) if row else None
+        except sqlite3.Error as e:
+            print(f"❌ Erreur lors de la récupération des statistiques du dossier: {e}")
+            return None
+    
     def get_folder(self, folder_id: int) -> Optional[Dict[str, Any]]:
         """Récupérer un dossier par son ID"""
         try:
@@ -281,19 +833,26 @@ class Database:
     def get_subfolders(self, parent_id: Optional[int] = None, panel: Optional[str] = None) -> List[Dict[str, Any]]:
         """Récupérer les sous-dossiers d'un dossier parent dans un panel"""
         try:
+            # Les compteurs matérialisés sont joints pour éviter une requête par carte
+            query = (
+                "SELECT fo.*, COALESCE(st.file_count, 0) AS file_count, "
+                "COALESCE(st.recursive_file_count, 0) AS total_file_count, "
+                "COALESCE(st.recursive_size, 0) AS recursive_size "
+                "FROM folders fo LEFT JOIN folder_stats st ON st.folder_id = fo.id "
+            )
             if parent_id is None:
                 if panel:
                     self.cursor.execute(
-                        "SELECT * FROM folders WHERE parent_id IS NULL AND panel = ? ORDER BY name ASC",
+                        query + "WHERE fo.parent_id IS NULL AND fo.panel = ? ORDER BY fo.name ASC",
                         (panel,)
                     )
                 else:
                     self.cursor.execute(
-                        "SELECT * FROM folders WHERE parent_id IS NULL ORDER BY name ASC"
+                        query + "WHERE fo.parent_id IS NULL ORDER BY fo.name ASC"
                     )
             else:
                 self.cursor.execute(
-                    "SELECT * FROM folders WHERE parent_id = ? ORDER BY name ASC",
+                    query + "WHERE fo.parent_id = ? ORDER BY fo.name ASC",
                     (parent_id,)
                 )
             return [dict(row) for row in self.cursor.fetchall()]
@@ -301,6 +860,7 @@ class Database:
             print(f"❌ Erreur lors de la récupération des sous-dossiers: {e}")
             return []
     
+    @serialized_write
     def update_folder(self, folder_id: int, name: str) -> bool:
         """Renommer un dossier"""
         try:
@@ -314,21 +874,22 @@ class Database:
             print(f"❌ Erreur lors de la mise à jour du dossier: {e}")
             return False
     
+    @serialized_write
     def delete_folder(self, folder_id: int) -> bool:
-        """Supprimer un dossier et ses fichiers"""
+        """Supprimer un dossier, ses sous-dossiers et tous leurs fichiers"""
         try:
-            self.cursor.execute("SELECT filepath FROM files WHERE folder_id = ?", (folder_id,))
-            files = self.cursor.fetchall()
+            folder_ids = [folder_id] + self._get_all_subfolder_ids(folder_id)
+            placeholders = ','.join(['?'] * len(folder_ids))
             
-            for file in files:
-                try:
-                    if os.path.exists(file['filepath']):
-                        os.remove(file['filepath'])
-                except Exception as e:
-                    print(f"⚠️ Impossible de supprimer le fichier {file['filepath']}: {e}")
+            self.cursor.execute(f"SELECT filepath FROM files WHERE folder_id IN ({placeholders})", folder_ids)
+            filepaths = [row['filepath'] for row in self.cursor.fetchall()]
             
-            self.cursor.execute("DELETE FROM folders WHERE id = ?", (folder_id,))
+            self.cursor.execute(f"DELETE FROM files WHERE folder_id IN ({placeholders})", folder_ids)
+            self.cursor.execute(f"DELETE FROM folders WHERE id IN ({placeholders})", folder_ids)
             self.conn.commit()
+            
+            # Supprimer les fichiers physiques qui ne sont plus référencés
+            self.remove_unreferenced_files(filepaths)
             return True
         except sqlite3.Error as e:
             print(f"❌ Erreur lors de la suppression du dossier: {e}")
@@ -336,48 +897,233 @@ class Database:
     
     def get_folder_path(self, folder_id: int) -> List[Dict[str, Any]]:
         """Récupérer le chemin complet d'un dossier (breadcrumb)"""
-        path = []
-        current_id = folder_id
-        
-        while current_id is not None:
-            folder = self.get_folder(current_id)
-            if folder:
-                path.insert(0, folder)
-                current_id = folder['parent_id']
+        try:
+            self.cursor.execute("""
+                WITH RECURSIVE ancestors(id, depth) AS (
+                    SELECT id, 0 FROM folders WHERE id = ?
+                    UNION
+                    SELECT p.id, a.depth + 1
+                    FROM folders c
+                    JOIN ancestors a ON c.id = a.id
+                    JOIN folders p ON p.id = c.parent_id
+                    -- `depth` empêche UNION de dédupliquer : borne contre un cycle de parent_id
+                    WHERE a.depth < (SELECT COUNT(*) FROM folders)
+                )
+                SELECT fo.* FROM (SELECT id, MIN(depth) AS depth FROM ancestors GROUP BY id) a
+                JOIN folders fo ON fo.id = a.id
+                ORDER BY a.depth DESC
+            """, (folder_id,))
+            return [dict(row) for row in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            print(f"❌ Erreur lors de la récupération du chemin: {e}")
+            return []
+    
+    def get_subtree(self, folder_id: Optional[int] = None, panel: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Récupérer toute une arborescence de dossiers en une seule requête
+        
+        Args:
+            folder_id: Dossier racine (None = tous les dossiers racine du panel)
+            panel: Panel des dossiers racine lorsque folder_id est None
+        
+        Returns:
+            Liste des dossiers en ordre préfixe (parent avant ses enfants, enfants
+            triés par nom), chacun avec `depth` et les compteurs de folder_stats :
+            `file_count`, `total_file_count` (sous-arbre), `total_size`,
+            `recursive_size` et `last_modified`
+        """
+        try:
+            if folder_id is not None:
+                root_clause, params = "id = ?", [folder_id]
+            elif panel:
+                root_clause, params = "parent_id IS NULL AND panel = ?", [panel]
+            else:
+                root_clause, params = "parent_id IS NULL", []
+            
+            self.cursor.execute(f"""
+                WITH RECURSIVE subtree(id, depth) AS (
+                    SELECT id, 0 FROM folders WHERE {root_clause}
+                    UNION
+                    SELECT c.id, s.depth + 1
+                    FROM folders c
+                    JOIN subtree s ON c.parent_id = s.id
+                    -- `depth` empêche UNION de dédupliquer : borne contre un cycle de parent_id
+                    WHERE s.depth < (SELECT COUNT(*) FROM folders)
+                )
+                SELECT fo.*, s.depth,
+                       COALESCE(st.file_count, 0) AS file_count,
+                       COALESCE(st.recursive_file_count, 0) AS total_file_count,
+                       COALESCE(st.total_size, 0) AS total_size,
+                       COALESCE(st.recursive_size, 0) AS recursive_size,
+                       st.recursive_last_modified AS last_modified
+                FROM (SELECT id, MIN(depth) AS depth FROM subtree GROUP BY id) s
+                JOIN folders fo ON fo.id = s.id
+                LEFT JOIN folder_stats st ON st.folder_id = fo.id
+                ORDER BY fo.name ASC
+            """, params)
+            folders = [dict(row) for row in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            print(f"❌ Erreur lors de la récupération de l'arborescence: {e}")
+            return []
+        
+        # Ordre préfixe, sans requête supplémentaire
+        by_id = {folder['id']: folder for folder in folders}
+        children: Dict[Optional[int], List[Dict[str, Any]]] = {}
+        roots = []
+        for folder in folders:
+            if folder['parent_id'] in by_id and folder['depth'] > 0:
+                children.setdefault(folder['parent_id'], []).append(folder)
             else:
-                break
+                roots.append(folder)
         
-        return path
+        ordered = []
+        stack = list(reversed(roots))
+        while stack:
+            folder = stack.pop()
+            ordered.append(folder)
+            stack.extend(reversed(children.get(folder['id'], [])))
+        
+        return ordered
     
     # ==================== GESTION DES FICHIERS ====================
     
-    def add_file(self, folder_id: int, filename: str, filepath: str) -> int:
-        """Ajouter un fichier à la base de données avec métadonnées"""
+    @serialized_write
+    def add_file(self, folder_id: int, filename: str, filepath: str,
+                 file_size: Optional[int] = None, file_hash: Optional[str] = None) -> int:
+        """Ajouter un fichier à la base de données avec métadonnées (taille et hash calculés si absents)"""
         try:
-            file_size = os.path.getsize(filepath) if os.path.exists(filepath) else 0
-            file_hash = self._calculate_file_hash(filepath)
+            if file_size is None:
+                file_size = os.path.getsize(filepath) if os.path.exists(filepath) else 0
+            if file_hash is None:
+                file_hash = self._calculate_file_hash(filepath)
             
             self.cursor.execute(
                 "INSERT INTO files (folder_id, filename, filepath, file_size, file_hash) VALUES (?, ?, ?, ?, ?)",
                 (folder_id, filename, filepath, file_size, file_hash)
             )
+            # L'indexation du contenu est faite en arrière-plan (trigger -> index_queue)
             self.conn.commit()
             return self.cursor.lastrowid
         except sqlite3.Error as e:
             print(f"❌ Erreur lors de l'ajout du fichier: {e}")
             raise
+        finally:
+            # Ligne validée (ou abandonnée) : le blob n'a plus besoin d'être réservé
+            BlobStore.release([filepath])
     
-    def _calculate_file_hash(self, filepath: str) -> str:
-        """Calculer le hash SHA256 d'un fichier"""
+    # ==================== INDEX PLEIN TEXTE ====================
+    
+    def _index_content(self, file_id: int, filename: str, content: str, file_hash: str = ""):
+        """Écrire le texte d'un fichier dans l'index FTS5 (sans commit)"""
+        self.cursor.execute("DELETE FROM files_fts WHERE rowid = ?", (file_id,))
+        self.cursor.execute(
+            "INSERT INTO files_fts (rowid, filename, content) VALUES (?, ?, ?)",
+            (file_id, filename, content)
+        )
+        self.cursor.execute(
+            "INSERT OR REPLACE INTO content_index_state (file_id, file_hash) VALUES (?, ?)",
+            (file_id, file_hash)
+        )
+        self.cursor.execute(
+            "DELETE FROM index_queue WHERE file_id = ? AND file_hash IS ?",
+            (file_id, file_hash)
+        )
+    
+    @serialized_write
+    def index_file_content(self, file_id: int, content: Optional[str] = None) -> bool:
+        """(Ré)indexer le contenu d'un fichier, en extrayant le texte si besoin"""
+        if not self.fts_available:
+            return False
+        try:
+            file = self.get_file(file_id)
+            if not file:
+                return False
+            if content is None:
+                content = self.text_extractor.extract(file['filepath'])
+            self._index_content(file_id, file['filename'], content, file['file_hash'])
+            self.conn.commit()
+            return True
+        except sqlite3.Error as e:
+            print(f"❌ Erreur lors de l'indexation du fichier {file_id}: {e}")
+            return False
+    
+    @serialized_write
+    def enqueue_stale_files(self) -> int:
+        """Placer dans la file les fichiers jamais indexés ou dont le hash a changé"""
+        if not self.fts_available:
+            return 0
+        try:
+            self.cursor.execute("""
+                INSERT OR IGNORE INTO index_queue (file_id, file_hash)
+                SELECT f.id, f.file_hash FROM files f
+                LEFT JOIN content_index_state s ON s.file_id = f.id
+                WHERE s.file_id IS NULL OR s.file_hash IS NOT f.file_hash
+            """)
+            count = self.cursor.rowcount
+            self.conn.commit()
+            if count > 0:
+                print(f"🔎 {count} fichier(s) ajouté(s) à la file d'indexation")
+            return count
+        except sqlite3.Error as e:
+            print(f"❌ Erreur lors de la mise en file d'indexation: {e}")
+            return 0
+    
+    def get_index_backlog(self, max_attempts: int = 3) -> int:
+        """Nombre de fichiers en attente d'indexation du contenu"""
+        if not self.fts_available:
+            return 0
         try:
-            hash_sha256 = hashlib.sha256()
-            with open(filepath, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_sha256.update(chunk)
-            return hash_sha256.hexdigest()
-        except Exception as e:
-            print(f"⚠️ Erreur calcul hash: {e}")
-            return ""
+            self.cursor.execute(
+                "SELECT COUNT(*) FROM index_queue WHERE attempts < ?",
+                (max_attempts,)
+            )
+            return self.cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"❌ Erreur lors du comptage de la file d'indexation: {e}")
+            return 0
+    
+    @staticmethod
+    def _build_fts_query(text: str) -> str:
+        """Convertir une saisie libre en requête FTS5 sûre (termes en préfixe, ET implicite)"""
+        terms = re.findall(r"\w+", text, re.UNICODE)
+        return " ".join(f'"{term}"*' for term in terms)
+    
+    def bulk_writer(self, batch_size: int = 500, atomic: bool = False) -> 'BulkWriter':
+        """
+        Ouvrir une session d'écriture groupée pour les imports massifs
+        
+        Utilisation:
+            with db.bulk_writer() as writer:
+                folder_id = writer.create_folder("Dossier", None, panel)
+                writer.add_file(folder_id, filename, filepath, file_size, file_hash)
+        
+        Args:
+            batch_size: Nombre de fichiers insérés par executemany
+            atomic: False = chaque lot est validé et conservé (l'appelant peut
+                annuler avec writer.discard()) ; True = discard() automatique en cas d'erreur
+        """
+        return BulkWriter(self, batch_size=batch_size, atomic=atomic)
+    
+    def add_files_bulk(self, rows: List[tuple], batch_size: int = 500) -> int:
+        """
+        Ajouter plusieurs fichiers par lots, tous supprimés en cas d'erreur
+        
+        Args:
+            rows: Tuples (folder_id, filename, filepath[, file_size, file_hash]) ;
+                transmettre le hash calculé pendant la copie évite de relire le fichier
+            batch_size: Nombre de lignes par executemany
+            
+        Returns:
+            Nombre de fichiers ajoutés
+        """
+        with self.bulk_writer(batch_size=batch_size, atomic=True) as writer:
+            for row in rows:
+                writer.add_file(*row)
+        return writer.files_written
+    
+    def _calculate_file_hash(self, filepath: str) -> str:
+        """Calculer le hash SHA256 d'un fichier (cache file_hash_cache, validé par l'appelant)"""
+        return self.hasher.hash_file(filepath, self.conn)
     
     def get_files_in_folder(self, folder_id: int) -> List[Dict[str, Any]]:
         """Récupérer tous les fichiers d'un dossier"""
@@ -401,25 +1147,52 @@ class Database:
             print(f"❌ Erreur lors de la récupération du fichier: {e}")
             return None
     
+    @serialized_write
     def delete_file(self, file_id: int) -> bool:
-        """Supprimer un fichier"""
+        """Supprimer un fichier (le fichier physique n'est supprimé qu'à sa dernière référence)"""
         try:
             file = self.get_file(file_id)
             if file:
-                try:
-                    if os.path.exists(file['filepath']):
-                        os.remove(file['filepath'])
-                except Exception as e:
-                    print(f"⚠️ Impossible de supprimer le fichier physique: {e}")
-                
                 self.cursor.execute("DELETE FROM files WHERE id = ?", (file_id,))
                 self.conn.commit()
+                
+                self.remove_unreferenced_files([file['filepath']])
                 return True
             return False
         except sqlite3.Error as e:
             print(f"❌ Erreur lors de la suppression du fichier: {e}")
             return False
     
+    def count_file_references(self, filepath: str) -> int:
+        """Nombre de lignes de `files` qui pointent vers un fichier physique"""
+        self.cursor.execute("SELECT COUNT(*) FROM files WHERE filepath = ?", (filepath,))
+        return self.cursor.fetchone()[0]
+    
+    @serialized_write
+    def remove_unreferenced_files(self, filepaths: List[str]) -> int:
+        """
+        Supprimer du disque les fichiers qui ne sont plus référencés par aucune ligne
+        
+        Avec le stockage dédupliqué, un même blob est partagé par plusieurs lignes :
+        le compteur de références est le nombre de lignes pointant vers son chemin
+        (index idx_files_filepath), il ne peut donc pas se désynchroniser. Un blob
+        tout juste rendu par BlobStore.commit(), dont la ligne n'est pas encore
+        insérée, est réservé et n'est pas supprimé.
+        
+        Returns:
+            Nombre de fichiers supprimés
+        """
+        removed = 0
+        for filepath in set(filepaths):
+            try:
+                if self.count_file_references(filepath) > 0:
+                    continue
+                if BlobStore.remove_if_unclaimed(filepath):
+                    removed += 1
+            except Exception as e:
+                print(f"⚠️ Impossible de supprimer le fichier physique {filepath}: {e}")
+        return removed
+    
     # ==================== RECHERCHE AVANCÉE ====================
     
     def search_files(self, 
@@ -430,80 +1203,202 @@ class Database:
                     folder_id: Optional[int] = None,
                     min_size: Optional[int] = None,
                     max_size: Optional[int] = None,
-                    panel: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Recherche avancée de fichiers avec filtre par panel"""
+                    panel: Optional[str] = None,
+                    content: str = "",
+                    limit: Optional[int] = None,
+                    with_folder: bool = False) -> List[Dict[str, Any]]:
+        """
+        Recherche avancée de fichiers avec filtre par panel
+        
+        Si `content` est renseigné, la recherche porte sur le texte extrait des
+        documents (index FTS5) et les résultats sont triés par pertinence (bm25),
+        avec un extrait (`snippet`) autour des termes trouvés.
+        Avec `with_folder`, chaque ligne porte aussi `folder_name`, `folder_panel`
+        et `folder_path` (fil d'Ariane « A / B / C »), calculés dans la même requête.
+        Pour parcourir de gros résultats, préférer `search_files_page`.
+        """
+        page = self.search_files_page(
+            filename=filename, extension=extension, date_from=date_from, date_to=date_to,
+            folder_id=folder_id, min_size=min_size, max_size=max_size, panel=panel,
+            content=content, limit=limit, with_total=False, with_folder=with_folder
+        )
+        return page['rows']
+    
+    def search_files_page(self,
+                          filename: str = "",
+                          extension: str = "",
+                          date_from: Optional[datetime] = None,
+                          date_to: Optional[datetime] = None,
+                          folder_id: Optional[int] = None,
+                          min_size: Optional[int] = None,
+                          max_size: Optional[int] = None,
+                          panel: Optional[str] = None,
+                          content: str = "",
+                          limit: Optional[int] = 100,
+                          cursor: Optional[tuple] = None,
+                          with_total: bool = True,
+                          with_folder: bool = False) -> Dict[str, Any]:
+        """
+        Recherche paginée (mêmes critères que search_files)
+        
+        La recherche par nom est paginée par clé (uploaded_at, id) : chaque page
+        reprend exactement après la précédente, sans OFFSET, même si des fichiers
+        sont ajoutés entre deux pages. La recherche par contenu, triée par
+        pertinence, est paginée par décalage.
+        
+        Args:
+            limit: Nombre maximum de lignes (None = pas de limite)
+            cursor: `next_cursor` de la page précédente (None = première page)
+            with_total: Calculer le nombre total de résultats (première page seulement)
+            with_folder: Joindre le nom, le panel et le chemin du dossier de chaque fichier
+        
+        Returns:
+            Dictionnaire {'rows': [...], 'next_cursor': curseur ou None, 'total': int ou None}
+        """
+        empty = {'rows': [], 'next_cursor': None, 'total': 0}
         try:
             conditions = []
             params = []
             
+            fts_query = ""
+            if content:
+                if not self.fts_available:
+                    print("⚠️ Recherche dans le contenu indisponible (FTS5 absent)")
+                    return empty
+                fts_query = self._build_fts_query(content)
+                if not fts_query:
+                    return empty
+                conditions.append("files_fts MATCH ?")
+                params.append(fts_query)
+            
             if filename:
-                conditions.append("LOWER(filename) LIKE ?")
+                conditions.append("LOWER(f.filename) LIKE ?")
                 params.append(f"%{filename.lower()}%")
             
             if extension:
-                conditions.append("LOWER(filename) LIKE ?")
+                conditions.append("LOWER(f.filename) LIKE ?")
                 params.append(f"%.{extension.lower()}")
             
             if date_from:
-                conditions.append("uploaded_at >= ?")
+                conditions.append("f.uploaded_at >= ?")
                 params.append(date_from.isoformat())
             
             if date_to:
-                conditions.append("uploaded_at <= ?")
+                conditions.append("f.uploaded_at <= ?")
                 params.append(date_to.isoformat())
             
             if folder_id is not None:
-                folder_ids = self._get_all_subfolder_ids(folder_id)
-                folder_ids.append(folder_id)
-                placeholders = ','.join(['?'] * len(folder_ids))
-                conditions.append(f"folder_id IN ({placeholders})")
-                params.extend(folder_ids)
+                conditions.append("""f.folder_id IN (
+                    WITH RECURSIVE subtree(id) AS (
+                        SELECT ?
+                        UNION
+                        SELECT c.id FROM folders c JOIN subtree s ON c.parent_id = s.id
+                    )
+                    SELECT id FROM subtree
+                )""")
+                params.append(folder_id)
             
             # Filtre par panel
             if panel:
-                conditions.append("folder_id IN (SELECT id FROM folders WHERE panel = ?)")
+                conditions.append("f.folder_id IN (SELECT id FROM folders WHERE panel = ?)")
                 params.append(panel)
             
-            try:
-                self.cursor.execute("PRAGMA table_info(files)")
-                columns = [column[1] for column in self.cursor.fetchall()]
+            if self.schema.has_column('files', 'file_size'):
+                if min_size is not None:
+                    conditions.append("f.file_size >= ?")
+                    params.append(min_size)
                 
-                if 'file_size' in columns:
-                    if min_size is not None:
-                        conditions.append("file_size >= ?")
-                        params.append(min_size)
-                    
-                    if max_size is not None:
-                        conditions.append("file_size <= ?")
-                        params.append(max_size)
-            except:
-                pass
+                if max_size is not None:
+                    conditions.append("f.file_size <= ?")
+                    params.append(max_size)
+            
+            if fts_query:
+                from_clause = "FROM files f JOIN files_fts ON files_fts.rowid = f.id"
+            else:
+                from_clause = "FROM files f"
+            where = " WHERE " + " AND ".join(conditions) if conditions else ""
             
-            query = "SELECT * FROM files"
-            if conditions:
-                query += " WHERE " + " AND ".join(conditions)
-            query += " ORDER BY uploaded_at DESC"
+            total = None
+            if with_total and cursor is None:
+                self.cursor.execute(f"SELECT COUNT(*) {from_clause}{where}", params)
+                total = self.cursor.fetchone()[0]
             
-            self.cursor.execute(query, params)
-            return [dict(row) for row in self.cursor.fetchall()]
+            # Projection jointe : évite une requête get_folder par résultat.
+            # Le chemin est construit en remontant les parents (l'ordre d'un
+            # group_concat n'est pas garanti) ; `seen` arrête un cycle de parent_id
+            select = "f.*"
+            select_from = from_clause
+            if with_folder:
+                select += (
+                    ", fo.name AS folder_name, fo.panel AS folder_panel, ("
+                    "    WITH RECURSIVE up(parent_id, path, seen, depth) AS ("
+                    "        SELECT parent_id, name, ',' || id || ',', 0 FROM folders WHERE id = f.folder_id"
+                    "        UNION ALL"
+                    "        SELECT p.parent_id, p.name || ' / ' || up.path, up.seen || p.id || ',', up.depth + 1"
+                    "        FROM up JOIN folders p ON p.id = up.parent_id"
+                    "        WHERE instr(up.seen, ',' || p.id || ',') = 0"
+                    "    )"
+                    "    SELECT path FROM up ORDER BY depth DESC LIMIT 1"
+                    ") AS folder_path"
+                )
+                select_from += " LEFT JOIN folders fo ON fo.id = f.folder_id"
+            
+            page_conditions = list(conditions)
+            page_params = list(params)
+            offset = 0
+            if fts_query:
+                query = (
+                    f"SELECT {select}, snippet(files_fts, 1, '[', ']', '…', 12) AS snippet "
+                    f"{select_from}{where} ORDER BY bm25(files_fts), f.uploaded_at DESC, f.id DESC"
+                )
+                if cursor is not None:
+                    offset = cursor[1]
+            else:
+                if cursor is not None:
+                    # Pagination par clé : reprendre strictement après la dernière ligne vue
+                    page_conditions.append("(f.uploaded_at, f.id) < (?, ?)")
+                    page_params.extend(cursor[1:])
+                page_where = " WHERE " + " AND ".join(page_conditions) if page_conditions else ""
+                query = f"SELECT {select} {select_from}{page_where} ORDER BY f.uploaded_at DESC, f.id DESC"
+            
+            if limit is not None:
+                query += " LIMIT ? OFFSET ?"
+                page_params.extend([limit, offset])
+            
+            self.cursor.execute(query, page_params)
+            rows = [dict(row) for row in self.cursor.fetchall()]
+            
+            next_cursor = None
+            if limit is not None and len(rows) == limit:
+                if fts_query:
+                    next_cursor = ('offset', offset + len(rows))
+                else:
+                    next_cursor = ('key', rows[-1]['uploaded_at'], rows[-1]['id'])
+            
+            return {'rows': rows, 'next_cursor': next_cursor, 'total': total}
             
         except sqlite3.Error as e:
             print(f"❌ Erreur lors de la recherche: {e}")
-            return []
+            return empty
     
     def _get_all_subfolder_ids(self, folder_id: int) -> List[int]:
-        """Récupérer récursivement tous les IDs des sous-dossiers"""
-        subfolder_ids = []
-        subfolders = self.get_subfolders(folder_id)
-        
-        for subfolder in subfolders:
-            subfolder_ids.append(subfolder['id'])
-            subfolder_ids.extend(self._get_all_subfolder_ids(subfolder['id']))
-        
-        return subfolder_ids
+        """Récupérer tous les IDs des sous-dossiers (requête récursive unique)"""
+        self.cursor.execute("""
+            WITH RECURSIVE subtree(id) AS (
+                SELECT id FROM folders WHERE parent_id = ?
+                UNION
+                SELECT c.id FROM folders c JOIN subtree s ON c.parent_id = s.id
+            )
+            SELECT id FROM subtree
+        """, (folder_id,))
+        return [row[0] for row in self.cursor.fetchall()]
     
     def count_files_in_folder(self, folder_id: int, recursive: bool = False) -> int:
-        """Compter les fichiers dans un dossier"""
+        """Compter les fichiers dans un dossier (lus dans folder_stats)"""
+        stats = self.get_folder_stats(folder_id)
+        if stats:
+            return stats['recursive_file_count'] if recursive else stats['file_count']
+        
         try:
             if not recursive:
                 self.cursor.execute(
@@ -512,11 +1407,15 @@ class Database:
                 )
                 return self.cursor.fetchone()[0]
             else:
-                count = self.count_files_in_folder(folder_id, recursive=False)
-                subfolders = self.get_subfolders(folder_id)
-                for subfolder in subfolders:
-                    count += self.count_files_in_folder(subfolder['id'], recursive=True)
-                return count
+                self.cursor.execute("""
+                    WITH RECURSIVE subtree(id) AS (
+                        SELECT ?
+                        UNION
+                        SELECT c.id FROM folders c JOIN subtree s ON c.parent_id = s.id
+                    )
+                    SELECT COUNT(*) FROM files WHERE folder_id IN (SELECT id FROM subtree)
+                """, (folder_id,))
+                return self.cursor.fetchone()[0]
         except sqlite3.Error as e:
             print(f"❌ Erreur lors du comptage des fichiers: {e}")
             return 0
@@ -536,7 +1435,188 @@ class Database:
             return []
     
     def close(self):
-        """Fermer la connexion à la base de données"""
-        if self.conn:
-            self.conn.close()
-            print("✅ Connexion à la base de données fermée")
\ No newline at end of file
+        """Fermer toutes les connexions à la base de données"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local.conn = None
+        self._local.cursor = None
+        self.hasher.shutdown()
+        print("✅ Connexion à la base de données fermée")
+
+
+class BulkWriter:
+    """
+    Session d'écriture groupée sur la base (imports massifs)
+    
+    Les fichiers sont mis en tampon et insérés par lots avec executemany.
+    Chaque lot, comme chaque dossier (son ID est nécessaire aux enfants), est
+    écrit et validé sous `write_lock`, puis le verrou est rendu : l'interface,
+    l'indexeur et la complétion des métadonnées écrivent entre deux lots au
+    lieu d'attendre la fin de l'import. Les hash sont calculés hors verrou.
+    
+    Aucune transaction ne reste ouverte entre deux lots : l'annulation est
+    compensatoire. `discard()` supprime les dossiers et fichiers insérés par
+    la session ; en mode atomique, elle est appelée automatiquement si une
+    exception sort du bloc `with`.
+    """
+    
+    # Nombre maximal de paramètres par requête IN (...)
+    DELETE_CHUNK = 500
+    
+    def __init__(self, db: Database, batch_size: int = 500, atomic: bool = False):
+        self.db = db
+        self.batch_size = max(1, batch_size)
+        self.atomic = atomic
+        self.files_written = 0
+        self.folders_created = 0
+        self._pending_files = []
+        self._folder_panels = {}
+        # Lignes insérées, pour l'annulation compensatoire
+        self._created_folders: List[int] = []
+        self._file_ranges: List[Tuple[int, int]] = []
+    
+    def __enter__(self) -> 'BulkWriter':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+            return False
+        
+        # Le lot en tampon n'a jamais été écrit
+        self._drop_pending()
+        if self.atomic:
+            print(f"↩️ Erreur pendant l'import, annulation: {exc_value}")
+            self.discard()
+        else:
+            print(f"↩️ Dernier lot non écrit: {exc_value}")
+        return False
+    
+    def create_folder(self, name: str, parent_id: Optional[int] = None, panel: str = 'interface_emp') -> int:
+        """Insérer et valider un dossier (hérite du panel du parent)"""
+        if parent_id is not None:
+            parent_panel = self._folder_panels.get(parent_id)
+            if parent_panel is None:
+                parent = self.db.get_folder(parent_id)
+                parent_panel = parent['panel'] if parent else None
+            if parent_panel:
+                panel = parent_panel
+        
+        with self.db.write_lock:
+            try:
+                self.db.cursor.execute(
+                    "INSERT INTO folders (name, parent_id, panel) VALUES (?, ?, ?)",
+                    (name, parent_id, panel)
+                )
+                folder_id = self.db.cursor.lastrowid
+                self.db.conn.commit()
+            except Exception:
+                self.db.conn.rollback()
+                raise
+        
+        self._folder_panels[folder_id] = panel
+        self._created_folders.append(folder_id)
+        self.folders_created += 1
+        return folder_id
+    
+    def add_file(self, folder_id: int, filename: str, filepath: str,
+                 file_size: Optional[int] = None, file_hash: Optional[str] = None):
+        """Mettre un fichier en tampon (taille et hash calculés si absents, en parallèle au flush)"""
+        self._pending_files.append((folder_id, filename, filepath, file_size, file_hash))
+        if len(self._pending_files) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        """Insérer et valider les fichiers en tampon (executemany)"""
+        if not self._pending_files:
+            return
+        rows, self._pending_files = self._pending_files, []
+        try:
+            self._write_rows(rows)
+        finally:
+            # Lignes validées ou abandonnées : lever la réservation des blobs
+            BlobStore.release(row[2] for row in rows)
+    
+    def _write_rows(self, rows: List[tuple]):
+        """Hacher si besoin puis insérer et valider un lot"""
+        # Hacher en une fois, sur tous les cœurs et hors verrou, les fichiers transmis sans hash
+        digests = {}
+        missing = [row[2] for row in rows if row[3] is None or row[4] is None]
+        if missing:
+            digests = self.db.hasher.hash_files(missing, self.db.conn)
+            for index, (folder_id, filename, filepath, file_size, file_hash) in enumerate(rows):
+                digest = digests.get(filepath)
+                if digest is not None:
+                    rows[index] = (
+                        folder_id, filename, filepath,
+                        file_size if file_size is not None else (digest.file_size or 0),
+                        file_hash if file_hash is not None else digest.file_hash
+                    )
+        
+        with self.db.write_lock:
+            try:
+                if digests:
+                    self.db.hasher.remember(self.db.conn, digests.values())
+                self.db.cursor.executemany(
+                    "INSERT INTO files (folder_id, filename, filepath, file_size, file_hash) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                # Un lot occupe des ID consécutifs : aucun autre écrivain n'insère
+                # pendant la transaction, et AUTOINCREMENT ne réutilise pas d'ID
+                last_id = self.db.cursor.execute("SELECT MAX(id) FROM files").fetchone()[0]
+                self.db.conn.commit()
+            except Exception:
+                self.db.conn.rollback()
+                raise
+        
+        first_id = last_id - len(rows) + 1
+        if self._file_ranges and self._file_ranges[-1][1] == first_id - 1:
+            self._file_ranges[-1] = (self._file_ranges[-1][0], last_id)
+        else:
+            self._file_ranges.append((first_id, last_id))
+        self.files_written += len(rows)
+    
+    def _drop_pending(self):
+        """Abandonner le tampon (et la réservation de ses blobs)"""
+        BlobStore.release(row[2] for row in self._pending_files)
+        self._pending_files.clear()
+    
+    def discard(self) -> int:
+        """
+        Supprimer tout ce que la session a inséré (annulation compensatoire)
+        
+        Returns:
+            Nombre de fichiers supprimés
+        """
+        self._drop_pending()
+        removed = 0
+        with self.db.write_lock:
+            try:
+                cursor = self.db.cursor
+                for first_id, last_id in self._file_ranges:
+                    cursor.execute("DELETE FROM files WHERE id BETWEEN ? AND ?", (first_id, last_id))
+                    removed += cursor.rowcount
+                
+                # Dossiers, les plus récents (les plus profonds) d'abord
+                folder_ids = self._created_folders[::-1]
+                for start in range(0, len(folder_ids), self.DELETE_CHUNK):
+                    chunk = folder_ids[start:start + self.DELETE_CHUNK]
+                    placeholders = ','.join(['?'] * len(chunk))
+                    cursor.execute(f"DELETE FROM folders WHERE id IN ({placeholders})", chunk)
+                self.db.conn.commit()
+            except sqlite3.Error as e:
+                self.db.conn.rollback()
+                print(f"❌ Erreur lors de l'annulation de l'import: {e}")
+                return 0
+        
+        print(f"🗑️ Import annulé: {len(self._created_folders)} dossier(s), {removed} fichier(s) supprimés")
+        self._created_folders.clear()
+        self._file_ranges.clear()
+        self.files_written = 0
+        self.folders_created = 0
+        return removed
@@ -30,6 +30,8 @@ except ImportError as e:
 from tkinter import messagebox
 from database import Database
 from utils.file_handler import FileHandler
+from utils.content_indexer import ContentIndexer
+from utils.metadata_backfill import MetadataBackfill
 try:
     from utils.notifications import NotificationManager
     NOTIFICATIONS_AVAILABLE = True
@@ -44,6 +46,8 @@ from ui.login_window import LoginWindow
 from ui.panel_selector_window import PanelSelectorWindow
 from ui.admin_window import AdminWindow
 from ui.search_window import SearchWindow  # ✅ AJOUT DE L'IMPORT
+from ui.page_cache import shared_page_cache
+from utils.render_cache import shared_render_cache, shared_thumbnail_cache
 
 # Configuration du thème CustomTkinter
 ctk.set_appearance_mode("dark")  # "dark" ou "light"
@@ -57,6 +61,25 @@ class CTkinterDnD(ctk.CTk, TkinterDnD.DnDWrapper):
         self.TkdndVersion = TkinterDnD._require(self)
 
 
+# Stockage dédupliqué des uploads (voir migrate_uploads_to_blobs.py pour convertir un répertoire existant)
+CONTENT_ADDRESSED_STORAGE = False
+
+# Profil SQLite (voir database.PRAGMA_PROFILES) : "auto" choisit "network" si la
+# base est sur un lecteur réseau, "performance" (WAL) sinon
+DATABASE_PROFILE = "auto"
+
+# Budget mémoire du cache de pages PDF rendues, partagé par tous les viewers
+PAGE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Cache disque des pages rendues (clé : file_hash), réutilisé d'une session à l'autre
+RENDER_CACHE_DIR = ".render_cache"
+RENDER_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Miniatures des pages (barre latérale du viewer), même clé, budget séparé
+THUMBNAIL_CACHE_DIR = ".thumbnail_cache"
+THUMBNAIL_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
 class PortalApplication:
     """Application principale du Portail Document avec système de panels"""
     
@@ -72,6 +95,9 @@ class PortalApplication:
         self.db = None
         self.file_handler = None
         self.notification_manager = None
+        self.content_indexer = None
+        self.metadata_backfill = None
+        self.backfill_label = None
         
         # État de l'application
         self.current_view = None  # 'home', 'panel', 'admin'
@@ -80,12 +106,20 @@ class PortalApplication:
         self.folder_history = []
         self.is_admin_authenticated = False
         
+        # Caches de pages PDF (mémoire et disque)
+        shared_page_cache.set_budget(PAGE_CACHE_MAX_BYTES)
+        shared_render_cache.configure(RENDER_CACHE_DIR, RENDER_CACHE_MAX_BYTES)
+        shared_thumbnail_cache.configure(THUMBNAIL_CACHE_DIR, THUMBNAIL_CACHE_MAX_BYTES)
+        
         # Initialiser la base de données
         self.init_database()
         
         # Initialiser le gestionnaire de fichiers
         self.init_file_handler()
         
+        # Démarrer l'indexation du contenu en arrière-plan
+        self.init_content_indexer()
+        
         # Initialiser le gestionnaire de notifications
         if NOTIFICATIONS_AVAILABLE:
             self.notification_manager = NotificationManager(self.root)
@@ -93,13 +127,16 @@ class PortalApplication:
         # Configuration de la fenêtre
         self.setup_main_window()
         
+        # Compléter en arrière-plan les tailles et hash des anciens fichiers
+        self.init_metadata_backfill()
+        
         # Afficher l'interface d'accueil
         self.show_home()
     
     def init_database(self):
         """Initialiser la connexion à la base de données"""
         try:
-            self.db = Database("portal.db")
+            self.db = Database("portal.db", profile=DATABASE_PROFILE)
             print("✅ Base de données initialisée avec support des panels")
         except Exception as e:
             messagebox.showerror(
@@ -111,7 +148,7 @@ class PortalApplication:
     def init_file_handler(self):
         """Initialiser le gestionnaire de fichiers"""
         try:
-            self.file_handler = FileHandler("uploads")
+            self.file_handler = FileHandler("uploads", content_addressed=CONTENT_ADDRESSED_STORAGE)
             print("✅ Gestionnaire de fichiers initialisé")
         except Exception as e:
             messagebox.showerror(
@@ -120,6 +157,53 @@ class PortalApplication:
             )
             sys.exit(1)
     
+    def init_content_indexer(self):
+        """Démarrer l'indexeur de contenu (file persistante, reprise au redémarrage)"""
+        if not self.db.fts_available:
+            return
+        try:
+            self.db.enqueue_stale_files()
+            self.content_indexer = ContentIndexer(
+                self.db.db_path,
+                connect=self.db.new_connection,
+                write_lock=self.db.write_lock
+            )
+            self.content_indexer.start()
+        except Exception as e:
+            print(f"⚠️ Indexeur de contenu non démarré: {e}")
+            self.content_indexer = None
+    
+    def init_metadata_backfill(self):
+        """Démarrer le remplissage de file_size / file_hash s'il reste des fichiers"""
+        try:
+            self.metadata_backfill = MetadataBackfill(
+                self.db.db_path,
+                connect=self.db.new_connection,
+                write_lock=self.db.write_lock,
+                hasher=self.db.hasher
+            )
+            if self.metadata_backfill.start():
+                self.backfill_label.pack(side="left", padx=(0, 15), before=self.search_button)
+                self.update_backfill_progress()
+            else:
+                self.metadata_backfill = None
+        except Exception as e:
+            print(f"⚠️ Remplissage des métadonnées non démarré: {e}")
+            self.metadata_backfill = None
+    
+    def update_backfill_progress(self):
+        """Afficher la progression du remplissage dans la barre de navigation"""
+        if not self.metadata_backfill:
+            return
+        done, total = self.metadata_backfill.progress()
+        if self.metadata_backfill.is_running():
+            percent = int(done * 100 / total) if total else 0
+            self.backfill_label.configure(text=f"⏳ Analyse des fichiers: {done}/{total} ({percent}%)")
+            self.root.after(500, self.update_backfill_progress)
+        else:
+            self.backfill_label.pack_forget()
+            self.metadata_backfill = None
+    
     def setup_main_window(self):
         """Configurer la fenêtre principale"""
         self.root.title("Portail Document - SNTP")
@@ -175,6 +259,14 @@ class PortalApplication:
         right_frame = ctk.CTkFrame(self.navbar, fg_color="transparent")
         right_frame.pack(side="right", padx=30, pady=15)
         
+        # Progression du remplissage des métadonnées (affichée s'il est en cours)
+        self.backfill_label = ctk.CTkLabel(
+            right_frame,
+            text="",
+            font=ctk.CTkFont(size=12),
+            text_color=("#a0a0a0", "#808080")
+        )
+        
         # ✅ BOUTON RECHERCHE (AJOUTÉ)
         self.search_button = ctk.CTkButton(
             right_frame,
@@ -649,6 +741,10 @@ class PortalApplication:
         """Rafraîchir le contenu affiché"""
         print("🔄 Rafraîchissement du contenu")
         
+        # Fichiers ajoutés ou modifiés : indexer sans attendre la prochaine scrutation
+        if self.content_indexer:
+            self.content_indexer.notify()
+        
         if self.notification_manager:
             self.notification_manager.show_app_notification(
                 "🔄 Mise à jour",
@@ -670,6 +766,7 @@ class PortalApplication:
         """Démarrer l'application"""
         try:
             self.root.mainloop()
+            self.cleanup()
         except KeyboardInterrupt:
             print("\n⚠️ Interruption par l'utilisateur")
             self.cleanup()
@@ -680,6 +777,12 @@ class PortalApplication:
     
     def cleanup(self):
         """Nettoyer les ressources avant de quitter"""
+        if self.metadata_backfill:
+            self.metadata_backfill.stop()
+            self.metadata_backfill = None
+        if self.content_indexer:
+            self.content_indexer.stop()
+            self.content_indexer = None
         if self.db:
             self.db.close()
         print("👋 Application fermée")
@@ -0,0 +1,179 @@
+import sqlite3
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.blob_store import BlobStore
+from utils.hashing import HashingService
+
+
+def migrate_uploads_to_blobs(db_path="portal.db", upload_dir="uploads", dry_run=False, batch_size=200):
+    """
+    Convertir le répertoire d'upload existant vers le stockage dédupliqué
+
+    Chaque fichier est déplacé vers `<upload_dir>/.blobs/` sous le nom de son hash ;
+    les doublons sont supprimés et leurs lignes pointent vers le blob existant.
+    Le hash est recalculé (le `file_hash` stocké peut être périmé) et un
+    original n'est supprimé que si le blob cible existe et a la même taille.
+    Le script peut être relancé : les lignes déjà migrées sont ignorées et un
+    fichier déplacé avant un arrêt brutal est retrouvé grâce à son hash, validé
+    dans la base avant le déplacement.
+    """
+    store = BlobStore(os.path.join(upload_dir, ".blobs"))
+    hasher = HashingService()
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+
+    stats = {'moved': 0, 'deduplicated': 0, 'already': 0, 'missing': 0, 'bytes_saved': 0}
+    # Hash -> chemin du contenu déjà en place (blob, ou original en simulation)
+    blobs = {}
+    to_remove = []
+
+    def commit_batch():
+        """Valider le lot puis supprimer les doublons devenus inutiles"""
+        conn.commit()
+        for path in to_remove:
+            try:
+                os.remove(path)
+            except OSError as e:
+                print(f"⚠️ Impossible de supprimer {path}: {e}")
+        to_remove.clear()
+
+    def update_row(file_id, blob_path, file_hash, file_size):
+        cursor.execute(
+            "UPDATE files SET filepath = ?, file_hash = ?, file_size = ? WHERE id = ?",
+            (blob_path, file_hash, file_size, file_id)
+        )
+        # Le contenu n'a pas changé : inutile de le réindexer
+        try:
+            cursor.execute("""
+                DELETE FROM index_queue WHERE file_id = ?
+                AND file_hash IS (SELECT file_hash FROM content_index_state WHERE file_id = ?)
+            """, (file_id, file_id))
+        except sqlite3.OperationalError:
+            pass
+
+    try:
+        cursor.execute("SELECT id, filename, filepath, file_size, file_hash FROM files ORDER BY id")
+        rows = cursor.fetchall()
+        print(f"📊 {len(rows)} fichier(s) à examiner{' (simulation)' if dry_run else ''}")
+
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            # Hacher en une fois, en parallèle, les originaux encore à déplacer
+            digests = hasher.hash_files(
+                [row['filepath'] for row in batch
+                 if not store.contains(row['filepath']) and os.path.exists(row['filepath'])],
+                conn
+            )
+            hasher.remember(conn, digests.values())
+
+            if not dry_run:
+                # Valider les hash recalculés avant tout déplacement : après un arrêt
+                # entre un déplacement et la validation du lot, la reprise retrouve
+                # le blob sous le hash stocké dans la ligne
+                cursor.executemany(
+                    "UPDATE files SET file_hash = ? WHERE id = ? AND file_hash IS NOT ?",
+                    [(digests[row['filepath']].file_hash, row['id'], digests[row['filepath']].file_hash)
+                     for row in batch
+                     if row['filepath'] in digests and digests[row['filepath']].file_hash]
+                )
+                conn.commit()
+
+            for row in batch:
+                filepath = row['filepath']
+                extension = os.path.splitext(row['filename'])[1]
+
+                if store.contains(filepath):
+                    # Le nom du blob est son hash
+                    blobs.setdefault(os.path.splitext(os.path.basename(filepath))[0], filepath)
+                    stats['already'] += 1
+                    continue
+
+                if not os.path.exists(filepath):
+                    # Reprise après interruption : le fichier a déjà été déplacé
+                    blob_path = ""
+                    if row['file_hash']:
+                        blob_path = blobs.get(row['file_hash']) or store.blob_path(row['file_hash'], extension)
+                    if blob_path and os.path.exists(blob_path):
+                        if not dry_run:
+                            update_row(row['id'], blob_path, row['file_hash'], os.path.getsize(blob_path))
+                        stats['moved'] += 1
+                    else:
+                        print(f"⚠️ Fichier introuvable (ID {row['id']}): {filepath}")
+                        stats['missing'] += 1
+                    continue
+
+                # Ne jamais se fier au hash stocké avant de supprimer un original
+                file_hash = digests[filepath].file_hash
+                if not file_hash:
+                    stats['missing'] += 1
+                    continue
+                file_size = os.path.getsize(filepath)
+
+                # Cible de déduplication : le blob réellement présent, quelle que soit son extension
+                target = blobs.get(file_hash)
+                if target is None and os.path.exists(store.blob_path(file_hash, extension)):
+                    target = store.blob_path(file_hash, extension)
+
+                if target and os.path.exists(target) and os.path.getsize(target) == file_size:
+                    stats['deduplicated'] += 1
+                    stats['bytes_saved'] += file_size
+                    if not dry_run:
+                        update_row(row['id'], target, file_hash, file_size)
+                        to_remove.append(filepath)
+                    blobs.setdefault(file_hash, target)
+                else:
+                    stats['moved'] += 1
+                    blob_path = store.blob_path(file_hash, extension)
+                    if not dry_run:
+                        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                        os.replace(filepath, blob_path)
+                        update_row(row['id'], blob_path, file_hash, file_size)
+                        blobs[file_hash] = blob_path
+                    else:
+                        blobs[file_hash] = filepath
+
+            if not dry_run:
+                commit_batch()
+                print(f"   ... {start + len(batch)}/{len(rows)}")
+
+        if not dry_run:
+            commit_batch()
+            remove_empty_directories(upload_dir, store.root_dir)
+
+        print(f"✅ Migration {'simulée' if dry_run else 'terminée'}: "
+              f"{stats['moved']} déplacé(s), {stats['deduplicated']} doublon(s), "
+              f"{stats['already']} déjà migré(s), {stats['missing']} introuvable(s)")
+        print(f"💾 Espace libéré: {stats['bytes_saved'] / (1024 * 1024):.2f} MB")
+        return stats
+
+    except Exception as e:
+        print(f"❌ Erreur lors de la migration: {e}")
+        conn.rollback()
+        raise
+    finally:
+        hasher.shutdown()
+        conn.close()
+
+
+def remove_empty_directories(upload_dir: str, blob_root: str):
+    """Supprimer les anciens sous-dossiers d'upload devenus vides"""
+    blob_root = os.path.abspath(blob_root)
+    for root, dirs, files in os.walk(upload_dir, topdown=False):
+        if os.path.abspath(root).startswith(blob_root) or os.path.abspath(root) == os.path.abspath(upload_dir):
+            continue
+        if not os.listdir(root):
+            os.rmdir(root)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrer uploads/ vers le stockage dédupliqué")
+    parser.add_argument("--db", default="portal.db", help="Chemin de la base de données")
+    parser.add_argument("--uploads", default="uploads", help="Répertoire d'upload")
+    parser.add_argument("--dry-run", action="store_true", help="Afficher l'espace récupérable sans rien modifier")
+    args = parser.parse_args()
+    migrate_uploads_to_blobs(args.db, args.uploads, dry_run=args.dry_run)
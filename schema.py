@@ -0,0 +1,51 @@
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet
+
+
+@dataclass(frozen=True)
+class SchemaInfo:
+    """
+    Instantané du schéma SQLite : tables, colonnes et version de migration
+
+    Lu une seule fois à la connexion (et après chaque migration) pour que les
+    méthodes de lecture ne relancent pas `PRAGMA table_info` à chaque appel.
+    L'objet est immuable : un rafraîchissement remplace l'instance entière,
+    ce qui le rend sûr à partager entre threads.
+    """
+    tables: Dict[str, FrozenSet[str]] = field(default_factory=dict)
+    version: int = 0
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection) -> "SchemaInfo":
+        """Lire le schéma en une seule requête"""
+        rows = conn.execute("""
+            SELECT m.name, p.name
+            FROM sqlite_master m
+            LEFT JOIN pragma_table_info(m.name) p
+            WHERE m.type = 'table'
+        """).fetchall()
+
+        columns: Dict[str, set] = {}
+        for table, column in rows:
+            names = columns.setdefault(table, set())
+            if column is not None:
+                names.add(column)
+
+        # Dernière migration appliquée (voir Database.MIGRATIONS)
+        version = 0
+        if 'schema_version' in columns:
+            version = conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+        return cls({table: frozenset(names) for table, names in columns.items()}, version)
+
+    def has_table(self, table: str) -> bool:
+        """La table existe-t-elle ?"""
+        return table in self.tables
+
+    def has_column(self, table: str, column: str) -> bool:
+        """La colonne existe-t-elle dans la table ?"""
+        return column in self.tables.get(table, ())
+
+    def columns(self, table: str) -> FrozenSet[str]:
+        """Colonnes d'une table (ensemble vide si elle n'existe pas)"""
+        return self.tables.get(table, frozenset())
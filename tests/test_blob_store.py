@@ -0,0 +1,70 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.blob_store import BlobStore
+
+
+class BlobClaimTest(unittest.TestCase):
+    """Un blob rendu par commit() n'est pas supprimé avant l'insertion de sa ligne"""
+
+    HASH = "ab" * 32
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = BlobStore(os.path.join(self.tmp.name, ".blobs"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def stage(self, content: bytes = b"contenu") -> str:
+        temp_path = self.store.new_temp_path(".pdf")
+        with open(temp_path, "wb") as f:
+            f.write(content)
+        return temp_path
+
+    def test_existing_blob_is_claimed_until_release(self):
+        blob_path, created = self.store.commit(self.stage(), self.HASH, ".pdf")
+        self.assertTrue(created)
+        BlobStore.release([blob_path])
+
+        # Doublon : le blob existant est rendu, il ne doit plus pouvoir disparaître
+        duplicate_path, created = self.store.commit(self.stage(), self.HASH, ".pdf")
+        self.assertFalse(created)
+        self.assertEqual(duplicate_path, blob_path)
+        self.assertFalse(BlobStore.remove_if_unclaimed(blob_path))
+        self.assertTrue(os.path.exists(blob_path))
+
+        BlobStore.release([duplicate_path])
+        self.assertTrue(BlobStore.remove_if_unclaimed(blob_path))
+        self.assertFalse(os.path.exists(blob_path))
+
+    def test_claims_are_counted(self):
+        first, _ = self.store.commit(self.stage(), self.HASH, ".pdf")
+        second, _ = self.store.commit(self.stage(), self.HASH, ".pdf")
+        BlobStore.release([first])
+        self.assertFalse(BlobStore.remove_if_unclaimed(second))
+        BlobStore.release([second])
+        self.assertTrue(BlobStore.remove_if_unclaimed(second))
+
+    def test_blob_removed_before_commit_is_recreated(self):
+        blob_path, _ = self.store.commit(self.stage(), self.HASH, ".pdf")
+        BlobStore.release([blob_path])
+        self.assertTrue(BlobStore.remove_if_unclaimed(blob_path))
+
+        # La suppression est passée avant : commit() replace le contenu
+        blob_path, created = self.store.commit(self.stage(), self.HASH, ".pdf")
+        self.assertTrue(created)
+        self.assertTrue(os.path.exists(blob_path))
+        BlobStore.release([blob_path])
+
+    def test_release_of_unclaimed_path_is_harmless(self):
+        BlobStore.release([os.path.join(self.tmp.name, "absent.pdf")])
+        self.assertFalse(BlobStore.remove_if_unclaimed(os.path.join(self.tmp.name, "absent.pdf")))
+
+
+if __name__ == "__main__":
+    unittest.main()
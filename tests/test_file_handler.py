@@ -0,0 +1,75 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import file_handler
+from utils.file_handler import FileHandler
+
+
+class FailingHash:
+    """SHA256 qui échoue au deuxième bloc : la copie s'interrompt en cours de route"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def update(self, chunk):
+        self.calls += 1
+        if self.calls == 2:
+            raise OSError("lecture interrompue")
+
+    def hexdigest(self):
+        return ""
+
+
+class CopyFailureTest(unittest.TestCase):
+    """Une copie qui échoue en cours de route ne laisse aucun fichier dans uploads"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.upload_dir = os.path.join(self.tmp.name, "uploads")
+        self.source = os.path.join(self.tmp.name, "source.pdf")
+        with open(self.source, "wb") as f:
+            f.write(os.urandom(64 * 1024))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def uploaded_files(self):
+        return [
+            os.path.join(root, name)
+            for root, _, files in os.walk(self.upload_dir)
+            for name in files
+        ]
+
+    def copy_with_failure(self, handler):
+        with mock.patch.object(FileHandler, "COPY_BUFFER_SIZE", 4096), \
+                mock.patch.object(file_handler.hashlib, "sha256", FailingHash):
+            return handler.save_file_with_hash(self.source, "source.pdf", "dossier")
+
+    def test_partial_copy_removed(self):
+        success, dest_path, _, _ = self.copy_with_failure(FileHandler(self.upload_dir))
+        self.assertFalse(success)
+        self.assertEqual(dest_path, "")
+        self.assertEqual(self.uploaded_files(), [])
+
+    def test_partial_blob_removed(self):
+        success, _, _, _ = self.copy_with_failure(FileHandler(self.upload_dir, content_addressed=True))
+        self.assertFalse(success)
+        self.assertEqual(self.uploaded_files(), [])
+
+    def test_copy_and_hash_cleans_up_and_raises(self):
+        os.makedirs(self.upload_dir)
+        dest_path = os.path.join(self.upload_dir, "copie.pdf")
+        with mock.patch.object(FileHandler, "COPY_BUFFER_SIZE", 4096), \
+                mock.patch.object(file_handler.hashlib, "sha256", FailingHash):
+            with self.assertRaises(OSError):
+                FileHandler.copy_and_hash(self.source, dest_path)
+        self.assertFalse(os.path.exists(dest_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from migrate_uploads_to_blobs import migrate_uploads_to_blobs
+
+
+class MigrationCrashTest(unittest.TestCase):
+    """Un arrêt entre le déplacement d'un fichier et la validation du lot est rattrapé à la reprise"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.upload_dir = os.path.join(self.tmp.name, "uploads")
+        self.db_path = os.path.join(self.tmp.name, "portal.db")
+        os.makedirs(os.path.join(self.upload_dir, "dossier"))
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE files (
+                id INTEGER PRIMARY KEY,
+                filename TEXT,
+                filepath TEXT,
+                file_size INTEGER,
+                file_hash TEXT
+            )
+        """)
+        contents = [b"premier", b"second", b"premier", b"troisieme"]
+        for i, content in enumerate(contents, 1):
+            path = os.path.join(self.upload_dir, "dossier", f"doc{i}.pdf")
+            with open(path, "wb") as f:
+                f.write(content)
+            # Hash stocké absent : seul le hash recalculé permet de retrouver le blob
+            conn.execute(
+                "INSERT INTO files (id, filename, filepath, file_size, file_hash) VALUES (?, ?, ?, NULL, NULL)",
+                (i, f"doc{i}.pdf", path)
+            )
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def rows(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("SELECT id, filepath, file_hash FROM files ORDER BY id").fetchall()
+        finally:
+            conn.close()
+
+    def blob_files(self):
+        return sorted(
+            os.path.join(root, name)
+            for root, _, files in os.walk(os.path.join(self.upload_dir, ".blobs"))
+            for name in files
+        )
+
+    def test_resume_after_crash_between_move_and_commit(self):
+        real_replace = os.replace
+        moves = []
+
+        def crash_after_second_move(src, dst):
+            real_replace(src, dst)
+            moves.append(dst)
+            if len(moves) == 2:
+                raise RuntimeError("arrêt brutal")
+
+        with mock.patch("os.replace", side_effect=crash_after_second_move):
+            with self.assertRaises(RuntimeError):
+                migrate_uploads_to_blobs(self.db_path, self.upload_dir)
+
+        # Les fichiers ont quitté leur dossier mais les lignes pointent encore vers l'ancien chemin
+        self.assertEqual(len(moves), 2)
+        self.assertTrue(all(not filepath.startswith(os.path.join(self.upload_dir, ".blobs"))
+                            for _, filepath, _ in self.rows()))
+
+        stats = migrate_uploads_to_blobs(self.db_path, self.upload_dir)
+        self.assertEqual(stats['missing'], 0)
+        self.assertEqual(stats['deduplicated'], 1)
+
+        rows = self.rows()
+        for _, filepath, file_hash in rows:
+            self.assertTrue(os.path.exists(filepath))
+            self.assertEqual(os.path.splitext(os.path.basename(filepath))[0], file_hash)
+        # Aucun blob orphelin, aucun original restant
+        self.assertEqual(self.blob_files(), sorted({filepath for _, filepath, _ in rows}))
+        self.assertEqual(os.listdir(self.upload_dir), [".blobs"])
+
+
+if __name__ == "__main__":
+    unittest.main()
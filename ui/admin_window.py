@@ -3,6 +3,7 @@ from tkinter import messagebox, filedialog
 from tkinterdnd2 import DND_FILES
 from typing import Callable, Optional
 import os
+import threading
 class AdminWindow:
     """Fenêtre d'administration modernisée avec support des panels"""
    
@@ -177,8 +178,13 @@ class AdminWindow:
         for widget in self.folders_list.winfo_children():
             widget.destroy()
        
-        # Charger les dossiers racine du panel
-        root_folders = self.db.get_subfolders(None, panel=self.panel)
+        # Charger toute l'arborescence du panel en une seule requête
+        tree = self.db.get_subtree(None, panel=self.panel)
+        root_folders = [folder for folder in tree if folder['depth'] == 0]
+        children = {}
+        for folder in tree:
+            if folder['depth'] > 0:
+                children.setdefault(folder['parent_id'], []).append(folder)
        
         if not root_folders:
             ctk.CTkLabel(
@@ -190,10 +196,10 @@ class AdminWindow:
             return
        
         for folder in root_folders:
-            self.insert_folder_card(self.folders_list, folder, level=0)
+            self.insert_folder_card(self.folders_list, folder, level=0, children=children)
    
-    def insert_folder_card(self, parent, folder: dict, level: int):
-        """Insérer une carte de dossier"""
+    def insert_folder_card(self, parent, folder: dict, level: int, children: dict = None):
+        """Insérer une carte de dossier (children : sous-dossiers par parent_id, issus de get_subtree)"""
         # Frame principale de la carte
         card = ctk.CTkFrame(
             parent,
@@ -217,7 +223,10 @@ class AdminWindow:
         name_frame.pack(side="left")
        
         # Récupérer les sous-dossiers pour vérifier s'il y en a
-        subfolders = self.db.get_subfolders(folder['id'])
+        if children is not None:
+            subfolders = children.get(folder['id'], [])
+        else:
+            subfolders = self.db.get_subfolders(folder['id'])
         has_subfolders = len(subfolders) > 0
        
         if has_subfolders:
@@ -243,7 +252,7 @@ class AdminWindow:
            
             # Insérer les sous-dossiers dans le conteneur
             for subfolder in subfolders:
-                self.insert_folder_card(children_container, subfolder, level + 1)
+                self.insert_folder_card(children_container, subfolder, level + 1, children)
        
         # Icône du dossier
         ctk.CTkLabel(
@@ -262,7 +271,10 @@ class AdminWindow:
             anchor="w"
         ).pack(anchor="w")
        
-        file_count = self.db.count_files_in_folder(folder['id'], recursive=True)
+        if 'total_file_count' in folder:
+            file_count = folder['total_file_count']
+        else:
+            file_count = self.db.count_files_in_folder(folder['id'], recursive=True)
         ctk.CTkLabel(
             info_frame,
             text=f"{file_count} fichier{'s' if file_count > 1 else ''} • ID: {folder['id']}",
@@ -396,45 +408,42 @@ class AdminWindow:
            
             progress_window.update()
            
-            # Callback de progression
+            # Progression publiée par le thread d'import, relevée par le thread Tk
+            state = {'current': 0, 'total': total_files, 'done': False, 'count': 0, 'error': None}
+           
             def progress_callback(current, total):
-                progress = current / total
-                self.progress_bar.set(progress)
-                self.status_label.configure(text=f"Importation... ({current}/{total} fichiers)")
-                progress_window.update_idletasks()
+                state['current'] = current
+                state['total'] = total
            
             # Importer dans le panel spécifique
             print(f"\n{'='*70}")
             print(f"🚀 IMPORT PANEL {self.panel}: {folder_path}")
             print(f"{'='*70}")
            
-            count = self.file_handler.save_files_from_folder_with_panel(
-                folder_path, self.db, None, self.panel, progress_callback=progress_callback, total=total_files
-            )
-           
-            print(f"{'='*70}")
-            print(f"✅ FIN: {count} fichiers")
-            print(f"{'='*70}\n")
-           
-            progress_window.destroy()
-           
-            if count > 0:
-                messagebox.showinfo(
-                    "Succès",
-                    f"✅ Importation réussie dans {self.panel_info['name']} !\n\n"
-                    f"📊 {count} fichier(s) importé(s)\n"
-                    f"📁 {os.path.basename(folder_path)}"
-                )
-            else:
-                messagebox.showwarning(
-                    "Attention",
-                    f"⚠️ Aucun fichier importé\n\n"
-                    f"Formats acceptés: PDF, Word, Excel"
-                )
+            def run_import():
+                try:
+                    state['count'] = self.file_handler.save_files_from_folder_with_panel(
+                        folder_path, self.db, None, self.panel, progress_callback=progress_callback, total=total_files
+                    )
+                except Exception as e:
+                    state['error'] = e
+                finally:
+                    self.db.release_connection()
+                    state['done'] = True
            
-            self.load_folders()
-            self.on_changes()
+            def poll_import():
+                if state['total']:
+                    self.progress_bar.set(state['current'] / state['total'])
+                    self.status_label.configure(text=f"Importation... ({state['current']}/{state['total']} fichiers)")
+                if state['done']:
+                    self.finish_folder_import(progress_window, folder_path, state)
+                else:
+                    progress_window.after(100, poll_import)
            
+            # L'import s'exécute hors du thread Tk : la fenêtre reste réactive
+            threading.Thread(target=run_import, name="FolderImport", daemon=True).start()
+            poll_import()
+       
         except Exception as e:
             if 'progress_window' in locals():
                 progress_window.destroy()
@@ -442,6 +451,36 @@ class AdminWindow:
             import traceback
             traceback.print_exc()
    
+    def finish_folder_import(self, progress_window, folder_path: str, state: dict):
+        """Terminer un import de dossier (thread Tk)"""
+        progress_window.destroy()
+       
+        if state['error'] is not None:
+            messagebox.showerror("Erreur", f"❌ Impossible d'importer:\n\n{state['error']}")
+            return
+       
+        count = state['count']
+        print(f"{'='*70}")
+        print(f"✅ FIN: {count} fichiers")
+        print(f"{'='*70}\n")
+       
+        if count > 0:
+            messagebox.showinfo(
+                "Succès",
+                f"✅ Importation réussie dans {self.panel_info['name']} !\n\n"
+                f"📊 {count} fichier(s) importé(s)\n"
+                f"📁 {os.path.basename(folder_path)}"
+            )
+        else:
+            messagebox.showwarning(
+                "Attention",
+                f"⚠️ Aucun fichier importé\n\n"
+                f"Formats acceptés: PDF, Word, Excel"
+            )
+       
+        self.load_folders()
+        self.on_changes()
+   
     def create_folder(self):
         """Créer un nouveau dossier dans le panel"""
         dialog = ctk.CTkInputDialog(
@@ -731,22 +770,23 @@ class AdminWindow:
             # Récupérer les infos du dossier
             folder = self.db.get_folder(folder_id)
             folder_name = folder['name'] if folder else "Racine"
+            rows = []
            
             for file_path in file_paths:
                 filename = os.path.basename(file_path)
                
                 if self.file_handler.is_allowed_file(filename):
                     # Sauvegarder le fichier
-                    success, dest_path = self.file_handler.save_file(
+                    success, dest_path, file_hash, file_size = self.file_handler.save_file_with_hash(
                         file_path,
                         filename,
                         folder_name
                     )
                    
                     if success:
-                        self.db.add_file(folder_id, filename, dest_path)
+                        rows.append((folder_id, filename, dest_path, file_size, file_hash))
                         success_count += 1
-                        print(f"✅ Fichier importé: {filename}")
+                        print(f"✅ Fichier copié: {filename}")
                     else:
                         error_count += 1
                         print(f"❌ Échec import: {filename}")
@@ -754,6 +794,14 @@ class AdminWindow:
                     error_count += 1
                     print(f"⚠️ Extension non autorisée: {filename}")
            
+            # Enregistrer tous les fichiers en une seule transaction
+            try:
+                self.db.add_files_bulk(rows)
+            except Exception:
+                # Transaction annulée : retirer aussi les copies physiques non référencées
+                self.db.remove_unreferenced_files([row[2] for row in rows])
+                raise
+           
             # Messages de résultat
             if error_count == 0:
                 messagebox.showinfo(
@@ -981,6 +1029,7 @@ class FileManagerWindow:
             return
        
         try:
+            rows = []
             success_count = 0
             error_count = 0
            
@@ -988,20 +1037,28 @@ class FileManagerWindow:
                 filename = os.path.basename(file_path)
                
                 if self.file_handler.is_allowed_file(filename):
-                    success, dest_path = self.file_handler.save_file(
+                    success, dest_path, file_hash, file_size = self.file_handler.save_file_with_hash(
                         file_path,
                         filename,
                         self.folder['name']
                     )
                    
                     if success:
-                        self.db.add_file(self.folder['id'], filename, dest_path)
+                        rows.append((self.folder['id'], filename, dest_path, file_size, file_hash))
                         success_count += 1
                     else:
                         error_count += 1
                 else:
                     error_count += 1
            
+            # Enregistrer tous les fichiers en une seule transaction
+            try:
+                self.db.add_files_bulk(rows)
+            except Exception:
+                # Transaction annulée : retirer aussi les copies physiques non référencées
+                self.db.remove_unreferenced_files([row[2] for row in rows])
+                raise
+           
             if error_count == 0:
                 messagebox.showinfo(
                     "Succès",
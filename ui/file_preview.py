@@ -120,29 +120,43 @@ class FilePreviewWindow:
             canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
             scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
             
-            # Ouvrir le PDF
-            doc = fitz.open(self.file['filepath'])
+            # Pages déjà rendues : le cache disque évite d'ouvrir le PDF
+            from utils.render_cache import shared_render_cache
+            file_hash = self.file.get('file_hash')
+            doc = None
+            total_pages = shared_render_cache.page_count(file_hash) if file_hash else None
+            if total_pages is None:
+                doc = fitz.open(self.file['filepath'])
+                total_pages = len(doc)
+                if file_hash:
+                    shared_render_cache.set_page_count(file_hash, total_pages)
             
             # Afficher les premières pages (limite à 5 pour les performances)
-            max_pages = min(5, len(doc))
+            max_pages = min(5, total_pages)
             
             tk.Label(
                 scrollable_frame,
-                text=f"📄 Affichage des {max_pages} première(s) page(s) sur {len(doc)}",
+                text=f"📄 Affichage des {max_pages} première(s) page(s) sur {total_pages}",
                 font=('Segoe UI', 10),
                 bg='#f0f0f0',
                 fg='#6c757d'
             ).pack(pady=10)
             
             for page_num in range(max_pages):
-                page = doc[page_num]
-                pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # Zoom x2
-                
                 # Convertir en image PIL puis PhotoImage
-                from PIL import Image, ImageTk
-                import io
+                from PIL import ImageTk
+                from utils.pdf_render import pixmap_to_image
+                
+                img = shared_render_cache.get(file_hash, page_num, 2) if file_hash else None
+                if img is None:
+                    if doc is None:
+                        doc = fitz.open(self.file['filepath'])
+                    page = doc[page_num]
+                    pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # Zoom x2
+                    img = pixmap_to_image(pix)
+                    if file_hash:
+                        shared_render_cache.put(file_hash, page_num, 2, img)
                 
-                img = Image.open(io.BytesIO(pix.tobytes()))
                 photo = ImageTk.PhotoImage(img)
                 
                 # Frame pour chaque page
@@ -160,7 +174,8 @@ class FilePreviewWindow:
                 label.image = photo  # Garder une référence
                 label.pack(padx=10, pady=10)
             
-            doc.close()
+            if doc is not None:
+                doc.close()
             
             # Scroll avec molette
             def on_mousewheel(event):
@@ -166,10 +166,12 @@ class FolderView(ctk.CTkFrame):
             wraplength=280
         ).pack(pady=(0, 5))
         
-        try:
-            file_count = self.db.count_files_in_folder(folder['id'], recursive=True)
-        except:
-            file_count = 0
+        file_count = folder.get('total_file_count')
+        if file_count is None:
+            try:
+                file_count = self.db.count_files_in_folder(folder['id'], recursive=True)
+            except:
+                file_count = 0
             
         ctk.CTkLabel(
             card,
@@ -227,7 +229,7 @@ class FolderView(ctk.CTkFrame):
         name_label.pack(fill="x")
         
         try:
-            size = file.get('file_size', 0)
+            size = file.get('file_size') or 0
             if size == 0 and os.path.exists(file['filepath']):
                 size = os.path.getsize(file['filepath'])
             size_formatted = self.format_file_size(size)
@@ -281,7 +283,7 @@ class FolderView(ctk.CTkFrame):
             try:
                 from ui.pdf_viewer import PDFViewer
                 pdf_window = ctk.CTkToplevel(self.winfo_toplevel())
-                PDFViewer(pdf_window, file['filepath'], file['filename'])
+                PDFViewer(pdf_window, file['filepath'], file['filename'], file.get('file_hash'))
                 print(f"✅ PDF ouvert dans le viewer intégré: {file['filename']}")
             except ImportError:
                 messagebox.showerror(
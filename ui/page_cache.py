@@ -0,0 +1,123 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Budget mémoire par défaut du cache de pages rendues
+DEFAULT_PAGE_CACHE_BYTES = 256 * 1024 * 1024
+
+
+def zoom_bucket(zoom: float) -> int:
+    """Niveau de zoom en pourcentage entier (clé stable, contrairement au flottant)"""
+    return int(round(zoom * 100))
+
+
+def document_key(filepath: str, file_hash: Optional[str] = None) -> str:
+    """
+    Identifiant d'un document pour les caches de rendu
+
+    Le hash du contenu est préféré : deux copies du même PDF partagent leurs
+    pages. À défaut, chemin, taille et date de modification.
+    """
+    if file_hash:
+        return file_hash
+    try:
+        stat = os.stat(filepath)
+        return f"{os.path.abspath(filepath)}:{stat.st_size}:{stat.st_mtime_ns}"
+    except OSError:
+        return os.path.abspath(filepath)
+
+
+class PageCache:
+    """
+    Cache LRU des pages rendues, borné en octets
+
+    Clés : (document, page, zoom_bucket), suivies de (colonne, ligne) pour
+    les tuiles des forts zooms. Chaque entrée déclare son poids ;
+    les entrées les moins récemment utilisées sont évincées dès que le total
+    dépasse le budget. Une instance unique (`shared_page_cache`) est partagée
+    par toutes les fenêtres de visualisation.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_PAGE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def key(document: str, page_num: int, zoom: float) -> Tuple[str, int, int]:
+        return (document, page_num, zoom_bucket(zoom))
+
+    @staticmethod
+    def tile_key(document: str, page_num: int, zoom: float,
+                 tile: Tuple[int, int]) -> Tuple[str, int, int, int, int]:
+        return (document, page_num, zoom_bucket(zoom), tile[0], tile[1])
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Valeur en cache (marquée comme la plus récente), ou None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def put(self, key: Hashable, value: Any, nbytes: int):
+        """Ajouter une entrée de `nbytes` octets et évincer si le budget est dépassé"""
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, nbytes)
+            self._bytes += nbytes
+            self._evict()
+
+    def set_budget(self, max_bytes: int):
+        """Modifier le budget (évince immédiatement si nécessaire)"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def discard_document(self, document: str):
+        """Retirer toutes les pages d'un document"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == document]:
+                self._bytes -= self._entries.pop(key)[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Statistiques d'utilisation"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+            }
+
+    def _evict(self):
+        # La dernière entrée ajoutée est toujours gardée, même plus grosse que le budget
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self._bytes -= nbytes
+            self._evictions += 1
+
+
+# Cache partagé par toutes les fenêtres PDFViewer
+shared_page_cache = PageCache()
@@ -0,0 +1,163 @@
+import queue
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from utils.pdf_render import render_page, render_tile
+from utils.render_cache import PageRect, RenderCache
+
+# Tuile d'une page : (colonne, ligne)
+Tile = Tuple[int, int]
+
+
+class PageRenderer:
+    """
+    Rendu des pages PDF dans un thread dédié
+
+    Le thread ouvre sa propre instance du document (PyMuPDF ne partage pas un
+    document entre threads), seulement si une page manque au cache disque. `schedule` remplace les demandes en attente par
+    une nouvelle liste ordonnée : la page affichée d'abord, puis ses voisines.
+    Un saut de page annule ainsi les rendus devenus inutiles ; seul le rendu
+    déjà commencé va à son terme. Une demande peut viser une tuile
+    (colonne, ligne) plutôt que la page entière ; les tuiles ne passent pas
+    par le cache disque. Les images sont remises au thread Tk via une file
+    relevée avec `after`. Les dimensions de chaque page rastérisée sont
+    mémorisées (en mémoire et dans le cache disque) avant la remise de
+    l'image : le viewer n'ouvre pas le document pour les connaître.
+    """
+
+    def __init__(self, widget, filepath: str,
+                 on_rendered: Callable[[int, float, Optional[Tile], Optional[Image.Image], Optional[Exception]], None],
+                 poll_ms: int = 30, file_hash: Optional[str] = None,
+                 render_cache: Optional[RenderCache] = None):
+        """
+        Args:
+            widget: Widget Tk utilisé pour planifier les callbacks (after)
+            filepath: Chemin du PDF
+            on_rendered: Reçoit (page, zoom, tuile, image, erreur) sur le thread Tk
+            poll_ms: Intervalle de relève des résultats
+            file_hash: Hash du document, clé du cache disque
+            render_cache: Cache disque des pages (utilisé si file_hash est connu)
+        """
+        self.widget = widget
+        self.filepath = filepath
+        self.on_rendered = on_rendered
+        self.poll_ms = poll_ms
+        self.file_hash = file_hash
+        self.render_cache = render_cache if file_hash else None
+
+        self._jobs: "deque[Tuple[int, float, Optional[Tile]]]" = deque()
+        self._jobs_ready = threading.Condition()
+        self._results: "queue.Queue[tuple]" = queue.Queue()
+        self._running = True
+        self._poll_id: Optional[str] = None
+        self._in_flight = 0
+        # Dimensions des pages déjà rastérisées (écrites par le thread de rendu)
+        self._page_rects: Dict[int, PageRect] = {}
+
+        self._thread = threading.Thread(target=self._run, name="PageRenderer", daemon=True)
+        self._thread.start()
+
+    def schedule(self, pages: Iterable[tuple]):
+        """
+        Remplacer les rendus en attente par `pages`, par priorité
+
+        Chaque demande est (page, zoom) pour une page entière ou
+        (page, zoom, tuile) pour une seule tuile.
+        """
+        with self._jobs_ready:
+            self._in_flight -= len(self._jobs)
+            self._jobs.clear()
+            for job in pages:
+                if len(job) == 2:
+                    job = (job[0], job[1], None)
+                if job not in self._jobs:
+                    self._jobs.append(job)
+                    self._in_flight += 1
+            self._jobs_ready.notify()
+        self._schedule_poll()
+
+    def page_rect(self, page_num: int) -> Optional[PageRect]:
+        """Dimensions d'une page mesurée par le thread de rendu, ou None"""
+        return self._page_rects.get(page_num)
+
+    def stop(self):
+        """Arrêter le thread (les rendus en attente sont abandonnés)"""
+        with self._jobs_ready:
+            self._running = False
+            self._jobs.clear()
+            self._jobs_ready.notify()
+        if self._poll_id is not None:
+            try:
+                self.widget.after_cancel(self._poll_id)
+            except Exception:
+                pass
+            self._poll_id = None
+
+    # ==================== THREAD DE RENDU ====================
+
+    def _run(self):
+        document = None
+        try:
+            while True:
+                with self._jobs_ready:
+                    while self._running and not self._jobs:
+                        self._jobs_ready.wait()
+                    if not self._running:
+                        return
+                    page_num, zoom, tile = self._jobs.popleft()
+
+                try:
+                    if tile is not None:
+                        if document is None:
+                            document = fitz.open(self.filepath)
+                        img = render_tile(document, page_num, zoom, tile)
+                        self._remember_rect(document, page_num)
+                    else:
+                        img = self.render_cache.get(self.file_hash, page_num, zoom) if self.render_cache else None
+                        if img is None:
+                            if document is None:
+                                document = fitz.open(self.filepath)
+                            img = render_page(document, page_num, zoom)
+                            self._remember_rect(document, page_num)
+                            if self.render_cache:
+                                self.render_cache.put(self.file_hash, page_num, zoom, img)
+                    self._results.put((page_num, zoom, tile, img, None))
+                except Exception as e:
+                    self._results.put((page_num, zoom, tile, None, e))
+        finally:
+            if document is not None:
+                document.close()
+
+    def _remember_rect(self, document, page_num: int):
+        """Mémoriser les dimensions d'une page (une fois par page)"""
+        if page_num in self._page_rects:
+            return
+        rect = tuple(document[page_num].rect)
+        self._page_rects[page_num] = rect
+        if self.render_cache and self.render_cache.page_rect(self.file_hash, page_num) is None:
+            self.render_cache.set_page_rect(self.file_hash, page_num, rect)
+
+    # ==================== RETOUR SUR LE THREAD TK ====================
+
+    def _schedule_poll(self):
+        if self._poll_id is None and self._running:
+            self._poll_id = self.widget.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        """Relever les pages rendues et les transmettre à on_rendered"""
+        self._poll_id = None
+        while True:
+            try:
+                page_num, zoom, tile, image, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._in_flight -= 1
+            if self._running:
+                self.on_rendered(page_num, zoom, tile, image, error)
+
+        if self._in_flight > 0:
+            self._schedule_poll()
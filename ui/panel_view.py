@@ -2,9 +2,16 @@ import customtkinter as ctk
 from tkinter import messagebox
 from typing import Optional, Callable
 import os
+
+from .virtual_list import VirtualList
+
+
 class PanelView(ctk.CTkFrame):
     """Vue d'un panel spécifique avec ses dossiers et fichiers"""
    
+    # Nombre de cartes de dossier par ligne en vue grille
+    GRID_COLUMNS = 4
+   
     PANEL_INFO = {
         'certification': {
             'name': 'Certification',
@@ -60,13 +67,16 @@ class PanelView(ctk.CTkFrame):
         # En-tête avec fil d'Ariane
         self.create_breadcrumb()
        
-        # Zone principale scrollable
-        self.content_scrollable = ctk.CTkScrollableFrame(
+        # Zone principale : liste virtualisée (seules les lignes visibles ont des widgets)
+        self.content_scrollable = ctk.CTkFrame(
             self,
             fg_color=("gray95", "gray15"),
             corner_radius=15
         )
         self.content_scrollable.pack(fill="both", expand=True, pady=(10, 0))
+       
+        self.content_list = VirtualList(self.content_scrollable, fg_color="transparent")
+        self.register_row_kinds()
    
     def create_breadcrumb(self):
         """Créer le fil d'Ariane avec switch vue"""
@@ -164,9 +174,11 @@ class PanelView(ctk.CTkFrame):
    
     def load_content(self):
         """Charger le contenu du panel"""
-        # Nettoyer
+        # Nettoyer (la liste virtualisée est conservée, ses widgets sont recyclés)
         for widget in self.content_scrollable.winfo_children():
-            widget.destroy()
+            if widget is not self.content_list:
+                widget.destroy()
+        self.content_list.pack_forget()
        
         try:
             # Charger les sous-dossiers du panel
@@ -187,52 +199,57 @@ class PanelView(ctk.CTkFrame):
                 return
            
             # Selon le mode de vue
+            self.content_list.pack(fill="both", expand=True)
             if self.view_mode == "grid":
                 self.load_grid_view(subfolders, files)
             else:
                 self.load_list_view(subfolders, files)
-           
+       
         except Exception as e:
             print(f"❌ Erreur lors du chargement du contenu: {e}")
             self.show_error_state(str(e))
    
+    def register_row_kinds(self):
+        """Déclarer les types de lignes de la liste virtualisée (hauteurs fixes)"""
+        self.content_list.register_kind("section", 60, self.build_section_title, self.fill_section_title)
+        self.content_list.register_kind("folder_grid", 140, self.build_folder_grid_row, self.fill_folder_grid_row)
+        self.content_list.register_kind("file_card", 90, self.build_file_card, self.fill_file_card)
+        self.content_list.register_kind("folder_item", 70, self.build_folder_list_item, self.fill_folder_list_item)
+        self.content_list.register_kind("file_item", 70, self.build_file_list_item, self.fill_file_list_item)
+   
     def load_grid_view(self, subfolders: list, files: list):
-        """Charger en vue grille (comme original)"""
+        """Charger en vue grille (dossiers par lignes de GRID_COLUMNS cartes)"""
+        rows = []
         if subfolders:
-            self.create_section_title("📁 Dossiers", len(subfolders))
-           
-            folders_grid = ctk.CTkFrame(self.content_scrollable, fg_color="transparent")
-            folders_grid.pack(fill="x", pady=(10, 20))
-           
-            for i, folder in enumerate(subfolders):
-                row = i // 4
-                col = i % 4
-                self.create_folder_card(folders_grid, folder, row, col)
+            rows.append(("section", ("📁 Dossiers", len(subfolders))))
+            for i in range(0, len(subfolders), self.GRID_COLUMNS):
+                rows.append(("folder_grid", subfolders[i:i + self.GRID_COLUMNS]))
        
         if files:
-            self.create_section_title("📄 Fichiers", len(files))
-           
-            files_frame = ctk.CTkFrame(self.content_scrollable, fg_color="transparent")
-            files_frame.pack(fill="x", pady=10)
-           
-            for file in files:
-                self.create_file_card(files_frame, file)
-
+            rows.append(("section", ("📄 Fichiers", len(files))))
+            rows.extend(("file_card", file) for file in files)
+       
+        self.content_list.set_rows(rows)
+   
     def load_list_view(self, subfolders: list, files: list):
         """Charger en vue liste (tout en vertical)"""
-        list_frame = ctk.CTkFrame(self.content_scrollable, fg_color="transparent")
-        list_frame.pack(fill="x", pady=10)
-       
-        # Dossiers d'abord
-        for folder in subfolders:
-            self.create_folder_list_item(list_frame, folder)
-       
-        # Fichiers ensuite
-        for file in files:
-            self.create_file_list_item(list_frame, file)
-
-    def create_folder_list_item(self, parent, folder: dict):
-        """Carte pour dossier en vue liste (horizontale simple)"""
+        # Dossiers d'abord, fichiers ensuite
+        rows = [("folder_item", folder) for folder in subfolders]
+        rows.extend(("file_item", file) for file in files)
+        self.content_list.set_rows(rows)
+   
+    def get_folder_file_count(self, folder: dict) -> int:
+        """Nombre de fichiers du sous-arbre (compteur joint par get_subfolders)"""
+        file_count = folder.get('total_file_count')
+        if file_count is None:
+            try:
+                file_count = self.db.count_files_in_folder(folder['id'], recursive=True)
+            except:
+                file_count = 0
+        return file_count
+   
+    def build_folder_list_item(self, parent):
+        """Construire une carte de dossier en vue liste (horizontale simple)"""
         card = ctk.CTkFrame(
             parent,
             height=60,
@@ -243,6 +260,7 @@ class PanelView(ctk.CTkFrame):
         )
         card.pack(fill="x", pady=5)
         card.pack_propagate(False)
+        card.item = None
        
         ctk.CTkLabel(
             card,
@@ -251,28 +269,33 @@ class PanelView(ctk.CTkFrame):
             width=50
         ).pack(side="left", padx=10)
        
-        ctk.CTkLabel(
+        card.name_label = ctk.CTkLabel(
             card,
-            text=folder['name'],
+            text="",
             font=ctk.CTkFont(size=14, weight="bold"),
             anchor="w"
-        ).pack(side="left", expand=True)
+        )
+        card.name_label.pack(side="left", expand=True)
        
-        file_count = self.db.count_files_in_folder(folder['id'], recursive=True)
-        ctk.CTkLabel(
+        card.count_label = ctk.CTkLabel(
             card,
-            text=f"{file_count} fichiers",
+            text="",
             font=ctk.CTkFont(size=11),
             text_color=("gray50", "gray60")
-        ).pack(side="right", padx=10)
-       
-        card.bind('<Button-1>', lambda e: self.navigate_to(folder['id']))
-
-    def create_file_list_item(self, parent, file: dict):
-        """Carte pour fichier en vue liste"""
-        extension = file['filename'].rsplit('.', 1)[-1].lower() if '.' in file['filename'] else ''
-        icon = self.file_handler.get_file_icon(extension)
+        )
+        card.count_label.pack(side="right", padx=10)
        
+        card.bind('<Button-1>', lambda e: self.navigate_to(card.item['id']))
+        return card
+   
+    def fill_folder_list_item(self, card, folder: dict):
+        """Remplir une carte de dossier en vue liste"""
+        card.item = folder
+        card.name_label.configure(text=folder['name'])
+        card.count_label.configure(text=f"{self.get_folder_file_count(folder)} fichiers")
+   
+    def build_file_list_item(self, parent):
+        """Construire une carte de fichier en vue liste"""
         card = ctk.CTkFrame(
             parent,
             height=60,
@@ -283,46 +306,80 @@ class PanelView(ctk.CTkFrame):
         )
         card.pack(fill="x", pady=5)
         card.pack_propagate(False)
+        card.item = None
        
-        ctk.CTkLabel(
+        card.icon_label = ctk.CTkLabel(
             card,
-            text=icon,
+            text="",
             font=ctk.CTkFont(size=24),
             width=50
-        ).pack(side="left", padx=10)
+        )
+        card.icon_label.pack(side="left", padx=10)
        
-        ctk.CTkLabel(
+        card.name_label = ctk.CTkLabel(
             card,
-            text=file['filename'],
+            text="",
             font=ctk.CTkFont(size=14, weight="bold"),
             anchor="w"
-        ).pack(side="left", expand=True)
+        )
+        card.name_label.pack(side="left", expand=True)
        
-        size_formatted = self.format_file_size(file.get('file_size', 0))
-        ctk.CTkLabel(
+        card.size_label = ctk.CTkLabel(
             card,
-            text=size_formatted,
+            text="",
             font=ctk.CTkFont(size=11),
             text_color=("gray50", "gray60")
-        ).pack(side="right", padx=10)
+        )
+        card.size_label.pack(side="right", padx=10)
        
-        card.bind('<Button-1>', lambda e: self.open_file_with_viewer(file))
+        card.bind('<Button-1>', lambda e: self.open_file_with_viewer(card.item))
+        return card
    
-    def create_section_title(self, title: str, count: int):
-        """Créer un titre de section"""
-        section_frame = ctk.CTkFrame(self.content_scrollable, fg_color="transparent")
+    def fill_file_list_item(self, card, file: dict):
+        """Remplir une carte de fichier en vue liste"""
+        extension = file['filename'].rsplit('.', 1)[-1].lower() if '.' in file['filename'] else ''
+        card.item = file
+        card.icon_label.configure(text=self.file_handler.get_file_icon(extension))
+        card.name_label.configure(text=file['filename'])
+        card.size_label.configure(text=self.format_file_size(file.get('file_size') or 0))
+   
+    def build_section_title(self, parent):
+        """Construire un titre de section"""
+        section_frame = ctk.CTkFrame(parent, fg_color="transparent")
         section_frame.pack(fill="x", pady=(20, 10))
        
-        ctk.CTkLabel(
+        label = ctk.CTkLabel(
             section_frame,
-            text=f"{title} ({count})",
+            text="",
             font=ctk.CTkFont(size=18, weight="bold"),
             text_color=(self.panel_info['color'][0], self.panel_info['color'][1]),
             anchor="w"
-        ).pack(side="left")
+        )
+        label.pack(side="left")
+        return label
+   
+    def fill_section_title(self, label, section: tuple):
+        """Remplir un titre de section (titre, nombre)"""
+        title, count = section
+        label.configure(text=f"{title} ({count})")
+   
+    def build_folder_grid_row(self, parent):
+        """Construire une ligne de GRID_COLUMNS cartes de dossier"""
+        row_frame = ctk.CTkFrame(parent, fg_color="transparent")
+        row_frame.pack(fill="both", expand=True)
+        return [self.build_folder_card(row_frame, col) for col in range(self.GRID_COLUMNS)]
+   
+    def fill_folder_grid_row(self, cards: list, folders: list):
+        """Remplir une ligne de cartes de dossier (les cartes en trop sont masquées)"""
+        for col, card in enumerate(cards):
+            if col < len(folders):
+                self.fill_folder_card(card, folders[col])
+                card.grid()
+            else:
+                card.grid_remove()
    
-    def create_folder_card(self, parent, folder: dict, row: int, col: int):
-        """Créer une carte de dossier"""
+    def build_folder_card(self, parent, col: int):
+        """Construire une carte de dossier"""
         card = ctk.CTkFrame(
             parent,
             width=300,
@@ -332,8 +389,9 @@ class PanelView(ctk.CTkFrame):
             border_width=2,
             border_color=("gray80", "gray40")
         )
-        card.grid(row=row, column=col, padx=10, pady=10, sticky="w")
+        card.grid(row=0, column=col, padx=10, pady=10, sticky="w")
         card.pack_propagate(False)
+        card.item = None
        
         try:
             parent.grid_columnconfigure(col, weight=1)
@@ -346,27 +404,24 @@ class PanelView(ctk.CTkFrame):
             font=ctk.CTkFont(size=40)
         ).pack(pady=(15, 5))
        
-        ctk.CTkLabel(
+        card.name_label = ctk.CTkLabel(
             card,
-            text=folder['name'],
+            text="",
             font=ctk.CTkFont(size=14, weight="bold"),
             wraplength=280
-        ).pack(pady=(0, 5))
+        )
+        card.name_label.pack(pady=(0, 5))
        
-        try:
-            file_count = self.db.count_files_in_folder(folder['id'], recursive=True)
-        except:
-            file_count = 0
-           
-        ctk.CTkLabel(
+        card.count_label = ctk.CTkLabel(
             card,
-            text=f"{file_count} fichier{'s' if file_count != 1 else ''}",
+            text="",
             font=ctk.CTkFont(size=11),
             text_color=("gray50", "gray60")
-        ).pack()
+        )
+        card.count_label.pack()
        
-        def on_click(event, fid=folder['id']):
-            self.navigate_to(fid)
+        def on_click(event):
+            self.navigate_to(card.item['id'])
        
         def on_enter(event):
             card.configure(border_color=(self.panel_info['color'][0], self.panel_info['color'][1]))
@@ -377,13 +432,18 @@ class PanelView(ctk.CTkFrame):
         card.bind('<Button-1>', on_click)
         card.bind('<Enter>', on_enter)
         card.bind('<Leave>', on_leave)
+        return card
    
-    def create_file_card(self, parent, file: dict):
-        """Créer une carte de fichier"""
-        extension = file['filename'].rsplit('.', 1)[-1].lower() if '.' in file['filename'] else ''
-        icon = self.file_handler.get_file_icon(extension)
-        is_pdf = extension == 'pdf'
-       
+    def fill_folder_card(self, card, folder: dict):
+        """Remplir une carte de dossier"""
+        file_count = self.get_folder_file_count(folder)
+        card.item = folder
+        card.name_label.configure(text=folder['name'])
+        card.count_label.configure(text=f"{file_count} fichier{'s' if file_count != 1 else ''}")
+        card.configure(border_color=("gray80", "gray40"))
+   
+    def build_file_card(self, parent):
+        """Construire une carte de fichier"""
         card = ctk.CTkFrame(
             parent,
             height=80,
@@ -394,58 +454,71 @@ class PanelView(ctk.CTkFrame):
         )
         card.pack(fill="x", pady=5)
         card.pack_propagate(False)
+        card.item = None
        
-        ctk.CTkLabel(
+        card.icon_label = ctk.CTkLabel(
             card,
-            text=icon,
+            text="",
             font=ctk.CTkFont(size=28),
             width=70
-        ).pack(side="left", padx=15)
+        )
+        card.icon_label.pack(side="left", padx=15)
        
         info_frame = ctk.CTkFrame(card, fg_color="transparent")
         info_frame.pack(side="left", fill="both", expand=True, padx=10, pady=15)
        
-        name_label = ctk.CTkLabel(
+        card.name_label = ctk.CTkLabel(
             info_frame,
-            text=file['filename'],
+            text="",
             font=ctk.CTkFont(size=14, weight="bold"),
             anchor="w"
         )
-        name_label.pack(fill="x")
+        card.name_label.pack(fill="x")
        
-        try:
-            size = file.get('file_size', 0)
-            if size == 0 and os.path.exists(file['filepath']):
-                size = os.path.getsize(file['filepath'])
-            size_formatted = self.format_file_size(size)
-        except:
-            size_formatted = "N/A"
-       
-        type_text = f"{size_formatted} • {'🔒 PDF (Lecture seule)' if is_pdf else '💾 Téléchargeable'}"
-       
-        meta_label = ctk.CTkLabel(
+        card.meta_label = ctk.CTkLabel(
             info_frame,
-            text=type_text,
+            text="",
             font=ctk.CTkFont(size=11),
             text_color=("gray50", "gray60"),
             anchor="w"
         )
-        meta_label.pack(fill="x")
+        card.meta_label.pack(fill="x")
        
-        action_text = "👁️ Visualiser" if is_pdf else "📥 Ouvrir"
-        action_button = ctk.CTkButton(
+        card.action_button = ctk.CTkButton(
             card,
-            text=action_text,
+            text="",
             width=130,
             height=45,
             font=ctk.CTkFont(size=12, weight="bold"),
             fg_color=(self.panel_info['color'][0], self.panel_info['color'][1]),
             hover_color=("gray60", "gray40"),
-            command=lambda f=file: self.open_file_with_viewer(f)
+            command=lambda: self.open_file_with_viewer(card.item)
         )
-        action_button.pack(side="right", padx=15)
+        card.action_button.pack(side="right", padx=15)
+       
+        card.bind('<Double-Button-1>', lambda e: self.open_file_with_viewer(card.item))
+        return card
+   
+    def fill_file_card(self, card, file: dict):
+        """Remplir une carte de fichier"""
+        extension = file['filename'].rsplit('.', 1)[-1].lower() if '.' in file['filename'] else ''
+        is_pdf = extension == 'pdf'
+       
+        try:
+            size = file.get('file_size') or 0
+            if size == 0 and os.path.exists(file['filepath']):
+                size = os.path.getsize(file['filepath'])
+            size_formatted = self.format_file_size(size)
+        except:
+            size_formatted = "N/A"
        
-        card.bind('<Double-Button-1>', lambda e, f=file: self.open_file_with_viewer(f))
+        card.item = file
+        card.icon_label.configure(text=self.file_handler.get_file_icon(extension))
+        card.name_label.configure(text=file['filename'])
+        card.meta_label.configure(
+            text=f"{size_formatted} • {'🔒 PDF (Lecture seule)' if is_pdf else '💾 Téléchargeable'}"
+        )
+        card.action_button.configure(text="👁️ Visualiser" if is_pdf else "📥 Ouvrir")
    
     def open_file_with_viewer(self, file: dict):
         """Ouvrir un fichier avec le bon viewer"""
@@ -468,7 +541,7 @@ class PanelView(ctk.CTkFrame):
             try:
                 from .pdf_viewer import PDFViewer
                 pdf_window = ctk.CTkToplevel(self.winfo_toplevel())
-                PDFViewer(pdf_window, file['filepath'], file['filename'])
+                PDFViewer(pdf_window, file['filepath'], file['filename'], file.get('file_hash'))
                 print(f"✅ PDF ouvert dans le viewer intégré: {file['filename']}")
             except ImportError:
                 messagebox.showerror(
@@ -1,23 +1,61 @@
 import customtkinter as ctk
+from typing import Dict, Optional, Set, Tuple
 from tkinter import messagebox, Canvas
-from PIL import Image
+from PIL import ImageTk
 import fitz  # PyMuPDF
 from customtkinter import CTkImage
-import io
+from .page_renderer import PageRenderer
+from .page_cache import shared_page_cache, document_key
+from .virtual_list import VirtualList
+from utils.render_cache import PageRect, shared_render_cache, shared_thumbnail_cache
+from utils.pdf_render import TILE_SIZE, page_pixel_size
 
 class PDFViewer(ctk.CTkToplevel):
     """Viewer PDF modernisé avec CustomTkinter - Lecture seule"""
 
-    def __init__(self, parent, filepath: str, filename: str):
+    # Pages voisines rendues à l'avance de chaque côté de la page affichée
+    PREFETCH_PAGES = 2
+    # À partir de ce zoom, seules les tuiles visibles de la page sont rendues
+    TILED_ZOOM = 1.75
+    # Zoom de l'aperçu basse résolution affiché en attendant le rendu net
+    PREVIEW_ZOOM = 0.3
+    # Miniatures de la barre latérale : zoom de rendu et cadre d'affichage
+    THUMBNAIL_ZOOM = 0.2
+    THUMBNAIL_BOX = (120, 160)
+
+    def __init__(self, parent, filepath: str, filename: str, file_hash: Optional[str] = None):
         super().__init__(parent)
 
         self.filepath = filepath
         self.filename = filename
+        # Pages rendues partagées entre fenêtres (LRU borné en octets)
+        self.page_cache = shared_page_cache
+        self.doc_key = document_key(filepath, file_hash)
+        # Pages déjà rendues sur disque (documents dont le hash est connu)
+        self.file_hash = file_hash
+        self.render_cache = shared_render_cache
         self.pdf_document = None
         self.current_page = 0
         self.total_pages = 0
         self.zoom_level = 1.0
-        self.page_images = {}
+        self.renderer = None
+        # Dernière image affichée : (page, zoom, CTkImage)
+        self.shown_page = None
+        # Miniatures : rendues par un second thread, pour ne pas retarder les pages
+        self.thumbnail_cache = shared_thumbnail_cache
+        self.thumbnail_renderer = None
+        self.thumbnail_cards = []
+        self._thumbnail_request_pending = False
+
+        # Rendu par tuiles (forts zooms) : tuile -> (élément du canvas, PhotoImage)
+        self.tiled = False
+        self.tile_items: Dict[Tuple[int, int], Tuple[int, ImageTk.PhotoImage]] = {}
+        self.visible_tiles: Set[Tuple[int, int]] = set()
+        self.page_pixels = (0, 0)
+        self.tile_origin_x = 0
+        self._tile_update_id = None
+        # (page, zoom) en attente de ses dimensions, mesurées par le thread de rendu
+        self._rect_pending = None
 
         # Configuration de la fenêtre
         self.title(f"🔒 Lecture seule - {filename}")
@@ -39,6 +77,20 @@ class PDFViewer(ctk.CTkToplevel):
         # Créer l'interface
         self.create_widgets()
 
+        # Rendu en arrière-plan : la fenêtre reste réactive pendant la rastérisation
+        self.renderer = PageRenderer(
+            self, self.filepath, self.on_page_rendered,
+            file_hash=self.file_hash, render_cache=self.render_cache
+        )
+        self.thumbnail_renderer = PageRenderer(
+            self, self.filepath, self.on_thumbnail_rendered,
+            file_hash=self.file_hash, render_cache=self.thumbnail_cache
+        )
+        self.bind("<Destroy>", self.on_destroy, add="+")
+
+        # Une ligne par page ; seules les miniatures visibles sont construites et rendues
+        self.thumbnail_list.set_rows([("thumbnail", page) for page in range(self.total_pages)])
+
         # Afficher la première page
         self.display_page(0)
 
@@ -60,8 +112,18 @@ class PDFViewer(ctk.CTkToplevel):
     def load_pdf(self) -> bool:
         """Charger le document PDF"""
         try:
+            # Document déjà affiché : le cache disque connaît le nombre de pages
+            if self.file_hash:
+                cached_count = self.render_cache.page_count(self.file_hash)
+                if cached_count:
+                    self.total_pages = cached_count
+                    print(f"📋 PDF en cache: {self.total_pages} pages - {self.filename}")
+                    return True
+
             self.pdf_document = fitz.open(self.filepath)
             self.total_pages = len(self.pdf_document)
+            if self.file_hash:
+                self.render_cache.set_page_count(self.file_hash, self.total_pages)
             print(f"✅ PDF chargé: {self.total_pages} pages - {self.filename}")
             return True
         except Exception as e:
@@ -269,6 +331,19 @@ class PDFViewer(ctk.CTkToplevel):
         )
         display_container.pack(fill="both", expand=True, padx=5, pady=5)
 
+        # Barre latérale des miniatures (liste virtualisée)
+        self.thumbnail_list = VirtualList(
+            display_container,
+            width=self.THUMBNAIL_BOX[0] + 60,
+            fg_color=("gray85", "gray15"),
+            corner_radius=0
+        )
+        self.thumbnail_list.pack(side="left", fill="y")
+        self.thumbnail_list.pack_propagate(False)
+        self.thumbnail_list.register_kind(
+            "thumbnail", self.THUMBNAIL_BOX[1] + 40, self.build_thumbnail_card, self.fill_thumbnail_card
+        )
+
         # Canvas avec couleur de fond adaptée au thème
         self.canvas = Canvas(
             display_container,
@@ -281,12 +356,12 @@ class PDFViewer(ctk.CTkToplevel):
         v_scrollbar = ctk.CTkScrollbar(
             display_container,
             orientation="vertical",
-            command=self.canvas.yview
+            command=self.scroll_y
         )
         h_scrollbar = ctk.CTkScrollbar(
             display_container,
             orientation="horizontal", 
-            command=self.canvas.xview
+            command=self.scroll_x
         )
 
         # Configuration du canvas
@@ -320,6 +395,13 @@ class PDFViewer(ctk.CTkToplevel):
 
     def on_canvas_configure(self, event):
         """Ajuster la taille du canvas"""
+        if self.tiled:
+            # Recentrer les tuiles et compléter la zone visible
+            self.move_tiles_origin(event.width)
+            self.update_scroll_region()
+            self.schedule_tile_update()
+            return
+
         # Mettre à jour la région de scroll
         self.canvas.configure(scrollregion=self.canvas.bbox("all"))
         
@@ -337,75 +419,456 @@ class PDFViewer(ctk.CTkToplevel):
     def on_window_configure(self, event):
         """Ajuster lors du redimensionnement de la fenêtre"""
         if event.widget == self:
-            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+            self.update_scroll_region()
 
     def display_page(self, page_num: int):
-        """Afficher une page du PDF"""
+        """Afficher une page du PDF (rendue en arrière-plan si absente du cache)"""
         if page_num < 0 or page_num >= self.total_pages:
             return
 
+        self.current_page = page_num
+        self.page_label.configure(text=f"📄 Page {page_num + 1} / {self.total_pages}")
+        self.highlight_current_thumbnail()
+        self._rect_pending = None
+
+        # Fort zoom : rendre uniquement la zone visible, tuile par tuile
+        if self.zoom_level >= self.TILED_ZOOM and self.show_tiled_page():
+            return
+        self.leave_tiled_mode()
+
+        # Clé de cache : (document, page, zoom en %)
+        ctk_image = self.page_cache.get(self.page_cache.key(self.doc_key, page_num, self.zoom_level))
+        jobs = []
+        if ctk_image is not None:
+            self.show_page_image(ctk_image)
+            print(f"📋 Page {page_num + 1} chargée depuis le cache")
+        elif not self.show_standin(page_num):
+            # Afficher un message de chargement en attendant l'aperçu
+            self.image_label.configure(
+                image=None,
+                text=f"⏳ Chargement de la page {page_num + 1}...",
+                text_color=("#6c757d", "#adb5bd")
+            )
+            jobs.append((page_num, self.PREVIEW_ZOOM))
+
+        # Aperçu éventuel, page demandée puis voisines N±1, N±2 ; remplace les rendus en attente
+        pages = [page_num]
+        for offset in range(1, self.PREFETCH_PAGES + 1):
+            pages += [page_num + offset, page_num - offset]
+        jobs += [
+            (page, self.zoom_level) for page in pages
+            if 0 <= page < self.total_pages
+            and self.page_cache.key(self.doc_key, page, self.zoom_level) not in self.page_cache
+        ]
+        self.renderer.schedule(jobs)
+
+    def show_standin(self, page_num: int) -> bool:
+        """
+        Afficher aussitôt une version approximative de la page courante
+
+        La page déjà affichée à un autre zoom, ou à défaut son aperçu basse
+        résolution, est étirée à la taille finale ; le rendu net la remplace
+        dès qu'il arrive. False si rien n'est disponible.
+        """
+        if self.shown_page is not None and self.shown_page[0] == page_num:
+            _, shown_zoom, shown_image = self.shown_page
+            source = shown_image.cget("light_image")
+            width, height = shown_image.cget("size")
+            scale = self.zoom_level / shown_zoom
+        else:
+            source = self.page_cache.get(self.page_cache.key(self.doc_key, page_num, self.PREVIEW_ZOOM))
+            if source is None:
+                return False
+            width, height = source.size
+            scale = self.zoom_level / self.PREVIEW_ZOOM
+
+        # CTkImage étire l'image source à la taille demandée
+        self.show_page_image(CTkImage(
+            light_image=source,
+            dark_image=source,
+            size=(max(1, round(width * scale)), max(1, round(height * scale)))
+        ))
+        return True
+
+    def on_page_rendered(self, page_num: int, zoom: float, tile, img, error):
+        """Recevoir une page rendue par le thread de rendu (thread Tk)"""
+        if tile is not None:
+            self.on_tile_rendered(page_num, zoom, tile, img, error)
+            return
+        if zoom == self.PREVIEW_ZOOM:
+            self.on_preview_rendered(page_num, img, error)
+            return
+
+        is_current = page_num == self.current_page and zoom == self.zoom_level
+
+        if error is not None:
+            print(f"❌ Erreur affichage page {page_num + 1}: {error}")
+            if is_current:
+                self.image_label.configure(
+                    image=None,
+                    text=f"❌ Erreur d'affichage\nPage {page_num + 1}\n\n{str(error)}",
+                    text_color=("#dc3545", "#e04555")
+                )
+                self.shown_page = None
+            return
+
+        # Créer CTkImage avec support High DPI
+        ctk_image = CTkImage(
+            light_image=img,
+            dark_image=img,
+            size=(img.width, img.height)
+        )
+
+        # Mettre en cache ; poids : image PIL + PhotoImage Tk (4 octets par pixel)
+        nbytes = img.width * img.height * (len(img.getbands()) + 4)
+        self.page_cache.put(self.page_cache.key(self.doc_key, page_num, zoom), ctk_image, nbytes)
+
+        if is_current:
+            self.show_page_image(ctk_image)
+            print(f"✅ Page {page_num + 1} rendue et mise en cache (zoom: {int(zoom * 100)}%)")
+
+    def on_preview_rendered(self, page_num: int, img, error):
+        """Recevoir un aperçu basse résolution (thread Tk)"""
+        if error is not None:
+            # Le rendu à pleine résolution signalera l'erreur
+            return
+
+        # L'image PIL est gardée telle quelle : elle sera étirée au zoom voulu
+        self.page_cache.put(
+            self.page_cache.key(self.doc_key, page_num, self.PREVIEW_ZOOM),
+            img, img.width * img.height * len(img.getbands())
+        )
+
+        # Rien de mieux n'est encore affiché pour cette page : montrer l'aperçu
+        if (page_num == self.current_page and not self.tiled
+                and (self.shown_page is None or self.shown_page[0] != page_num)
+                and self.page_cache.key(self.doc_key, page_num, self.zoom_level) not in self.page_cache):
+            self.show_standin(page_num)
+            print(f"⚡ Aperçu de la page {page_num + 1} affiché")
+
+    def show_page_image(self, ctk_image: CTkImage):
+        """Afficher l'image dans le CTkLabel"""
+        self.image_label.configure(image=ctk_image, text="")
+        self.shown_page = (self.current_page, self.zoom_level, ctk_image)
+
+        # Mettre à jour la région de scroll après un court délai
+        self.after(100, self.update_scroll_region)
+
+    def update_scroll_region(self):
+        """Mettre à jour la région de scroll"""
+        if self.tiled:
+            # La région couvre la page entière, même si peu de tuiles sont posées
+            width, height = self.page_pixels
+            self.canvas.configure(scrollregion=(0, 0, max(width, self.canvas.winfo_width()), height))
+        else:
+            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+
+    # ==================== RENDU PAR TUILES ====================
+
+    def show_tiled_page(self) -> bool:
+        """Préparer l'affichage par tuiles de la page courante (False si impossible)"""
+        rect = self.page_rect(self.current_page)
+        if rect is None:
+            return self.request_page_rect()
+        self.page_pixels = page_pixel_size(rect, self.zoom_level)
+
+        self.clear_tiles()
+        if not self.tiled:
+            self.tiled = True
+            self.canvas.itemconfigure(self.canvas_window, state="hidden")
+
+        # Fond blanc de la page, recouvert par les tuiles à mesure qu'elles arrivent
+        self.tile_origin_x = max(0, (self.canvas.winfo_width() - self.page_pixels[0]) // 2)
+        self.canvas.create_rectangle(
+            self.tile_origin_x, 0,
+            self.tile_origin_x + self.page_pixels[0], self.page_pixels[1],
+            fill="#ffffff", outline="", tags=("tile",)
+        )
+        self.update_scroll_region()
+        self.update_tiles()
+        return True
+
+    def page_rect(self, page_num: int) -> Optional[PageRect]:
+        """Dimensions de la page (points PDF), sans ouvrir le document sur le thread Tk"""
+        if self.file_hash:
+            rect = self.render_cache.page_rect(self.file_hash, page_num)
+            if rect is not None:
+                return rect
+        # Mesurée par le thread de rendu (cache disque absent ou non inscriptible)
+        if self.renderer is not None:
+            rect = self.renderer.page_rect(page_num)
+            if rect is not None:
+                return rect
+        if self.pdf_document is None:
+            return None
+
+        # Document déjà ouvert par load_pdf (premier affichage)
         try:
-            self.current_page = page_num
+            rect = tuple(self.pdf_document[page_num].rect)
+        except Exception as e:
+            print(f"❌ Erreur lecture page {page_num + 1}: {e}")
+            return None
+        if self.file_hash:
+            self.render_cache.set_page_rect(self.file_hash, page_num, rect)
+        return rect
+
+    def request_page_rect(self) -> bool:
+        """
+        Faire mesurer la page courante par le thread de rendu (False si impossible)
+
+        La première tuile est demandée : le thread de rendu mémorise les
+        dimensions de la page avant de la remettre, et on_tile_rendered
+        reprend alors l'affichage par tuiles.
+        """
+        if self.renderer is None:
+            return False
 
-            # Clé de cache avec zoom
-            cache_key = f"{page_num}_{self.zoom_level}"
-            if cache_key in self.page_images:
-                ctk_image = self.page_images[cache_key]
-                print(f"📋 Page {page_num + 1} chargée depuis le cache")
+        self.leave_tiled_mode()
+        self.image_label.configure(
+            image=None,
+            text=f"⏳ Chargement de la page {self.current_page + 1}...",
+            text_color=("#6c757d", "#adb5bd")
+        )
+        self.shown_page = None
+        self._rect_pending = (self.current_page, self.zoom_level)
+        self.renderer.schedule([(self.current_page, self.zoom_level, (0, 0))])
+        return True
+
+    def leave_tiled_mode(self):
+        """Revenir à l'affichage de la page entière"""
+        if not self.tiled:
+            return
+        self.tiled = False
+        self.clear_tiles()
+        self.canvas.itemconfigure(self.canvas_window, state="normal")
+
+    def clear_tiles(self):
+        """Retirer les tuiles du canvas (elles restent dans le cache)"""
+        self.canvas.delete("tile")
+        self.tile_items.clear()
+        self.visible_tiles = set()
+
+    def move_tiles_origin(self, canvas_width: int):
+        """Recentrer horizontalement la page après un redimensionnement"""
+        origin = max(0, (canvas_width - self.page_pixels[0]) // 2)
+        if origin != self.tile_origin_x:
+            self.canvas.move("tile", origin - self.tile_origin_x, 0)
+            self.tile_origin_x = origin
+
+    def schedule_tile_update(self):
+        """Regrouper les mises à jour de tuiles déclenchées par le défilement"""
+        if self.tiled and self._tile_update_id is None:
+            self._tile_update_id = self.after_idle(self.update_tiles)
+
+    def update_tiles(self):
+        """Afficher les tuiles de la zone visible et demander le rendu des manquantes"""
+        self._tile_update_id = None
+        if not self.tiled or self.renderer is None:
+            return
+
+        width, height = self.page_pixels
+        columns = (width + TILE_SIZE - 1) // TILE_SIZE
+        rows = (height + TILE_SIZE - 1) // TILE_SIZE
+
+        # Zone visible en pixels de page
+        left = int(self.canvas.canvasx(0)) - self.tile_origin_x
+        top = int(self.canvas.canvasy(0))
+        right = left + self.canvas.winfo_width()
+        bottom = top + self.canvas.winfo_height()
+
+        first_col, last_col = max(0, left // TILE_SIZE), min(columns - 1, right // TILE_SIZE)
+        first_row, last_row = max(0, top // TILE_SIZE), min(rows - 1, bottom // TILE_SIZE)
+
+        # Tuiles visibles d'abord, puis une tuile de marge tout autour
+        wanted = [(c, r) for r in range(first_row, last_row + 1) for c in range(first_col, last_col + 1)]
+        for r in range(max(0, first_row - 1), min(rows, last_row + 2)):
+            for c in range(max(0, first_col - 1), min(columns, last_col + 2)):
+                if not (first_col <= c <= last_col and first_row <= r <= last_row):
+                    wanted.append((c, r))
+        self.visible_tiles = set(wanted)
+
+        # Libérer les tuiles sorties de la zone : la mémoire reste bornée quel que soit le zoom
+        for tile in [t for t in self.tile_items if t not in self.visible_tiles]:
+            item, _ = self.tile_items.pop(tile)
+            self.canvas.delete(item)
+
+        jobs = []
+        for tile in wanted:
+            if tile in self.tile_items:
+                continue
+            photo = self.page_cache.get(self.page_cache.tile_key(self.doc_key, self.current_page, self.zoom_level, tile))
+            if photo is not None:
+                self.draw_tile(tile, photo)
             else:
-                # Afficher un message de chargement
+                jobs.append((self.current_page, self.zoom_level, tile))
+
+        # Remplace les demandes en attente : les tuiles dépassées par le défilement sont abandonnées
+        self.renderer.schedule(jobs)
+
+    def draw_tile(self, tile: Tuple[int, int], photo: ImageTk.PhotoImage):
+        """Poser une tuile sur le canvas"""
+        column, row = tile
+        item = self.canvas.create_image(
+            self.tile_origin_x + column * TILE_SIZE, row * TILE_SIZE,
+            image=photo, anchor="nw", tags=("tile",)
+        )
+        self.tile_items[tile] = (item, photo)
+
+    def on_tile_rendered(self, page_num: int, zoom: float, tile: Tuple[int, int], img, error):
+        """Recevoir une tuile rendue (thread Tk)"""
+        measuring = self._rect_pending == (page_num, zoom)
+        if measuring:
+            self._rect_pending = None
+
+        if error is not None:
+            print(f"❌ Erreur rendu tuile {tile} page {page_num + 1}: {error}")
+            if measuring:
                 self.image_label.configure(
                     image=None,
-                    text=f"⏳ Chargement de la page {page_num + 1}...",
-                    text_color=("#6c757d", "#adb5bd")
+                    text=f"❌ Erreur d'affichage\nPage {page_num + 1}\n\n{str(error)}",
+                    text_color=("#dc3545", "#e04555")
                 )
-                self.update()
-
-                # Rendre la page avec PyMuPDF
-                page = self.pdf_document[page_num]
-                mat = fitz.Matrix(self.zoom_level, self.zoom_level)
-                pix = page.get_pixmap(matrix=mat)
-
-                # Convertir en image PIL
-                img_data = pix.tobytes("ppm")
-                img = Image.open(io.BytesIO(img_data))
-
-                # Créer CTkImage avec support High DPI
-                ctk_image = CTkImage(
-                    light_image=img, 
-                    dark_image=img, 
-                    size=(img.width, img.height)
+            return
+
+        photo = ImageTk.PhotoImage(img)
+        # Seule la PhotoImage Tk est conservée (4 octets par pixel)
+        self.page_cache.put(self.page_cache.tile_key(self.doc_key, page_num, zoom, tile), photo, img.width * img.height * 4)
+
+        if measuring:
+            # Dimensions désormais connues : passer à l'affichage par tuiles
+            if self.page_rect(page_num) is not None:
+                self.show_tiled_page()
+            else:
+                print(f"⚠️ Dimensions de la page {page_num + 1} inconnues")
+                self.image_label.configure(
+                    image=None,
+                    text=f"❌ Erreur d'affichage\nPage {page_num + 1}\n\nDimensions de la page inconnues",
+                    text_color=("#dc3545", "#e04555")
                 )
+            return
 
-                # Mettre en cache (limiter à 3 pages pour la mémoire)
-                if len(self.page_images) >= 3:
-                    # Supprimer l'entrée la plus ancienne
-                    oldest_key = next(iter(self.page_images))
-                    del self.page_images[oldest_key]
-                
-                self.page_images[cache_key] = ctk_image
-                print(f"✅ Page {page_num + 1} rendue et mise en cache (zoom: {int(self.zoom_level * 100)}%)")
+        if (self.tiled and page_num == self.current_page and zoom == self.zoom_level
+                and tile in self.visible_tiles and tile not in self.tile_items):
+            self.draw_tile(tile, photo)
+
+    def scroll_y(self, *args):
+        """Défilement vertical (scrollbar, clavier, molette) puis mise à jour des tuiles"""
+        self.canvas.yview(*args)
+        self.schedule_tile_update()
+
+    def scroll_x(self, *args):
+        """Défilement horizontal puis mise à jour des tuiles"""
+        self.canvas.xview(*args)
+        self.schedule_tile_update()
+
+    # ==================== MINIATURES ====================
+
+    def build_thumbnail_card(self, parent):
+        """Construire une carte de miniature"""
+        card = ctk.CTkFrame(
+            parent,
+            fg_color="transparent",
+            corner_radius=8,
+            border_width=2,
+            border_color=("gray85", "gray15"),
+            cursor="hand2"
+        )
+        card.pack(fill="both", expand=True, padx=4, pady=4)
+        card.page_num = None
+
+        card.image_label = ctk.CTkLabel(
+            card,
+            text="",
+            width=self.THUMBNAIL_BOX[0],
+            height=self.THUMBNAIL_BOX[1],
+            fg_color=("white", "gray25"),
+            corner_radius=4
+        )
+        card.image_label.pack(pady=(6, 2))
 
-            # Afficher l'image dans le CTkLabel
-            self.image_label.configure(image=ctk_image, text="")
+        card.number_label = ctk.CTkLabel(
+            card,
+            text="",
+            font=ctk.CTkFont(size=11),
+            text_color=("gray40", "gray70")
+        )
+        card.number_label.pack()
+
+        for widget in (card, card.image_label, card.number_label):
+            widget.bind('<Button-1>', lambda e: self.go_to_page(card.page_num))
+        self.thumbnail_cards.append(card)
+        return card
+
+    def fill_thumbnail_card(self, card, page_num: int):
+        """Remplir une carte de miniature (rendu demandé si absente du cache)"""
+        card.page_num = page_num
+        card.number_label.configure(text=str(page_num + 1))
+        self.style_thumbnail_card(card)
+
+        ctk_image = self.page_cache.get(self.page_cache.key(self.doc_key, page_num, self.THUMBNAIL_ZOOM))
+        if ctk_image is not None:
+            card.image_label.configure(image=ctk_image, text="")
+        else:
+            card.image_label.configure(image=None, text="⏳")
+            self.schedule_thumbnail_requests()
 
-            # Mettre à jour la région de scroll après un court délai
-            self.after(100, self.update_scroll_region)
+    def style_thumbnail_card(self, card):
+        """Encadrer la miniature de la page courante"""
+        if card.page_num == self.current_page:
+            card.configure(border_color=("#dc3545", "#e04555"))
+        else:
+            card.configure(border_color=("gray85", "gray15"))
+
+    def highlight_current_thumbnail(self):
+        """Suivre la page courante dans la barre latérale"""
+        for card in self.thumbnail_cards:
+            self.style_thumbnail_card(card)
+        self.thumbnail_list.ensure_visible(self.current_page)
+
+    def schedule_thumbnail_requests(self):
+        """Regrouper les demandes de miniatures d'un même défilement"""
+        if not self._thumbnail_request_pending:
+            self._thumbnail_request_pending = True
+            self.after_idle(self.request_visible_thumbnails)
+
+    def request_visible_thumbnails(self):
+        """Demander le rendu des seules miniatures visibles et manquantes"""
+        self._thumbnail_request_pending = False
+        if self.thumbnail_renderer is None:
+            return
+        # Remplace les demandes en attente : les miniatures dépassées sont abandonnées
+        self.thumbnail_renderer.schedule(
+            (page, self.THUMBNAIL_ZOOM) for _, page in self.thumbnail_list.visible_rows()
+            if self.page_cache.key(self.doc_key, page, self.THUMBNAIL_ZOOM) not in self.page_cache
+        )
 
-            # Mettre à jour l'indicateur de page
-            self.page_label.configure(text=f"📄 Page {page_num + 1} / {self.total_pages}")
+    def on_thumbnail_rendered(self, page_num: int, zoom: float, tile, img, error):
+        """Recevoir une miniature rendue (thread Tk)"""
+        if error is not None:
+            print(f"❌ Erreur miniature page {page_num + 1}: {error}")
+            return
 
-        except Exception as e:
-            print(f"❌ Erreur affichage page {page_num + 1}: {e}")
-            self.image_label.configure(
-                image=None,
-                text=f"❌ Erreur d'affichage\nPage {page_num + 1}\n\n{str(e)}",
-                text_color=("#dc3545", "#e04555")
-            )
+        # Réduire au cadre en gardant les proportions
+        scale = min(self.THUMBNAIL_BOX[0] / img.width, self.THUMBNAIL_BOX[1] / img.height)
+        ctk_image = CTkImage(
+            light_image=img,
+            dark_image=img,
+            size=(max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        )
+        self.page_cache.put(
+            self.page_cache.key(self.doc_key, page_num, zoom),
+            ctk_image, img.width * img.height * (len(img.getbands()) + 4)
+        )
 
-    def update_scroll_region(self):
-        """Mettre à jour la région de scroll"""
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        for card in self.thumbnail_cards:
+            if card.page_num == page_num:
+                card.image_label.configure(image=ctk_image, text="")
+
+    def go_to_page(self, page_num: Optional[int]):
+        """Aller directement à une page (clic sur une miniature)"""
+        if page_num is not None and page_num != self.current_page:
+            print(f"🖼️ Miniature: page {page_num + 1}")
+            self.display_page(page_num)
 
     def first_page(self):
         """Aller à la première page"""
@@ -433,7 +896,6 @@ class PDFViewer(ctk.CTkToplevel):
         """Augmenter le zoom"""
         if self.zoom_level < 3.0:
             self.zoom_level = min(3.0, self.zoom_level + 0.25)
-            self.page_images.clear()
             self.display_page(self.current_page)
             self.zoom_label.configure(text=f"{int(self.zoom_level * 100)}%")
             print(f"🔍+ Zoom: {int(self.zoom_level * 100)}%")
@@ -442,7 +904,6 @@ class PDFViewer(ctk.CTkToplevel):
         """Diminuer le zoom"""
         if self.zoom_level > 0.5:
             self.zoom_level = max(0.5, self.zoom_level - 0.25)
-            self.page_images.clear()
             self.display_page(self.current_page)
             self.zoom_label.configure(text=f"{int(self.zoom_level * 100)}%")
             print(f"🔍- Zoom: {int(self.zoom_level * 100)}%")
@@ -450,7 +911,6 @@ class PDFViewer(ctk.CTkToplevel):
     def reset_zoom(self):
         """Réinitialiser le zoom à 100%"""
         self.zoom_level = 1.0
-        self.page_images.clear()
         self.display_page(self.current_page)
         self.zoom_label.configure(text="100%")
         print("🎯 Zoom réinitialisé à 100%")
@@ -458,7 +918,7 @@ class PDFViewer(ctk.CTkToplevel):
     def on_mousewheel(self, event):
         """Gérer le scroll avec la molette"""
         # Scroll vertical
-        self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+        self.scroll_y("scroll", int(-1 * (event.delta / 120)), "units")
 
     def disable_save_shortcuts(self):
         """Désactiver TOUS les raccourcis dangereux"""
@@ -482,8 +942,8 @@ class PDFViewer(ctk.CTkToplevel):
         navigation_shortcuts = [
             ('<Left>', lambda e: self.previous_page()),
             ('<Right>', lambda e: self.next_page()),
-            ('<Up>', lambda e: self.canvas.yview_scroll(-1, "units")),
-            ('<Down>', lambda e: self.canvas.yview_scroll(1, "units")),
+            ('<Up>', lambda e: self.scroll_y("scroll", -1, "units")),
+            ('<Down>', lambda e: self.scroll_y("scroll", 1, "units")),
             ('<Home>', lambda e: self.first_page()),
             ('<End>', lambda e: self.last_page()),
             ('<Prior>', lambda e: self.previous_page()),  # Page Up
@@ -513,18 +973,36 @@ class PDFViewer(ctk.CTkToplevel):
         print(f"🚫 Action bloquée: {event}")
         return "break"  # Empêcher la propagation
 
+    def on_destroy(self, event):
+        """Arrêter le thread de rendu à la destruction de la fenêtre"""
+        if event.widget is self and self.renderer:
+            self.renderer.stop()
+            self.renderer = None
+        if event.widget is self and self.thumbnail_renderer:
+            self.thumbnail_renderer.stop()
+            self.thumbnail_renderer = None
+
     def close_viewer(self):
         """Fermer le viewer proprement"""
         print("🚪 Fermeture du viewer PDF...")
         try:
+            # Arrêter le rendu avant de fermer le document
+            if self.renderer:
+                self.renderer.stop()
+                self.renderer = None
+            if self.thumbnail_renderer:
+                self.thumbnail_renderer.stop()
+                self.thumbnail_renderer = None
+
             # Libérer les ressources
             if self.pdf_document:
                 self.pdf_document.close()
                 print("✅ Document PDF fermé")
             
-            # Vider le cache d'images
-            self.page_images.clear()
-            print("✅ Cache images vidé")
+            # Les pages restent en cache pour la prochaine ouverture
+            stats = self.page_cache.stats()
+            print(f"📊 Cache pages: {stats['entries']} page(s), {stats['bytes'] // (1024 * 1024)} Mo / "
+                  f"{stats['max_bytes'] // (1024 * 1024)} Mo, {stats['hits']} succès, {stats['misses']} échecs")
             
             # Fermer la fenêtre
             self.destroy()
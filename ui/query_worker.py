@@ -0,0 +1,115 @@
+import threading
+import queue
+from collections import deque
+from typing import Any, Callable, Optional
+
+
+class QueryWorker:
+    """
+    Exécution de requêtes en arrière-plan pour une fenêtre Tk
+
+    Un thread unique exécute les tâches ; `Database` lui attribue sa propre
+    connexion SQLite (une connexion par thread). Les résultats sont renvoyés au thread Tk par une file
+    relevée avec `after` : les callbacks s'exécutent donc toujours sur le
+    thread de l'interface.
+    """
+
+    def __init__(self, widget, db, poll_ms: int = 30):
+        """
+        Args:
+            widget: Widget Tk utilisé pour planifier les callbacks (after)
+            db: Instance Database (thread-safe)
+            poll_ms: Intervalle de relève des résultats
+        """
+        self.widget = widget
+        self.db = db
+        self.poll_ms = poll_ms
+
+        self._jobs = deque()
+        self._jobs_ready = threading.Condition()
+        self._results: "queue.Queue[tuple]" = queue.Queue()
+        self._running = True
+        self._poll_id: Optional[str] = None
+        self._in_flight = 0
+
+        self._thread = threading.Thread(target=self._run, name="QueryWorker", daemon=True)
+        self._thread.start()
+
+    def submit(self, func: Callable[[Any], Any], callback: Callable[[Any], None],
+               errback: Optional[Callable[[Exception], None]] = None, replace: bool = False):
+        """
+        Planifier une tâche
+
+        Args:
+            func: Fonction exécutée dans le thread, reçoit l'instance Database
+            callback: Reçoit le résultat, sur le thread Tk
+            errback: Reçoit l'exception éventuelle, sur le thread Tk
+            replace: Abandonner les tâches en attente non démarrées (la dernière gagne)
+        """
+        with self._jobs_ready:
+            if replace:
+                self._in_flight -= len(self._jobs)
+                self._jobs.clear()
+            self._jobs.append((func, callback, errback))
+            self._in_flight += 1
+            self._jobs_ready.notify()
+        self._schedule_poll()
+
+    def stop(self):
+        """Arrêter le thread (les tâches en attente sont abandonnées)"""
+        with self._jobs_ready:
+            self._running = False
+            self._jobs.clear()
+            self._jobs_ready.notify()
+        if self._poll_id is not None:
+            try:
+                self.widget.after_cancel(self._poll_id)
+            except Exception:
+                pass
+            self._poll_id = None
+
+    # ==================== THREAD DE TRAVAIL ====================
+
+    def _run(self):
+        try:
+            while True:
+                with self._jobs_ready:
+                    while self._running and not self._jobs:
+                        self._jobs_ready.wait()
+                    if not self._running:
+                        return
+                    func, callback, errback = self._jobs.popleft()
+
+                try:
+                    self._results.put((callback, errback, func(self.db), None))
+                except Exception as e:
+                    self._results.put((callback, errback, None, e))
+        finally:
+            self.db.release_connection()
+
+    # ==================== RETOUR SUR LE THREAD TK ====================
+
+    def _schedule_poll(self):
+        if self._poll_id is None and self._running:
+            self._poll_id = self.widget.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        """Relever les résultats disponibles et appeler les callbacks"""
+        self._poll_id = None
+        while True:
+            try:
+                callback, errback, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._in_flight -= 1
+            if not self._running:
+                continue
+            if error is None:
+                callback(result)
+            elif errback:
+                errback(error)
+            else:
+                print(f"❌ Erreur tâche en arrière-plan: {error}")
+
+        if self._in_flight > 0:
+            self._schedule_poll()
@@ -3,15 +3,35 @@ from tkinter import messagebox
 from typing import Callable, Optional, List, Dict, Any
 import os
 
+from .virtual_list import VirtualList
+from .query_worker import QueryWorker
+
 class SearchWindow:
     """Fenêtre de recherche optimisée avec plus d'espace pour les résultats"""
     
+    # Nombre de résultats chargés par page
+    PAGE_SIZE = 100
+    
+    # Délai d'inactivité avant de lancer une recherche pendant la saisie (ms)
+    DEBOUNCE_MS = 300
+    
     def __init__(self, root: ctk.CTkToplevel, db, file_handler, on_file_select: Callable):
         self.root = root
         self.db = db
         self.file_handler = file_handler
         self.on_file_select = on_file_select
         
+        # État de la pagination
+        self.search_criteria: Optional[Dict[str, Any]] = None
+        self.next_cursor = None
+        self.loading_more = False
+        
+        # Recherche en arrière-plan : anti-rebond et numéro de génération
+        self.query_worker = QueryWorker(self.root, db)
+        self.search_generation = 0
+        self.debounce_id = None
+        self.root.bind('<Destroy>', self.on_close, add="+")
+        
         self.root.title("🔍 Recherche de Fichiers")
         self.root.geometry("1100x750")  # ✅ Augmenté la hauteur
         
@@ -136,6 +156,19 @@ class SearchWindow:
             anchor="w"
         ).pack(side="left")
         
+        # Mode de recherche : nom du fichier ou contenu du document (FTS5)
+        self.search_mode = ctk.CTkSegmentedButton(
+            name_label_frame,
+            values=["Nom", "Contenu"],
+            font=ctk.CTkFont(size=11),
+            height=24,
+            command=lambda _: self.on_mode_change()
+        )
+        self.search_mode.pack(side="right")
+        self.search_mode.set("Nom")
+        if not self.db.fts_available:
+            self.search_mode.configure(state="disabled")
+        
         self.filename_entry = ctk.CTkEntry(
             name_container,
             height=36,  # ✅ Réduit de 40 à 36
@@ -226,12 +259,20 @@ class SearchWindow:
         )
         self.results_label.pack(pady=12)  # ✅ Centré
         
-        # Liste des résultats - ESPACE MAXIMISÉ
-        self.results_list = ctk.CTkScrollableFrame(
+        # Liste des résultats - ESPACE MAXIMISÉ (virtualisée, chargée page par page)
+        self.results_area = ctk.CTkFrame(
             results_container,
             fg_color=("gray95", "gray15"),
             corner_radius=12  # ✅ Réduit
         )
+        self.results_area.pack(fill="both", expand=True)
+        
+        self.results_list = VirtualList(
+            self.results_area,
+            on_scroll_end=self.load_more_results,
+            fg_color="transparent"
+        )
+        self.results_list.register_kind("result", 81, self.build_file_result_card, self.fill_file_result_card)
         self.results_list.pack(fill="both", expand=True)
         
         # Liaison des événements
@@ -249,56 +290,146 @@ class SearchWindow:
         self.extension_combo.set("Tous")
         self.search_files()
     
+    def on_mode_change(self):
+        """Changer de mode de recherche (nom / contenu)"""
+        if self.search_mode.get() == "Contenu":
+            self.filename_entry.configure(placeholder_text="Noms, numéros, mots du document...")
+        else:
+            self.filename_entry.configure(placeholder_text="Nom du fichier...")
+        self.search_files()
+    
     def auto_search(self):
-        """Recherche automatique lors de la saisie"""
-        # Petite temporisation pour éviter trop de recherches
-        self.root.after(300, self.search_files)
+        """Recherche automatique lors de la saisie (anti-rebond : seule la dernière frappe compte)"""
+        if self.debounce_id is not None:
+            self.root.after_cancel(self.debounce_id)
+        self.debounce_id = self.root.after(self.DEBOUNCE_MS, self.search_files)
     
     def search_files(self):
-        """Effectuer la recherche avec les critères actuels"""
-        try:
-            # Récupérer les critères
-            filename = self.filename_entry.get().strip()
-            extension_type = self.extension_combo.get()
-            
-            # Convertir le type en extension
-            extension_map = {
-                "Tous": "",
-                "PDF": "pdf",
-                "Word": "docx",
-                "Excel": "xlsx",
-                "Texte": "txt",
-                "Image": "png"
-            }
-            
-            extension = extension_map.get(extension_type, "")
-            
-            # Effectuer la recherche
-            results = self.db.search_files(
-                filename=filename,
-                extension=extension
+        """Lancer la recherche avec les critères actuels (première page, en arrière-plan)"""
+        if self.debounce_id is not None:
+            self.root.after_cancel(self.debounce_id)
+            self.debounce_id = None
+        
+        # Récupérer les critères
+        filename = self.filename_entry.get().strip()
+        extension_type = self.extension_combo.get()
+        
+        # Convertir le type en extension
+        extension_map = {
+            "Tous": "",
+            "PDF": "pdf",
+            "Word": "docx",
+            "Excel": "xlsx",
+            "Texte": "txt",
+            "Image": "png"
+        }
+        
+        extension = extension_map.get(extension_type, "")
+        
+        # Critères sur le nom ou, en mode contenu, classés par pertinence
+        content_mode = self.search_mode.get() == "Contenu"
+        if content_mode:
+            criteria = {'extension': extension, 'content': filename, 'with_folder': True} if filename else None
+        else:
+            criteria = {'filename': filename, 'extension': extension, 'with_folder': True}
+        
+        # Toute réponse d'une génération précédente sera ignorée
+        self.search_generation += 1
+        generation = self.search_generation
+        self.search_criteria = criteria
+        self.next_cursor = None
+        self.loading_more = False
+        
+        def run(db):
+            if criteria is None:
+                page = {'rows': [], 'next_cursor': None, 'total': 0}
+            else:
+                page = db.search_files_page(limit=self.PAGE_SIZE, **criteria)
+            backlog = db.get_index_backlog() if content_mode else 0
+            return page, backlog
+        
+        self.query_worker.submit(
+            run,
+            lambda result: self.on_search_results(generation, result),
+            lambda error: self.on_search_error(generation, error),
+            replace=True
+        )
+    
+    def on_search_results(self, generation: int, result: tuple):
+        """Afficher une réponse de recherche si elle est toujours d'actualité"""
+        if generation != self.search_generation or not self.root.winfo_exists():
+            return
+        
+        page, backlog = result
+        self.next_cursor = page['next_cursor']
+        self.display_results(page['rows'], page['total'], backlog)
+    
+    def on_search_error(self, generation: int, error: Exception):
+        """Signaler une erreur de recherche (sauf si la recherche est périmée)"""
+        if generation != self.search_generation:
+            return
+        self.loading_more = False
+        messagebox.showerror("Erreur", f"❌ Erreur lors de la recherche:\n{error}")
+        print(f"Erreur recherche: {error}")
+    
+    def load_more_results(self):
+        """Charger la page suivante quand la liste approche de la fin"""
+        if self.next_cursor is None or self.loading_more or self.search_criteria is None:
+            return
+        
+        self.loading_more = True
+        generation = self.search_generation
+        criteria = self.search_criteria
+        cursor = self.next_cursor
+        
+        def run(db):
+            return db.search_files_page(
+                limit=self.PAGE_SIZE,
+                cursor=cursor,
+                with_total=False,
+                **criteria
             )
-            
-            # Afficher les résultats
-            self.display_results(results)
-            
-        except Exception as e:
-            messagebox.showerror("Erreur", f"❌ Erreur lors de la recherche:\n{e}")
-            print(f"Erreur recherche: {e}")
+        
+        def done(page):
+            if generation != self.search_generation or not self.root.winfo_exists():
+                return
+            self.loading_more = False
+            self.next_cursor = page['next_cursor']
+            self.results_list.append_rows([("result", file) for file in page['rows']])
+        
+        self.query_worker.submit(run, done, lambda error: self.on_search_error(generation, error))
+    
+    def on_close(self, event=None):
+        """Arrêter le worker de recherche à la fermeture de la fenêtre"""
+        if event is not None and event.widget is not self.root:
+            return
+        if self.debounce_id is not None:
+            try:
+                self.root.after_cancel(self.debounce_id)
+            except Exception:
+                pass
+            self.debounce_id = None
+        self.query_worker.stop()
     
-    def display_results(self, files: List[Dict[str, Any]]):
-        """Afficher les résultats de la recherche"""
-        # Nettoyer
-        for widget in self.results_list.winfo_children():
-            widget.destroy()
+    def display_results(self, files: List[Dict[str, Any]], total: Optional[int] = None, backlog: int = 0):
+        """Afficher la première page des résultats de la recherche"""
+        # Nettoyer (la liste virtualisée est conservée, ses cartes sont recyclées)
+        for widget in self.results_area.winfo_children():
+            if widget is not self.results_list:
+                widget.destroy()
         
         # Mettre à jour le compteur
-        count = len(files)
-        self.results_label.configure(text=f"🔍 Résultats - {count} fichier(s)")
-        
+        count = total if total is not None else len(files)
+        label = f"🔍 Résultats - {count} fichier(s)"
+        if backlog:
+            label += f"  •  ⏳ {backlog} document(s) en cours d'indexation"
+        self.results_label.configure(text=label)
+    
         if count == 0:
+            self.results_list.pack_forget()
+            
             # Message d'état vide compact
-            empty_frame = ctk.CTkFrame(self.results_list, fg_color="transparent")
+            empty_frame = ctk.CTkFrame(self.results_area, fg_color="transparent")
             empty_frame.pack(expand=True, pady=50)
             
             ctk.CTkLabel(
@@ -322,19 +453,15 @@ class SearchWindow:
             ).pack()
             return
         
-        # Afficher chaque fichier avec hauteur réduite
-        for file in files:
-            self.create_file_result_card(file)
+        # Seules les cartes visibles sont construites, les suivantes au défilement
+        self.results_list.pack(fill="both", expand=True)
+        self.results_list.set_rows([("result", file) for file in files])
     
-    def create_file_result_card(self, file: Dict[str, Any]):
-        """Créer une carte de résultat compacte pour un fichier"""
-        extension = file['filename'].rsplit('.', 1)[-1].lower() if '.' in file['filename'] else ''
-        icon = self.file_handler.get_file_icon(extension)
-        is_pdf = extension == 'pdf'
-        
+    def build_file_result_card(self, parent):
+        """Construire une carte de résultat compacte (remplie par fill_file_result_card)"""
         # Frame de la carte - HAUTEUR RÉDUITE
         card = ctk.CTkFrame(
-            self.results_list,
+            parent,
             height=75,  # ✅ Réduit de 90 à 75
             fg_color=("white", "gray20"),
             corner_radius=8,  # ✅ Réduit
@@ -343,63 +470,65 @@ class SearchWindow:
         )
         card.pack(fill="x", pady=3, padx=5)  # ✅ Padding réduit
         card.pack_propagate(False)
+        card.item = None
         
         # Icône compacte
-        icon_label = ctk.CTkLabel(
+        card.icon_label = ctk.CTkLabel(
             card,
-            text=icon,
+            text="",
             font=ctk.CTkFont(size=28),  # ✅ Réduit de 32
             width=65  # ✅ Réduit
         )
-        icon_label.pack(side="left", padx=12)  # ✅ Padding réduit
+        card.icon_label.pack(side="left", padx=12)  # ✅ Padding réduit
         
         # Informations du fichier
         info_frame = ctk.CTkFrame(card, fg_color="transparent")
         info_frame.pack(side="left", fill="both", expand=True, padx=8, pady=10)  # ✅ Padding réduit
         
         # Nom du fichier - une seule ligne avec ellipsis si trop long
-        name_label = ctk.CTkLabel(
+        card.name_label = ctk.CTkLabel(
             info_frame,
-            text=file['filename'],
+            text="",
             font=ctk.CTkFont(size=13, weight="bold"),  # ✅ Réduit
             anchor="w"
         )
-        name_label.pack(fill="x")
+        card.name_label.pack(fill="x")
         
         # Dossier parent et type sur la même ligne
-        folder = self.db.get_folder(file['folder_id'])
-        folder_name = folder['name'] if folder else "Dossier supprimé"
-        
-        type_indicator = "🔒 PDF" if is_pdf else "💾 DOCX/XLSX"
-        
-        meta_text = f"📁 {folder_name[:30]}{'...' if len(folder_name) > 30 else ''} • {type_indicator}"
-        
-        meta_label = ctk.CTkLabel(
+        card.meta_label = ctk.CTkLabel(
             info_frame,
-            text=meta_text,
+            text="",
             font=ctk.CTkFont(size=10),  # ✅ Réduit
             text_color=("gray50", "gray60"),
             anchor="w"
         )
-        meta_label.pack(fill="x")
+        card.meta_label.pack(fill="x")
+        
+        # Extrait du contenu (recherche plein texte)
+        card.snippet_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=ctk.CTkFont(size=10, slant="italic"),
+            text_color=("#1f538d", "#6ea8fe"),
+            anchor="w"
+        )
         
         # Boutons d'action compacts
         button_frame = ctk.CTkFrame(card, fg_color="transparent")
         button_frame.pack(side="right", padx=10)  # ✅ Padding réduit
         
         # Bouton Ouvrir compact
-        action_text = "👁️ Voir" if is_pdf else "📥 Ouvrir"  # ✅ Texte raccourci
-        open_btn = ctk.CTkButton(
+        card.open_button = ctk.CTkButton(
             button_frame,
-            text=action_text,
+            text="",
             width=80,  # ✅ Réduit de 100
             height=28,  # ✅ Réduit de 35
             font=ctk.CTkFont(size=11, weight="bold"),  # ✅ Réduit
             fg_color=("#1f538d", "#14375e"),
             hover_color=("#2563a8", "#1a4a7a"),
-            command=lambda f=file: self.open_file(f)
+            command=lambda: self.open_file(card.item)
         )
-        open_btn.pack(side="left", padx=3)  # ✅ Padding réduit
+        card.open_button.pack(side="left", padx=3)  # ✅ Padding réduit
         
         # Bouton Localiser compact
         locate_btn = ctk.CTkButton(
@@ -410,12 +539,12 @@ class SearchWindow:
             font=ctk.CTkFont(size=13, weight="bold"),
             fg_color=("#28a745", "#1e7e34"),
             hover_color=("#32b349", "#229143"),
-            command=lambda f=file: self.locate_file(f)
+            command=lambda: self.locate_file(card.item)
         )
         locate_btn.pack(side="left", padx=3)
         
         # Double-clic pour ouvrir
-        card.bind('<Double-Button-1>', lambda e, f=file: self.open_file(f))
+        card.bind('<Double-Button-1>', lambda e: self.open_file(card.item))
         
         # Hover effect
         def on_enter(e):
@@ -426,6 +555,40 @@ class SearchWindow:
         
         card.bind('<Enter>', on_enter)
         card.bind('<Leave>', on_leave)
+        return card
+    
+    def fill_file_result_card(self, card, file: Dict[str, Any]):
+        """Remplir une carte de résultat avec un fichier"""
+        extension = file['filename'].rsplit('.', 1)[-1].lower() if '.' in file['filename'] else ''
+        is_pdf = extension == 'pdf'
+        
+        card.item = file
+        card.configure(border_color=("gray80", "gray40"), border_width=1)
+        card.icon_label.configure(text=self.file_handler.get_file_icon(extension))
+        card.name_label.configure(text=file['filename'])
+        
+        # Chemin du dossier joint par la recherche (pas de requête par carte)
+        if 'folder_path' in file:
+            folder_path = file['folder_path'] or "Dossier supprimé"
+        else:
+            folder = self.db.get_folder(file['folder_id'])
+            folder_path = folder['name'] if folder else "Dossier supprimé"
+        if len(folder_path) > 45:
+            folder_path = "..." + folder_path[-42:]
+        
+        type_indicator = "🔒 PDF" if is_pdf else "💾 DOCX/XLSX"
+        
+        card.meta_label.configure(text=f"📁 {folder_path} • {type_indicator}")
+        
+        snippet = file.get('snippet')
+        if snippet:
+            snippet = " ".join(snippet.split())
+            card.snippet_label.configure(text=f"🔎 {snippet[:120]}")
+            card.snippet_label.pack(fill="x")
+        else:
+            card.snippet_label.pack_forget()
+        
+        card.open_button.configure(text="👁️ Voir" if is_pdf else "📥 Ouvrir")  # ✅ Texte raccourci
     
     def open_file(self, file: Dict[str, Any]):
         """Ouvrir un fichier avec le bon viewer"""
@@ -440,7 +603,7 @@ class SearchWindow:
             try:
                 from .pdf_viewer import PDFViewer
                 pdf_window = ctk.CTkToplevel(self.root)
-                PDFViewer(pdf_window, file['filepath'], file['filename'])
+                PDFViewer(pdf_window, file['filepath'], file['filename'], file.get('file_hash'))
             except Exception as e:
                 messagebox.showerror("Erreur", f"❌ Impossible d'ouvrir le PDF:\n{e}")
         else:
@@ -0,0 +1,230 @@
+import customtkinter as ctk
+from bisect import bisect_right
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class VirtualList(ctk.CTkFrame):
+    """
+    Liste virtualisée : seuls les widgets des lignes visibles existent
+
+    Chaque ligne appartient à un type (`kind`) enregistré avec une hauteur fixe,
+    une fonction de construction et une fonction de remplissage. Au défilement,
+    les lignes qui sortent de la zone visible rendent leur widget à un pool et
+    les lignes qui entrent le réutilisent : le nombre de widgets ne dépend que
+    de la hauteur de la fenêtre, pas du nombre d'éléments.
+
+    Exemple :
+        vlist.register_kind("file", 90, build_file_card, fill_file_card)
+        vlist.set_rows([("file", file) for file in files])
+    """
+
+    # Pixels parcourus par cran de molette
+    WHEEL_STEP = 60
+
+    def __init__(self, parent, on_scroll_end: Optional[Callable] = None,
+                 end_threshold: int = 400, **kwargs):
+        """
+        Args:
+            parent: Widget parent
+            on_scroll_end: Appelé quand la vue approche de la fin (chargement paginé)
+            end_threshold: Distance en pixels du bas déclenchant on_scroll_end
+        """
+        super().__init__(parent, **kwargs)
+
+        self.on_scroll_end = on_scroll_end
+        self.end_threshold = end_threshold
+
+        self._kinds: Dict[str, Dict[str, Any]] = {}
+        self._rows: List[Tuple[str, Any]] = []
+        self._offsets: List[int] = [0]
+        self._offset = 0
+
+        # Index de ligne -> (slot, handle) affiché ; type -> slots libres
+        self._active: Dict[int, Tuple[ctk.CTkFrame, Any]] = {}
+        self._pool: Dict[str, List[Tuple[ctk.CTkFrame, Any]]] = {}
+        self._render_pending = False
+
+        self._viewport = ctk.CTkFrame(self, fg_color="transparent", corner_radius=0)
+        self._viewport.pack(side="left", fill="both", expand=True, padx=(10, 0), pady=10)
+
+        self._scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self._scrollbar.pack(side="right", fill="y", padx=(0, 5), pady=10)
+
+        self._viewport.bind("<Configure>", lambda e: self._schedule_render())
+        self._bind_wheel(self._viewport)
+        self._bind_wheel(self)
+
+    # ==================== API ====================
+
+    def register_kind(self, kind: str, height: int,
+                      build: Callable[[ctk.CTkFrame], Any],
+                      fill: Callable[[Any, Any], None]):
+        """
+        Déclarer un type de ligne
+
+        Args:
+            kind: Nom du type
+            height: Hauteur de la ligne (pixels non mis à l'échelle, comme les widgets CTk)
+            build: Construit le contenu dans le conteneur fourni et retourne un handle
+            fill: Remplit un handle avec les données d'une ligne
+        """
+        self._kinds[kind] = {'height': height, 'build': build, 'fill': fill}
+
+    def set_rows(self, rows: List[Tuple[str, Any]], keep_position: bool = False):
+        """Remplacer toutes les lignes (liste de tuples (type, données))"""
+        self._release_all()
+        self._rows = list(rows)
+        self._rebuild_offsets()
+        if not keep_position:
+            self._offset = 0
+        self._render()
+
+    def append_rows(self, rows: List[Tuple[str, Any]]):
+        """Ajouter des lignes à la fin sans toucher aux lignes affichées"""
+        if not rows:
+            return
+        self._rows.extend(rows)
+        self._rebuild_offsets()
+        self._render()
+
+    def scroll_to_top(self):
+        """Revenir en haut de la liste"""
+        self._offset = 0
+        self._render()
+
+    def ensure_visible(self, index: int):
+        """Faire défiler le minimum nécessaire pour que la ligne `index` soit visible"""
+        if not 0 <= index < len(self._rows):
+            return
+        top, bottom = self._offsets[index], self._offsets[index + 1]
+        height = self._viewport_height()
+        if height <= 1:
+            # Pas encore affichée : la hauteur visible est inconnue
+            return
+        if top < self._offset:
+            self._scroll_to(top)
+        elif bottom > self._offset + height:
+            self._scroll_to(bottom - height)
+
+    def visible_rows(self) -> List[Tuple[str, Any]]:
+        """Lignes actuellement affichées, de haut en bas"""
+        return [self._rows[index] for index in sorted(self._active)]
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # ==================== RENDU ====================
+
+    def _rebuild_offsets(self):
+        """Positions cumulées des lignes (offsets[i] = haut de la ligne i)"""
+        offsets = [0]
+        for kind, _ in self._rows:
+            offsets.append(offsets[-1] + self._kinds[kind]['height'])
+        self._offsets = offsets
+
+    def _viewport_height(self) -> int:
+        """Hauteur visible, dans la même unité que les hauteurs de lignes"""
+        return max(1, round(self._reverse_widget_scaling(self._viewport.winfo_height())))
+
+    def _schedule_render(self):
+        """Regrouper les rendus déclenchés par une rafale d'événements"""
+        if not self._render_pending:
+            self._render_pending = True
+            self.after_idle(self._render)
+
+    def _render(self):
+        """Placer les lignes visibles et recycler les autres"""
+        self._render_pending = False
+        if not self.winfo_exists():
+            return
+
+        total = self._offsets[-1]
+        height = self._viewport_height()
+        self._offset = max(0, min(self._offset, total - height))
+
+        first = max(0, bisect_right(self._offsets, self._offset) - 1)
+        last = first
+        while last < len(self._rows) and self._offsets[last] < self._offset + height:
+            last += 1
+        visible = range(first, last)
+
+        for index in [i for i in self._active if i not in visible]:
+            self._release(index)
+
+        for index in visible:
+            kind, data = self._rows[index]
+            entry = self._active.get(index)
+            if entry is None:
+                entry = self._acquire(kind)
+                self._kinds[kind]['fill'](entry[1], data)
+                self._active[index] = entry
+            entry[0].place(x=0, y=self._offsets[index] - self._offset, relwidth=1)
+
+        if total > 0:
+            self._scrollbar.set(self._offset / total, min(1.0, (self._offset + height) / total))
+        else:
+            self._scrollbar.set(0, 1)
+
+        if self.on_scroll_end and self._rows and self._offset + height >= total - self.end_threshold:
+            self.on_scroll_end()
+
+    def _acquire(self, kind: str) -> Tuple[ctk.CTkFrame, Any]:
+        """Réutiliser un slot libre du type demandé, ou en construire un"""
+        pool = self._pool.setdefault(kind, [])
+        if pool:
+            return pool.pop()
+
+        slot = ctk.CTkFrame(
+            self._viewport,
+            height=self._kinds[kind]['height'],
+            fg_color="transparent",
+            corner_radius=0
+        )
+        slot.pack_propagate(False)
+        slot.grid_propagate(False)
+        handle = self._kinds[kind]['build'](slot)
+        self._bind_wheel(slot)
+        return slot, handle
+
+    def _release(self, index: int):
+        """Rendre le slot d'une ligne au pool"""
+        slot, handle = self._active.pop(index)
+        slot.place_forget()
+        self._pool.setdefault(self._rows[index][0], []).append((slot, handle))
+
+    def _release_all(self):
+        for index in list(self._active):
+            self._release(index)
+
+    # ==================== DÉFILEMENT ====================
+
+    def _scroll_to(self, offset: int):
+        if offset != self._offset:
+            self._offset = offset
+            self._render()
+
+    def _on_scrollbar(self, action: str, value, unit: Optional[str] = None):
+        """Commande de la scrollbar ("moveto", fraction) ou ("scroll", n, unité)"""
+        if action == "moveto":
+            self._scroll_to(int(float(value) * self._offsets[-1]))
+        elif action == "scroll":
+            step = self._viewport_height() if unit == "pages" else self.WHEEL_STEP
+            self._scroll_to(self._offset + int(value) * step)
+
+    def _on_mousewheel(self, event):
+        if getattr(event, 'num', None) == 4:
+            direction = -1
+        elif getattr(event, 'num', None) == 5:
+            direction = 1
+        else:
+            direction = -1 if event.delta > 0 else 1
+        self._scroll_to(max(0, self._offset + direction * self.WHEEL_STEP))
+        return "break"
+
+    def _bind_wheel(self, widget):
+        """Lier la molette à un widget et à tous ses descendants"""
+        widget.bind("<MouseWheel>", self._on_mousewheel, add="+")
+        widget.bind("<Button-4>", self._on_mousewheel, add="+")
+        widget.bind("<Button-5>", self._on_mousewheel, add="+")
+        for child in widget.winfo_children():
+            self._bind_wheel(child)
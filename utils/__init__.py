@@ -3,5 +3,7 @@ Package Utils pour l'application Portail Document
 """
 
 from .file_handler import FileHandler
+from .text_extractor import TextExtractor
+from .blob_store import BlobStore
 
-__all__ = ['FileHandler']
\ No newline at end of file
+__all__ = ['FileHandler', 'TextExtractor', 'BlobStore']
\ No newline at end of file
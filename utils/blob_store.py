@@ -0,0 +1,103 @@
+import os
+import threading
+import uuid
+from typing import Dict, Iterable
+
+
+class BlobStore:
+    """
+    Stockage adressé par contenu des fichiers uploadés
+
+    Chaque contenu est stocké une seule fois sous `<racine>/<ab>/<cd>/<hash><ext>`,
+    où `<hash>` est le SHA256 du fichier. Plusieurs lignes de la table `files`
+    peuvent pointer vers le même blob ; la base ne supprime le fichier physique
+    que lorsque plus aucune ligne ne le référence.
+
+    Entre `commit()` et l'insertion de sa ligne, un blob n'a encore aucune
+    référence en base : il est réservé jusqu'à `release()`, et
+    `remove_if_unclaimed()` ne le supprime pas pendant ce temps.
+    """
+
+    # Blobs rendus par commit() dont la ligne n'est pas encore validée :
+    # chemin normalisé -> nombre de réservations (tout le processus)
+    _claims: Dict[str, int] = {}
+    _claims_lock = threading.Lock()
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        self.tmp_dir = os.path.join(root_dir, "tmp")
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def blob_path(self, file_hash: str, extension: str = "") -> str:
+        """Chemin du blob pour un hash donné (l'extension permet l'ouverture par le système)"""
+        return os.path.join(self.root_dir, file_hash[:2], file_hash[2:4], f"{file_hash}{extension.lower()}")
+
+    def contains(self, filepath: str) -> bool:
+        """Vérifier si un chemin appartient au stockage de blobs"""
+        root = os.path.abspath(self.root_dir) + os.sep
+        return os.path.abspath(filepath).startswith(root)
+
+    def new_temp_path(self, extension: str = "") -> str:
+        """Chemin temporaire unique, sur le même volume que les blobs (renommage atomique)"""
+        return os.path.join(self.tmp_dir, f"{uuid.uuid4().hex}{extension.lower()}.part")
+
+    def commit(self, temp_path: str, file_hash: str, extension: str = "") -> tuple:
+        """
+        Placer un fichier temporaire à son emplacement définitif
+
+        Args:
+            temp_path: Fichier copié et haché
+            file_hash: SHA256 du contenu
+            extension: Extension d'origine
+
+        Returns:
+            Tuple (chemin_du_blob, nouveau_blob) ; si le contenu existait déjà,
+            le fichier temporaire est supprimé et nouveau_blob vaut False.
+            Le blob reste réservé jusqu'à `release()`, à appeler une fois la
+            ligne validée (ou abandonnée).
+        """
+        final_path = self.blob_path(file_hash, extension)
+        key = self._claim_key(final_path)
+        # Test d'existence et réservation atomiques vis-à-vis de remove_if_unclaimed
+        with self._claims_lock:
+            if os.path.exists(final_path):
+                os.remove(temp_path)
+                created = False
+            else:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.replace(temp_path, final_path)
+                created = True
+            self._claims[key] = self._claims.get(key, 0) + 1
+        return final_path, created
+
+    # ==================== RÉSERVATIONS ====================
+
+    @staticmethod
+    def _claim_key(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    @classmethod
+    def release(cls, paths: Iterable[str]):
+        """Lever les réservations posées par commit() (sans effet sur un chemin non réservé)"""
+        with cls._claims_lock:
+            for path in paths:
+                key = cls._claim_key(path)
+                count = cls._claims.get(key, 0)
+                if count > 1:
+                    cls._claims[key] = count - 1
+                elif count:
+                    del cls._claims[key]
+
+    @classmethod
+    def remove_if_unclaimed(cls, path: str) -> bool:
+        """
+        Supprimer un fichier que plus aucune ligne ne référence, sauf s'il est réservé
+
+        Returns:
+            True si le fichier a été supprimé
+        """
+        with cls._claims_lock:
+            if cls._claims.get(cls._claim_key(path)) or not os.path.exists(path):
+                return False
+            os.remove(path)
+            return True
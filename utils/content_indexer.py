@@ -0,0 +1,207 @@
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from .text_extractor import TextExtractor
+
+
+class ContentIndexer:
+    """
+    Indexeur de contenu en arrière-plan alimenté par la table `index_queue`
+
+    Les triggers de la base placent dans la file chaque fichier ajouté ou dont
+    le `file_hash` a changé. Un thread coordinateur réclame les entrées par lots,
+    confie l'extraction du texte à un pool de workers puis écrit les résultats
+    dans `files_fts` avec sa propre connexion SQLite. La file étant persistée,
+    le travail non terminé reprend au redémarrage de l'application.
+    """
+
+    # Nombre maximum de tentatives avant d'abandonner un fichier
+    MAX_ATTEMPTS = 3
+    # Attente maximale entre deux lots après des échecs répétés (secondes)
+    MAX_RETRY_DELAY = 60.0
+
+    def __init__(self, db_path: str, workers: int = 2, batch_size: int = 16,
+                 poll_interval: float = 2.0,
+                 connect: Optional[Callable[[], sqlite3.Connection]] = None,
+                 write_lock: Optional[threading.RLock] = None):
+        """
+        Args:
+            db_path: Chemin de la base SQLite
+            connect: Fabrique de connexions configurées (Database.new_connection) ;
+                par défaut une connexion SQLite simple
+            write_lock: Verrou d'écriture partagé (Database.write_lock) pour ne
+                jamais écrire en même temps que l'application
+        """
+        self.db_path = db_path
+        self.connect = connect or (lambda: sqlite3.connect(self.db_path, timeout=30))
+        self.write_lock = write_lock or threading.RLock()
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.extractor = TextExtractor()
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    # ==================== CYCLE DE VIE ====================
+
+    def start(self):
+        """Démarrer le thread d'indexation"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="ContentIndexer", daemon=True)
+        self._thread.start()
+        print(f"✅ Indexeur de contenu démarré ({self.workers} worker(s))")
+
+    def stop(self, timeout: float = 5.0):
+        """Arrêter le thread d'indexation (le lot en cours est terminé)"""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        print("✅ Indexeur de contenu arrêté")
+
+    def notify(self):
+        """Réveiller l'indexeur sans attendre la prochaine scrutation"""
+        self._wake_event.set()
+
+    def backlog(self) -> int:
+        """Nombre de fichiers en attente d'indexation"""
+        try:
+            conn = self.connect()
+            try:
+                row = conn.execute(
+                    "SELECT COUNT(*) FROM index_queue WHERE attempts < ?",
+                    (self.MAX_ATTEMPTS,)
+                ).fetchone()
+                return row[0] if row else 0
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return 0
+
+    # ==================== BOUCLE DE TRAVAIL ====================
+
+    def _run(self):
+        """Boucle principale : réclamer un lot, extraire, écrire"""
+        try:
+            self._conn = self.connect()
+            self._conn.row_factory = sqlite3.Row
+        except sqlite3.Error as e:
+            print(f"❌ Indexeur: connexion impossible: {e}")
+            return
+
+        # Lots consécutifs comportant des échecs : l'attente double à chacun
+        failures = 0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="extract") as pool:
+            while not self._stop_event.is_set():
+                try:
+                    indexed, failed = self._process_batch(pool)
+                except sqlite3.Error as e:
+                    print(f"⚠️ Indexeur: erreur base de données: {e}")
+                    self._conn.rollback()
+                    indexed, failed = 0, 1
+
+                if failed:
+                    # Fichier verrouillé, corrompu, base occupée : ne pas boucler
+                    # sur les mêmes erreurs en monopolisant le verrou d'écriture
+                    delay = min(self.MAX_RETRY_DELAY, self.poll_interval * 2 ** min(failures, 5))
+                    failures += 1
+                elif indexed:
+                    failures = 0
+                    continue
+                else:
+                    delay = self.poll_interval
+
+                self._wake_event.wait(delay)
+                self._wake_event.clear()
+
+        self._conn.close()
+        self._conn = None
+
+    def _process_batch(self, pool: ThreadPoolExecutor) -> Tuple[int, int]:
+        """
+        Traiter un lot de la file
+
+        Les entrées jamais tentées passent avant les échecs à retenter.
+
+        Returns:
+            (entrées indexées, entrées en échec)
+        """
+        cursor = self._conn.cursor()
+
+        cursor.execute("""
+            SELECT q.file_id, q.file_hash, f.id AS present, f.filename, f.filepath
+            FROM index_queue q
+            LEFT JOIN files f ON f.id = q.file_id
+            WHERE q.attempts < ?
+            ORDER BY q.attempts, q.enqueued_at, q.file_id
+            LIMIT ?
+        """, (self.MAX_ATTEMPTS, self.batch_size))
+        jobs = [dict(row) for row in cursor.fetchall()]
+
+        # Purger, parmi les entrées du lot, celles dont le fichier a été supprimé entre-temps
+        orphans = [job['file_id'] for job in jobs if job['present'] is None]
+        if orphans:
+            with self.write_lock:
+                cursor.execute(
+                    f"DELETE FROM index_queue WHERE file_id IN ({','.join('?' * len(orphans))})",
+                    orphans
+                )
+                self._conn.commit()
+            jobs = [job for job in jobs if job['present'] is not None]
+            if not jobs:
+                # La file a avancé : enchaîner sans attendre
+                return len(orphans), 0
+        if not jobs:
+            return 0, 0
+
+        # Mode strict : un fichier verrouillé ou corrompu est un échec, réessayé
+        # jusqu'à MAX_ATTEMPTS, et non un contenu vide indexé définitivement
+        futures = [(job, pool.submit(self.extractor.extract, job['filepath'], True)) for job in jobs]
+
+        # Attendre toutes les extractions avant de prendre le verrou d'écriture
+        results = []
+        for job, future in futures:
+            try:
+                results.append((job, future.result(), None))
+            except Exception as e:
+                results.append((job, None, e))
+
+        indexed = 0
+        with self.write_lock:
+            for job, content, error in results:
+                try:
+                    if error is not None:
+                        raise error
+                    cursor.execute("DELETE FROM files_fts WHERE rowid = ?", (job['file_id'],))
+                    cursor.execute(
+                        "INSERT INTO files_fts (rowid, filename, content) VALUES (?, ?, ?)",
+                        (job['file_id'], job['filename'], content)
+                    )
+                    cursor.execute(
+                        "INSERT OR REPLACE INTO content_index_state (file_id, file_hash) VALUES (?, ?)",
+                        (job['file_id'], job['file_hash'])
+                    )
+                    # Ne retirer l'entrée que si le fichier n'a pas changé pendant l'extraction
+                    cursor.execute(
+                        "DELETE FROM index_queue WHERE file_id = ? AND file_hash IS ?",
+                        (job['file_id'], job['file_hash'])
+                    )
+                    indexed += 1
+                except Exception as e:
+                    print(f"⚠️ Indexeur: échec pour {job['filename']}: {e}")
+                    cursor.execute(
+                        "UPDATE index_queue SET attempts = attempts + 1, last_error = ? WHERE file_id = ?",
+                        (str(e), job['file_id'])
+                    )
+
+            self._conn.commit()
+        print(f"🔎 Indexeur: {indexed}/{len(jobs)} fichier(s) indexé(s)")
+        return indexed, len(jobs) - indexed
@@ -1,9 +1,13 @@
 import os
 import shutil
+import hashlib
 import subprocess
 import platform
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from typing import Tuple, Optional
 from pathlib import Path
+from .blob_store import BlobStore
 
 class FileHandler:
     """Gestionnaire de fichiers avec support complet de l'arborescence et des panels"""
@@ -22,9 +26,23 @@ class FileHandler:
         'default': '📄'
     }
     
-    def __init__(self, upload_dir: str = "uploads"):
+    # Nombre de copies/hash simultanés lors de l'import d'un dossier
+    IMPORT_WORKERS = min(8, (os.cpu_count() or 2) * 2)
+    
+    # Taille des blocs de lecture pour la copie et le hash
+    COPY_BUFFER_SIZE = 1024 * 1024
+    
+    # Nombre de fichiers insérés en BDD par lot lors d'un import
+    IMPORT_BATCH_SIZE = 500
+    
+    def __init__(self, upload_dir: str = "uploads", content_addressed: bool = False):
         self.upload_dir = upload_dir
         self.ensure_upload_directory()
+        
+        # Mode optionnel : stockage dédupliqué adressé par le hash du contenu
+        self.blob_store = BlobStore(os.path.join(upload_dir, ".blobs")) if content_addressed else None
+        if self.blob_store:
+            print(f"✅ Stockage dédupliqué activé: {self.blob_store.root_dir}")
     
     def ensure_upload_directory(self):
         """S'assurer que le répertoire d'upload existe"""
@@ -65,9 +83,9 @@ class FileHandler:
                 return 0
             
             # Parcourir récursivement tous les fichiers
-            for root, dirs, files in os.walk(folder_path):
-                for filename in files:
-                    if self.is_allowed_file(filename):
+            for _, file_entries, _ in self._scan_tree(folder_path):
+                for entry in file_entries:
+                    if self.is_allowed_file(entry.name):
                         total_count += 1
             
             print(f"📊 Total de fichiers à importer: {total_count}")
@@ -89,11 +107,31 @@ class FileHandler:
         Returns:
             Tuple (succès, chemin_destination)
         """
+        success, dest_path, _, _ = self.save_file_with_hash(source_path, filename, subfolder)
+        return success, dest_path
+    
+    def save_file_with_hash(self, source_path: str, filename: str,
+                            subfolder: str = "") -> Tuple[bool, str, str, int]:
+        """
+        Enregistrer un fichier dans le répertoire d'upload en calculant son hash
+        pendant la copie (le fichier n'est lu qu'une seule fois)
+        
+        Args:
+            source_path: Chemin source du fichier
+            filename: Nom du fichier
+            subfolder: Sous-dossier optionnel
+            
+        Returns:
+            Tuple (succès, chemin_destination, hash_sha256, taille) à transmettre à `db.add_file`
+        """
         try:
             # Vérifier que le fichier source existe
             if not os.path.exists(source_path):
                 print(f"❌ Fichier source introuvable: {source_path}")
-                return False, ""
+                return False, "", "", 0
+            
+            if self.blob_store:
+                return self._save_blob(source_path, filename)
             
             # Créer le chemin de destination
             if subfolder:
@@ -102,26 +140,88 @@ class FileHandler:
             else:
                 dest_dir = self.upload_dir
             
-            dest_path = os.path.join(dest_dir, filename)
+            # Réserver un nom libre (gère les doublons, y compris entre threads d'import)
+            dest_path = self._reserve_destination(dest_dir, filename)
             
-            # Gérer les doublons
-            if os.path.exists(dest_path):
-                base, ext = os.path.splitext(filename)
-                counter = 1
-                while os.path.exists(os.path.join(dest_dir, f"{base}_{counter}{ext}")):
-                    counter += 1
-                filename = f"{base}_{counter}{ext}"
-                dest_path = os.path.join(dest_dir, filename)
-            
-            # Copier le fichier
-            shutil.copy2(source_path, dest_path)
+            # Copier le fichier en calculant le hash au passage (copie partielle supprimée en cas d'échec)
+            file_size, file_hash = self.copy_and_hash(source_path, dest_path)
             print(f"✅ Fichier copié: {filename} -> {dest_path}")
             
-            return True, dest_path
+            return True, dest_path, file_hash, file_size
             
         except Exception as e:
             print(f"❌ Erreur lors de la copie du fichier {filename}: {e}")
-            return False, ""
+            return False, "", "", 0
+    
+    def _save_blob(self, source_path: str, filename: str) -> Tuple[bool, str, str, int]:
+        """Enregistrer un fichier dans le stockage dédupliqué (le sous-dossier est ignoré)"""
+        extension = os.path.splitext(filename)[1]
+        temp_path = self.blob_store.new_temp_path(extension)
+        try:
+            file_size, file_hash = self.copy_and_hash(source_path, temp_path)
+            blob_path, created = self.blob_store.commit(temp_path, file_hash, extension)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        
+        if created:
+            print(f"✅ Fichier stocké: {filename} -> {blob_path}")
+        else:
+            print(f"♻️ Contenu déjà présent, copie évitée: {filename} -> {blob_path}")
+        return True, blob_path, file_hash, file_size
+    
+    @classmethod
+    def copy_and_hash(cls, source_path: str, dest_path: str) -> Tuple[int, str]:
+        """
+        Copier un fichier par grands blocs en calculant son SHA256 à la volée
+        (équivalent de shutil.copy2 : les métadonnées sont aussi copiées)
+        
+        En cas d'échec, la destination partiellement écrite est supprimée
+        avant de propager l'exception.
+        
+        Returns:
+            Tuple (taille_en_octets, hash_sha256)
+        """
+        hash_sha256 = hashlib.sha256()
+        buffer = bytearray(cls.COPY_BUFFER_SIZE)
+        view = memoryview(buffer)
+        file_size = 0
+        
+        try:
+            with open(source_path, "rb") as src, open(dest_path, "wb") as dst:
+                while True:
+                    read = src.readinto(buffer)
+                    if not read:
+                        break
+                    chunk = view[:read]
+                    hash_sha256.update(chunk)
+                    dst.write(chunk)
+                    file_size += read
+            
+            shutil.copystat(source_path, dest_path)
+        except BaseException:
+            try:
+                os.remove(dest_path)
+            except OSError:
+                pass
+            raise
+        return file_size, hash_sha256.hexdigest()
+    
+    def _reserve_destination(self, dest_dir: str, filename: str) -> str:
+        """Créer atomiquement un fichier vide au premier nom libre (nom, nom_1, nom_2...)"""
+        base, ext = os.path.splitext(filename)
+        candidate = filename
+        counter = 0
+        while True:
+            dest_path = os.path.join(dest_dir, candidate)
+            try:
+                fd = os.open(dest_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(fd)
+                return dest_path
+            except FileExistsError:
+                counter += 1
+                candidate = f"{base}_{counter}{ext}"
     
     def save_files_from_folder(self, folder_path: str, db, parent_folder_id: Optional[int] = None) -> int:
         """
@@ -146,156 +246,162 @@ class FileHandler:
         """
         Importer un dossier complet avec TOUS ses fichiers et sous-dossiers dans un panel spécifique
         
+        L'arborescence est parcourue avec os.scandir sur le thread appelant, qui
+        crée les dossiers en BDD et reste l'unique écrivain. La copie et le hash
+        des fichiers sont confiés à un pool de threads borné ; les lignes sont
+        insérées et validées par lots au fil des copies. En cas d'erreur,
+        l'import est annulé par compensation : les lignes déjà insérées sont
+        supprimées (writer.discard()) ainsi que les copies physiques.
+        
         Args:
             folder_path: Chemin du dossier à importer
             db: Instance de la base de données
             parent_folder_id: ID du dossier parent dans la BDD
             panel: Panel cible pour l'import
-            progress_callback: Fonction de callback pour la progression (current, total)
+            progress_callback: Fonction de callback pour la progression (current, total),
+                appelée depuis le thread appelant
             total: Nombre total de fichiers (pour la progression)
             
         Returns:
-            Nombre total de fichiers importés
+            Nombre total de fichiers importés (0 si l'import a été annulé)
         """
-        total_files = 0
-        current_progress = [0]  # Liste mutable pour partager entre fonctions récursives
+        imported = 0
+        pending = set()
+        copied_paths = []
+        # Copies transmises au writer (il lève lui-même la réservation de leurs blobs)
+        handed_paths = []
+        folder_ids = {folder_path: parent_folder_id}
+        writer = None
+        max_pending = self.IMPORT_WORKERS * 4
         
-        try:
-            folder_name = os.path.basename(folder_path)
-            print(f"\n📁 Importation du dossier: {folder_name} dans panel {panel}")
-            
-            # Créer le dossier dans la base de données avec le panel
-            current_folder_id = db.create_folder(folder_name, parent_folder_id, panel)
-            print(f"   ✅ Dossier créé en BDD (ID: {current_folder_id}, Panel: {panel})")
-            
-            # Lister tous les éléments du dossier
-            items = os.listdir(folder_path)
-            
-            # Traiter les fichiers
-            for item in items:
-                item_path = os.path.join(folder_path, item)
+        def write_completed(futures, writer):
+            """Écrire en BDD les fichiers copiés (thread appelant uniquement)"""
+            nonlocal imported
+            results = []
+            error = None
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    error = error or e
+            
+            # Toutes les copies terminées sont connues avant la moindre écriture :
+            # si un lot échoue, l'annulation les supprime aussi
+            copied_paths.extend(result[3] for result in results if result[2])
+            if error is not None:
+                raise error
+            
+            for folder_id, filename, success, dest_path, file_size, file_hash in results:
+                if not success:
+                    print(f"      ❌ Échec de l'importation du fichier: {filename}")
+                    continue
                 
-                if os.path.isfile(item_path):
-                    # C'est un fichier
-                    if self.is_allowed_file(item):
-                        print(f"   📄 Importation du fichier: {item}")
+                handed_paths.append(dest_path)
+                writer.add_file(folder_id, filename, dest_path, file_size=file_size, file_hash=file_hash)
+                imported += 1
+                
+                if progress_callback and total > 0:
+                    progress_callback(imported, total)
+        
+        executor = ThreadPoolExecutor(max_workers=self.IMPORT_WORKERS, thread_name_prefix="import")
+        try:
+            print(f"\n📁 Importation du dossier: {os.path.basename(folder_path)} dans panel {panel}")
+            
+            # Commit par lot : le verrou d'écriture est rendu entre deux lots
+            with db.bulk_writer(batch_size=self.IMPORT_BATCH_SIZE) as writer:
+                for dir_path, file_entries, dir_entries in self._scan_tree(folder_path):
+                    folder_name = os.path.basename(dir_path)
+                    
+                    # Créer le dossier dans la base de données avec le panel
+                    current_folder_id = writer.create_folder(folder_name, folder_ids.pop(dir_path), panel)
+                    print(f"   ✅ Dossier créé en BDD: {folder_name} (ID: {current_folder_id}, Panel: {panel})")
+                    
+                    for entry in dir_entries:
+                        folder_ids[entry.path] = current_folder_id
+                    
+                    for entry in file_entries:
+                        if not self.is_allowed_file(entry.name):
+                            print(f"   ⚠️ Fichier ignoré (extension non autorisée): {entry.name}")
+                            continue
                         
-                        # Copier le fichier physiquement
-                        success, dest_path = self.save_file(item_path, item, folder_name)
+                        # Borner le nombre de copies en vol
+                        if len(pending) >= max_pending:
+                            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                            write_completed(done, writer)
                         
-                        if success:
-                            # Enregistrer dans la base de données
-                            db.add_file(current_folder_id, item, dest_path)
-                            total_files += 1
-                            current_progress[0] += 1
-                            
-                            # Appeler le callback de progression
-                            if progress_callback and total > 0:
-                                progress_callback(current_progress[0], total)
-                            
-                            print(f"      ✅ Fichier importé avec succès ({current_progress[0]}/{total})")
-                        else:
-                            print(f"      ❌ Échec de l'importation du fichier")
-                    else:
-                        print(f"   ⚠️ Fichier ignoré (extension non autorisée): {item}")
-            
-            # Traiter les sous-dossiers récursivement
-            for item in items:
-                item_path = os.path.join(folder_path, item)
+                        pending.add(executor.submit(
+                            self._copy_and_hash, entry.path, entry.name, folder_name, current_folder_id
+                        ))
                 
-                if os.path.isdir(item_path):
-                    # C'est un sous-dossier, traiter récursivement
-                    print(f"   📂 Sous-dossier détecté: {item}")
-                    sub_count = self._import_subfolder_recursive(
-                        item_path, 
-                        db, 
-                        current_folder_id, 
-                        panel, 
-                        progress_callback, 
-                        total, 
-                        current_progress
-                    )
-                    total_files += sub_count
+                # Écrire les derniers fichiers
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    write_completed(done, writer)
             
-            print(f"✅ Dossier '{folder_name}' importé: {total_files} fichier(s)")
-            return total_files
+            print(f"✅ Dossier '{os.path.basename(folder_path)}' importé: {imported} fichier(s)")
+            return imported
             
         except Exception as e:
-            print(f"❌ Erreur lors de l'importation du dossier: {e}")
+            print(f"❌ Erreur lors de l'importation du dossier, import annulé: {e}")
             import traceback
             traceback.print_exc()
-            return total_files
+            
+            # Supprimer les lignes déjà validées, puis les copies physiques
+            executor.shutdown(wait=True, cancel_futures=True)
+            if writer is not None:
+                writer.discard()
+            for future in pending:
+                if future.done() and not future.cancelled() and future.exception() is None:
+                    _, _, success, dest_path, _, _ = future.result()
+                    if success:
+                        copied_paths.append(dest_path)
+            # Les copies jamais transmises au writer sont encore réservées
+            BlobStore.release((Counter(copied_paths) - Counter(handed_paths)).elements())
+            # Ne supprimer que les fichiers qu'aucune ligne ne référence (blobs partagés)
+            db.remove_unreferenced_files(copied_paths)
+            return 0
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
     
-    def _import_subfolder_recursive(self, folder_path: str, db, 
-                                   parent_folder_id: int,
-                                   panel: str,
-                                   progress_callback,
-                                   total: int,
-                                   current_progress: list) -> int:
+    def _scan_tree(self, folder_path: str):
         """
-        Fonction auxiliaire pour importer récursivement un sous-dossier
+        Parcourir une arborescence avec os.scandir (parcours en profondeur, parent avant enfants)
         
-        Args:
-            folder_path: Chemin du dossier
-            db: Instance BDD
-            parent_folder_id: ID du parent
-            panel: Panel
-            progress_callback: Callback de progression
-            total: Total de fichiers
-            current_progress: Liste mutable [count] pour partager la progression
-            
-        Returns:
-            Nombre de fichiers importés
-        """
-        total_files = 0
+        Comme os.walk, les liens symboliques vers des dossiers ne sont pas suivis
+        (pas de boucle infinie) et les dossiers illisibles sont ignorés.
         
-        try:
-            folder_name = os.path.basename(folder_path)
-            
-            # Créer le sous-dossier
-            current_folder_id = db.create_folder(folder_name, parent_folder_id, panel)
-            
-            # Lister les éléments
-            items = os.listdir(folder_path)
-            
-            # Traiter les fichiers
-            for item in items:
-                item_path = os.path.join(folder_path, item)
-                
-                if os.path.isfile(item_path):
-                    if self.is_allowed_file(item):
-                        success, dest_path = self.save_file(item_path, item, folder_name)
-                        
-                        if success:
-                            db.add_file(current_folder_id, item, dest_path)
-                            total_files += 1
-                            current_progress[0] += 1
-                            
-                            # Callback de progression
-                            if progress_callback and total > 0:
-                                progress_callback(current_progress[0], total)
-            
-            # Traiter les sous-dossiers récursivement
-            for item in items:
-                item_path = os.path.join(folder_path, item)
-                
-                if os.path.isdir(item_path):
-                    sub_count = self._import_subfolder_recursive(
-                        item_path, 
-                        db, 
-                        current_folder_id, 
-                        panel, 
-                        progress_callback, 
-                        total, 
-                        current_progress
-                    )
-                    total_files += sub_count
-            
-            return total_files
-            
-        except Exception as e:
-            print(f"❌ Erreur import sous-dossier: {e}")
-            return total_files
+        Yields:
+            Tuple (chemin_dossier, entrées_fichiers, entrées_sous_dossiers)
+        """
+        stack = [folder_path]
+        while stack:
+            dir_path = stack.pop()
+            file_entries = []
+            dir_entries = []
+            
+            try:
+                with os.scandir(dir_path) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                dir_entries.append(entry)
+                            elif entry.is_file():
+                                file_entries.append(entry)
+                        except OSError as e:
+                            print(f"⚠️ Entrée illisible ignorée {entry.path}: {e}")
+            except OSError as e:
+                print(f"⚠️ Dossier illisible ignoré {dir_path}: {e}")
+                continue
+            
+            yield dir_path, file_entries, dir_entries
+            
+            # Inverser pour conserver l'ordre de découverte avec une pile
+            stack.extend(entry.path for entry in reversed(dir_entries))
+    
+    def _copy_and_hash(self, source_path: str, filename: str, subfolder: str, folder_id: int):
+        """Copier un fichier et calculer son hash (exécuté dans un worker du pool d'import)"""
+        success, dest_path, file_hash, file_size = self.save_file_with_hash(source_path, filename, subfolder)
+        return folder_id, filename, success, dest_path, file_size, file_hash
     
     def open_file(self, filepath: str) -> bool:
         """
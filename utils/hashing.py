@@ -0,0 +1,190 @@
+import os
+import hashlib
+import sqlite3
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Taille des blocs de lecture : hashlib libère le GIL au-delà de 2 Kio, de
+# grands blocs limitent les appels système et laissent les threads travailler
+# en parallèle
+HASH_BUFFER_SIZE = 1024 * 1024
+
+
+def hash_file(filepath: str, buffer_size: int = HASH_BUFFER_SIZE) -> Tuple[int, str]:
+    """
+    Taille et SHA256 d'un fichier (lève OSError s'il est illisible)
+
+    Fonction de module pour pouvoir être exécutée dans un ProcessPoolExecutor.
+    """
+    hash_sha256 = hashlib.sha256()
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    size = 0
+    with open(filepath, "rb") as f:
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            hash_sha256.update(view[:read])
+            size += read
+    return size, hash_sha256.hexdigest()
+
+
+@dataclass
+class FileDigest:
+    """Résultat du hachage d'un fichier (file_hash vide s'il est introuvable)"""
+    filepath: str
+    file_size: Optional[int] = None
+    mtime_ns: Optional[int] = None
+    file_hash: str = ""
+    cached: bool = False
+
+
+class HashingService:
+    """
+    Service de hachage SHA256 partagé par l'import, les migrations et la déduplication
+
+    Les fichiers sont hachés en parallèle par un pool de threads (ou de
+    processus) créé à la demande. Lorsqu'une connexion est fournie, la table
+    `file_hash_cache` évite de relire un fichier dont la taille et la date de
+    modification n'ont pas changé depuis son dernier hachage.
+    """
+
+    # Requêtes de cache par paquets (limite de paramètres SQLite)
+    LOOKUP_CHUNK = 500
+
+    def __init__(self, workers: Optional[int] = None, processes: bool = False):
+        """
+        Args:
+            workers: Taille du pool (par défaut, un par cœur)
+            processes: Utiliser des processus plutôt que des threads
+        """
+        self.workers = max(1, workers or os.cpu_count() or 2)
+        self.processes = processes
+        self._executor: Optional[Executor] = None
+        # Le service est partagé entre threads (import, complétion, UI) :
+        # un seul pool doit être créé
+        self._executor_lock = threading.Lock()
+
+    def shutdown(self):
+        """Libérer le pool"""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _pool(self) -> Executor:
+        with self._executor_lock:
+            if self._executor is None:
+                if self.processes:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hash")
+            return self._executor
+
+    # ==================== HACHAGE ====================
+
+    def hash_files(self, filepaths: Iterable[str],
+                   conn: Optional[sqlite3.Connection] = None) -> Dict[str, FileDigest]:
+        """
+        Hacher plusieurs fichiers, en parallèle
+
+        Args:
+            filepaths: Chemins à hacher
+            conn: Connexion où lire le cache (aucune écriture, voir `remember`)
+
+        Returns:
+            Dictionnaire chemin -> FileDigest
+        """
+        digests: Dict[str, FileDigest] = {}
+        for filepath in filepaths:
+            if filepath in digests:
+                continue
+            digest = FileDigest(filepath)
+            try:
+                stat = os.stat(filepath)
+                digest.file_size, digest.mtime_ns = stat.st_size, stat.st_mtime_ns
+            except OSError:
+                pass
+            digests[filepath] = digest
+
+        present = [d for d in digests.values() if d.mtime_ns is not None]
+        if conn is not None:
+            self._lookup(conn, present)
+
+        misses = [d for d in present if not d.cached]
+        if len(misses) == 1:
+            self._hash_one(misses[0])
+        elif misses:
+            pool = self._pool()
+            futures = [(d, pool.submit(hash_file, d.filepath)) for d in misses]
+            for digest, future in futures:
+                try:
+                    digest.file_size, digest.file_hash = future.result()
+                except OSError as e:
+                    print(f"⚠️ Erreur calcul hash: {e}")
+        return digests
+
+    def hash_file(self, filepath: str, conn: Optional[sqlite3.Connection] = None) -> str:
+        """
+        Hacher un fichier sur le thread appelant, en passant par le cache
+
+        Le résultat est enregistré dans le cache sans commit : l'appelant
+        valide avec sa propre transaction.
+        """
+        digest = self.hash_files([filepath], conn)[filepath]
+        if conn is not None:
+            self.remember(conn, [digest])
+        return digest.file_hash
+
+    @staticmethod
+    def _hash_one(digest: FileDigest):
+        try:
+            digest.file_size, digest.file_hash = hash_file(digest.filepath)
+        except OSError as e:
+            print(f"⚠️ Erreur calcul hash: {e}")
+
+    # ==================== CACHE ====================
+
+    @staticmethod
+    def _cache_key(filepath: str) -> str:
+        return os.path.normcase(os.path.abspath(filepath))
+
+    def _lookup(self, conn: sqlite3.Connection, digests: List[FileDigest]):
+        """Reprendre du cache les hash encore valides (même taille, même mtime)"""
+        by_key = {self._cache_key(d.filepath): d for d in digests}
+        keys = list(by_key)
+        try:
+            for start in range(0, len(keys), self.LOOKUP_CHUNK):
+                chunk = keys[start:start + self.LOOKUP_CHUNK]
+                rows = conn.execute(
+                    f"SELECT filepath, file_size, mtime_ns, file_hash FROM file_hash_cache "
+                    f"WHERE filepath IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for key, file_size, mtime_ns, file_hash in rows:
+                    digest = by_key[key]
+                    if file_size == digest.file_size and mtime_ns == digest.mtime_ns and file_hash:
+                        digest.file_hash = file_hash
+                        digest.cached = True
+        except sqlite3.OperationalError:
+            # Base pas encore migrée : pas de cache
+            pass
+
+    def remember(self, conn: sqlite3.Connection, digests: Iterable[FileDigest]):
+        """Enregistrer les nouveaux hash dans le cache (sans commit, sous le verrou d'écriture de l'appelant)"""
+        rows = [
+            (self._cache_key(d.filepath), d.file_size, d.mtime_ns, d.file_hash)
+            for d in digests if d.file_hash and not d.cached and d.mtime_ns is not None
+        ]
+        if not rows:
+            return
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO file_hash_cache (filepath, file_size, mtime_ns, file_hash) VALUES (?, ?, ?, ?)",
+                rows
+            )
+        except sqlite3.OperationalError:
+            pass
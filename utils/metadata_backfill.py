@@ -0,0 +1,180 @@
+import os
+import sqlite3
+import threading
+from typing import Callable, List, Optional, Tuple
+
+from .hashing import FileDigest, HashingService
+
+
+# Lignes dont la taille ou le hash reste à calculer (colonnes ajoutées à une
+# base historique) ; couvert par l'index partiel idx_files_pending_metadata
+PENDING_CONDITION = "(file_size IS NULL OR file_hash IS NULL)"
+
+
+class MetadataBackfill:
+    """
+    Remplissage en arrière-plan de `file_size` et `file_hash`
+
+    Les fichiers sont traités par lots : le service de hachage calcule les
+    hash sur tous les cœurs, puis le lot est écrit et validé sous le verrou d'écriture partagé. Les
+    lignes complétées ne répondent plus à PENDING_CONDITION : après un arrêt
+    ou un plantage, le travail reprend simplement là où il s'était arrêté.
+    Un fichier introuvable ou illisible (verrouillé, partage indisponible)
+    garde un hash NULL : il est de nouveau tenté au démarrage suivant.
+    """
+
+    def __init__(self, db_path: str, workers: Optional[int] = None, batch_size: int = 64,
+                 connect: Optional[Callable[[], sqlite3.Connection]] = None,
+                 write_lock: Optional[threading.RLock] = None,
+                 hasher: Optional[HashingService] = None):
+        """
+        Args:
+            db_path: Chemin de la base SQLite
+            workers: Threads de hachage (par défaut, un par cœur)
+            connect: Fabrique de connexions configurées (Database.new_connection)
+            write_lock: Verrou d'écriture partagé (Database.write_lock)
+            hasher: Service de hachage partagé (Database.hasher)
+        """
+        self.db_path = db_path
+        self.connect = connect or (lambda: sqlite3.connect(self.db_path, timeout=30))
+        self.write_lock = write_lock or threading.RLock()
+        self.hasher = hasher or HashingService(workers)
+        self.batch_size = batch_size
+
+        # Progression, lue depuis le thread Tk
+        self.total = 0
+        self.done = 0
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    # ==================== CYCLE DE VIE ====================
+
+    def pending(self) -> int:
+        """Nombre de fichiers restant à compléter"""
+        try:
+            conn = self.connect()
+            try:
+                return conn.execute(f"SELECT COUNT(*) FROM files WHERE {PENDING_CONDITION}").fetchone()[0]
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return 0
+
+    def start(self) -> bool:
+        """Démarrer le remplissage s'il reste des fichiers ; retourne True si démarré"""
+        if self.is_running():
+            return True
+        self.total = self.pending()
+        self.done = 0
+        if not self.total:
+            return False
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run, name="MetadataBackfill", daemon=True)
+        self._thread.start()
+        print(f"✅ Remplissage des métadonnées démarré ({self.total} fichier(s), {self.hasher.workers} worker(s))")
+        return True
+
+    def stop(self, timeout: float = 5.0):
+        """Arrêter après le lot en cours (la reprise se fera au prochain démarrage)"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def progress(self) -> Tuple[int, int]:
+        """(fichiers traités, total)"""
+        return self.done, self.total
+
+    # ==================== TRAITEMENT ====================
+
+    @staticmethod
+    def _complete_row(row, digest: Optional[FileDigest]) -> Tuple[Optional[int], Optional[str], int]:
+        """Paramètres de l'UPDATE d'une ligne : (file_size, file_hash, id)"""
+        file_id, filepath, file_size, file_hash = row
+        if digest is not None:
+            # Échec du hachage : NULL, pour réessayer au prochain passage
+            size, file_hash = digest.file_size, digest.file_hash or None
+        else:
+            try:
+                size = os.path.getsize(filepath)
+            except OSError:
+                size = None
+        return (file_size if file_size is not None else size, file_hash, file_id)
+
+    @staticmethod
+    def _skip_reindex(conn: sqlite3.Connection, updates: List[Tuple[Optional[int], Optional[str], int]]):
+        """
+        Annuler la réindexation déclenchée par l'écriture d'un hash manquant
+
+        Le hash passe de NULL à sa valeur sans que le contenu change : si le
+        fichier est déjà indexé, l'entrée ajoutée par trg_files_enqueue_update
+        est retirée et l'état d'indexation reprend le nouveau hash.
+        """
+        params = [(file_id, file_hash, file_id) for _, file_hash, file_id in updates if file_hash]
+        if not params:
+            return
+        try:
+            conn.executemany("""
+                DELETE FROM index_queue WHERE file_id = ? AND file_hash IS ?
+                AND file_id IN (SELECT file_id FROM content_index_state WHERE file_id = ? AND file_hash IS NULL)
+            """, params)
+            conn.executemany(
+                "UPDATE content_index_state SET file_hash = ? WHERE file_id = ? AND file_hash IS NULL",
+                [(file_hash, file_id) for file_id, file_hash, _ in params]
+            )
+        except sqlite3.OperationalError:
+            # Pas d'index plein texte : rien à réindexer
+            pass
+
+    def run(self) -> int:
+        """Traiter toutes les lignes en attente (bloquant) ; retourne le nombre traité"""
+        if not self.total:
+            self.total = self.pending()
+
+        try:
+            conn = self.connect()
+        except sqlite3.Error as e:
+            print(f"❌ Remplissage des métadonnées: connexion impossible: {e}")
+            return self.done
+
+        try:
+            last_id = 0
+            while not self._stop_event.is_set():
+                rows = conn.execute(f"""
+                    SELECT id, filepath, file_size, file_hash FROM files
+                    WHERE id > ? AND {PENDING_CONDITION}
+                    ORDER BY id
+                    LIMIT ?
+                """, (last_id, self.batch_size)).fetchall()
+                if not rows:
+                    break
+
+                # Hachage hors verrou : seules les écritures sont sérialisées
+                digests = self.hasher.hash_files([row[1] for row in rows if row[3] is None], conn)
+                updates = [self._complete_row(row, digests.get(row[1])) for row in rows]
+                with self.write_lock:
+                    conn.executemany("UPDATE files SET file_size = ?, file_hash = ? WHERE id = ?", updates)
+                    self._skip_reindex(conn, [update for row, update in zip(rows, updates) if row[3] is None])
+                    self.hasher.remember(conn, digests.values())
+                    conn.commit()
+
+                # Les échecs restent en attente : last_id évite de les reprendre dans ce passage
+                failed = sum(1 for file_size, file_hash, _ in updates if file_size is None or file_hash is None)
+                if failed:
+                    print(f"⚠️ {failed} fichier(s) illisible(s), nouvel essai au prochain démarrage")
+
+                last_id = rows[-1][0]
+                self.done += len(rows)
+                self.total = max(self.total, self.done)
+        except sqlite3.Error as e:
+            print(f"⚠️ Remplissage des métadonnées interrompu: {e}")
+            conn.rollback()
+        finally:
+            conn.close()
+
+        print(f"✅ Métadonnées complétées pour {self.done} fichier(s)")
+        return self.done
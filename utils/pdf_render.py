@@ -0,0 +1,63 @@
+from typing import Tuple
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+# Côté d'une tuile en pixels (rendu par zones aux forts zooms)
+TILE_SIZE = 512
+
+
+def pixmap_to_image(pix: "fitz.Pixmap") -> Image.Image:
+    """
+    Construire une image PIL directement depuis les échantillons du pixmap
+
+    Évite l'aller-retour par un format encodé (PPM/PNG) puis décodé : une
+    seule copie mémoire des pixels. `samples` est utilisé plutôt que
+    `samples_mv`, dont la mémoire disparaît avec le pixmap.
+    """
+    if pix.n - pix.alpha == 1:
+        mode = "LA" if pix.alpha else "L"
+    elif pix.n - pix.alpha == 3:
+        mode = "RGBA" if pix.alpha else "RGB"
+    else:
+        # CMYK ou autre espace : conversion par PyMuPDF
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+        mode = "RGBA" if pix.alpha else "RGB"
+    return Image.frombuffer(mode, (pix.width, pix.height), pix.samples, "raw", mode, pix.stride, 1)
+
+
+def render_page(document, page_num: int, zoom: float) -> Image.Image:
+    """Rastériser une page en image PIL"""
+    page = document[page_num]
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+    return pixmap_to_image(pix)
+
+
+def page_pixel_size(rect, zoom: float) -> Tuple[int, int]:
+    """
+    Taille (largeur, hauteur) en pixels d'une page rendue à ce zoom
+
+    `rect` est `page.rect` ou ses coordonnées mémorisées : aucun document
+    n'a besoin d'être ouvert.
+    """
+    bbox = (fitz.Rect(rect) * fitz.Matrix(zoom, zoom)).irect
+    return bbox.width, bbox.height
+
+
+def render_tile(document, page_num: int, zoom: float, tile: Tuple[int, int], tile_size: int = TILE_SIZE) -> Image.Image:
+    """
+    Rastériser une seule tuile (colonne, ligne) d'une page
+
+    Seule la zone `clip` est rendue : la mémoire consommée dépend de la
+    taille de la tuile, pas du zoom.
+    """
+    page = document[page_num]
+    column, row = tile
+    step = tile_size / zoom
+    rect = page.rect
+    clip = fitz.Rect(
+        rect.x0 + column * step, rect.y0 + row * step,
+        rect.x0 + (column + 1) * step, rect.y0 + (row + 1) * step
+    ) & rect
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip)
+    return pixmap_to_image(pix)
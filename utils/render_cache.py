@@ -0,0 +1,256 @@
+import os
+import threading
+import uuid
+from typing import Dict, Optional, Tuple
+
+from PIL import Image, features
+
+# Budget disque par défaut du cache de pages rendues
+DEFAULT_RENDER_CACHE_BYTES = 512 * 1024 * 1024
+# Budget disque par défaut des miniatures
+DEFAULT_THUMBNAIL_CACHE_BYTES = 64 * 1024 * 1024
+
+# Dimensions d'une page en points PDF : (x0, y0, x1, y1), comme page.rect
+PageRect = Tuple[float, float, float, float]
+
+
+class RenderCache:
+    """
+    Cache disque des pages PDF rendues, indexé par `file_hash`
+
+    Chaque page est stockée sous `<racine>/<ab>/<hash>_<page>_<zoom%>.webp`
+    (WebP, ou PNG si Pillow est compilé sans WebP), avec à côté le nombre de
+    pages du document et les dimensions des pages déjà mesurées : rouvrir un
+    PDF déjà affiché ne sollicite plus PyMuPDF.
+    La taille totale (pages et fichiers `.pages`) est bornée ; au-delà, les
+    fichiers les moins récemment lus sont supprimés. Utilisable depuis
+    plusieurs threads.
+    """
+
+    # Qualité WebP : le texte reste net, une page de scan pèse quelques centaines de Ko
+    WEBP_QUALITY = 90
+    # Fichier du nombre de pages d'un document (et des dimensions des pages)
+    COUNT_EXTENSION = ".pages"
+
+    def __init__(self, root_dir: str = ".render_cache", max_bytes: int = DEFAULT_RENDER_CACHE_BYTES):
+        self.root_dir = root_dir
+        self.max_bytes = max_bytes
+        self.extension = ".webp" if features.check('webp') else ".png"
+
+        self._lock = threading.Lock()
+        # Chemin -> (taille, dernier accès) ; chargé au premier usage
+        self._index: Optional[Dict[str, Tuple[int, float]]] = None
+        self._bytes = 0
+        # Lecture-modification-écriture des fichiers `.pages` (thread Tk et threads de rendu)
+        self._pages_lock = threading.Lock()
+
+    def configure(self, root_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        """Changer l'emplacement ou le budget (avant la première utilisation de préférence)"""
+        with self._lock:
+            if root_dir is not None and root_dir != self.root_dir:
+                self.root_dir = root_dir
+                self._index = None
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+                if self._index is not None:
+                    self._evict()
+
+    # ==================== PAGES ====================
+
+    def page_path(self, file_hash: str, page_num: int, zoom: float) -> str:
+        return os.path.join(
+            self.root_dir, file_hash[:2],
+            f"{file_hash}_{page_num}_{int(round(zoom * 100))}{self.extension}"
+        )
+
+    def get(self, file_hash: str, page_num: int, zoom: float) -> Optional[Image.Image]:
+        """Image en cache (chargée en mémoire), ou None"""
+        path = self.page_path(file_hash, page_num, zoom)
+        try:
+            with Image.open(path) as img:
+                img.load()
+                result = img.convert("RGB") if img.mode not in ("RGB", "L") else img.copy()
+        except (OSError, ValueError):
+            return None
+        self._touch(path)
+        return result
+
+    def put(self, file_hash: str, page_num: int, zoom: float, img: Image.Image):
+        """Enregistrer une page (écriture atomique par renommage)"""
+        path = self.page_path(file_hash, page_num, zoom)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if self.extension == ".webp":
+                img.save(temp_path, "WEBP", quality=self.WEBP_QUALITY, method=0)
+            else:
+                img.save(temp_path, "PNG", compress_level=1)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"⚠️ Cache de rendu: écriture impossible: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+        self._add(path)
+
+    # ==================== NOMBRE ET DIMENSIONS DES PAGES ====================
+
+    def _count_path(self, file_hash: str) -> str:
+        return os.path.join(self.root_dir, file_hash[:2], f"{file_hash}{self.COUNT_EXTENSION}")
+
+    def _read_pages(self, file_hash: str) -> Tuple[Optional[int], Dict[int, PageRect]]:
+        """
+        Lire le fichier `.pages` : le nombre de pages sur la première ligne,
+        puis une ligne `page x0 y0 x1 y1` par page mesurée
+        """
+        try:
+            with open(self._count_path(file_hash), "r") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return None, {}
+
+        try:
+            count = int(lines[0]) if lines else None
+        except ValueError:
+            count = None
+        rects = {}
+        for line in lines[1:]:
+            try:
+                page_num, x0, y0, x1, y1 = line.split()
+                rects[int(page_num)] = (float(x0), float(y0), float(x1), float(y1))
+            except ValueError:
+                continue
+        return count, rects
+
+    def _write_pages(self, file_hash: str, count: Optional[int], rects: Dict[int, PageRect]):
+        """Réécrire le fichier `.pages` (écriture atomique par renommage)"""
+        path = self._count_path(file_hash)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        lines = ["" if count is None else str(count)]
+        lines += [f"{page_num} {x0!r} {y0!r} {x1!r} {y1!r}" for page_num, (x0, y0, x1, y1) in sorted(rects.items())]
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp_path, "w") as f:
+                f.write("\n".join(lines))
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"⚠️ Cache de rendu: écriture impossible: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+        self._add(path)
+
+    def page_count(self, file_hash: str) -> Optional[int]:
+        """Nombre de pages mémorisé pour un document, ou None"""
+        count, _ = self._read_pages(file_hash)
+        if count is None:
+            return None
+        self._touch(self._count_path(file_hash))
+        return count
+
+    def set_page_count(self, file_hash: str, count: int):
+        with self._pages_lock:
+            _, rects = self._read_pages(file_hash)
+            self._write_pages(file_hash, count, rects)
+
+    def page_rect(self, file_hash: str, page_num: int) -> Optional[PageRect]:
+        """Dimensions mémorisées d'une page (points PDF), ou None"""
+        _, rects = self._read_pages(file_hash)
+        return rects.get(page_num)
+
+    def set_page_rect(self, file_hash: str, page_num: int, rect: PageRect):
+        with self._pages_lock:
+            count, rects = self._read_pages(file_hash)
+            rects[page_num] = tuple(rect)
+            self._write_pages(file_hash, count, rects)
+
+    # ==================== ÉVICTION ====================
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            self._load_index()
+            return {'files': len(self._index), 'bytes': self._bytes, 'max_bytes': self.max_bytes}
+
+    def _load_index(self):
+        """
+        Inventorier le répertoire une seule fois (appelé sous le verrou)
+
+        Appelé au premier accès, éventuellement depuis le thread Tk : un
+        répertoire illisible laisse l'index vide ou partiel, sans lever.
+        """
+        if self._index is not None:
+            return
+        self._index = {}
+        self._bytes = 0
+        try:
+            entries = list(os.scandir(self.root_dir))
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            print(f"⚠️ Cache de rendu: inventaire impossible: {e}")
+            return
+
+        for entry in entries:
+            try:
+                if not entry.is_dir():
+                    continue
+                for item in os.scandir(entry.path):
+                    if item.name.endswith((self.extension, self.COUNT_EXTENSION)) and item.is_file():
+                        stat = item.stat()
+                        self._index[item.path] = (stat.st_size, stat.st_mtime)
+                        self._bytes += stat.st_size
+            except OSError as e:
+                print(f"⚠️ Cache de rendu: dossier ignoré {entry.path}: {e}")
+
+    def _touch(self, path: str):
+        """Marquer un fichier comme lu (la date de modification sert de date d'accès)"""
+        with self._lock:
+            self._load_index()
+            entry = self._index.get(path)
+            if entry is None:
+                return
+            try:
+                os.utime(path)
+                self._index[path] = (entry[0], os.path.getmtime(path))
+            except OSError:
+                pass
+
+    def _add(self, path: str):
+        with self._lock:
+            self._load_index()
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return
+            previous = self._index.get(path)
+            if previous is not None:
+                self._bytes -= previous[0]
+            self._index[path] = (stat.st_size, stat.st_mtime)
+            self._bytes += stat.st_size
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Supprimer les fichiers les moins récemment lus jusqu'à 90 % du budget (sous le verrou)"""
+        target = int(self.max_bytes * 0.9)
+        for path, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if self._bytes <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            del self._index[path]
+            self._bytes -= size
+
+
+# Cache partagé par le viewer et la prévisualisation
+shared_render_cache = RenderCache()
+
+# Miniatures de la barre latérale du viewer : budget à part, pour qu'elles
+# ne soient pas évincées par les pages en pleine résolution
+shared_thumbnail_cache = RenderCache(".thumbnail_cache", DEFAULT_THUMBNAIL_CACHE_BYTES)
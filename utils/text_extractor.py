@@ -0,0 +1,102 @@
+import os
+
+
+class TextExtractor:
+    """Extraction du texte des documents (PDF, Word, Excel) pour l'index plein texte"""
+
+    # Limite de texte indexé par fichier (caractères)
+    MAX_TEXT_LENGTH = 1_000_000
+
+    # Limites pour les classeurs Excel volumineux
+    MAX_XLSX_SHEETS = 20
+    MAX_XLSX_ROWS = 5000
+
+    def extract(self, filepath: str, strict: bool = False) -> str:
+        """
+        Extraire le texte d'un fichier selon son extension
+
+        Args:
+            filepath: Chemin du fichier
+            strict: Propager les erreurs de lecture (fichier absent, verrouillé,
+                corrompu) au lieu de retourner une chaîne vide, pour que
+                l'appelant puisse réessayer plus tard
+
+        Returns:
+            Texte extrait (chaîne vide si non supporté ou, hors mode strict, en cas d'erreur)
+        """
+        if not filepath or not os.path.exists(filepath):
+            if strict:
+                raise FileNotFoundError(f"Fichier introuvable: {filepath}")
+            return ""
+
+        ext = os.path.splitext(filepath)[1].lower()
+        extractors = {
+            '.pdf': self._extract_pdf,
+            '.docx': self._extract_docx,
+            '.xlsx': self._extract_xlsx,
+        }
+
+        extractor = extractors.get(ext)
+        if extractor is None:
+            return ""
+
+        try:
+            text = extractor(filepath)
+            return text[:self.MAX_TEXT_LENGTH]
+        except ImportError as e:
+            print(f"⚠️ Extraction de texte indisponible pour {ext}: {e}")
+            return ""
+        except Exception as e:
+            if strict:
+                raise
+            print(f"⚠️ Erreur extraction texte {os.path.basename(filepath)}: {e}")
+            return ""
+
+    def _extract_pdf(self, filepath: str) -> str:
+        """Extraire le texte d'un PDF avec PyMuPDF"""
+        import fitz  # PyMuPDF
+
+        parts = []
+        length = 0
+        with fitz.open(filepath) as doc:
+            for page in doc:
+                text = page.get_text("text")
+                parts.append(text)
+                length += len(text)
+                if length >= self.MAX_TEXT_LENGTH:
+                    break
+        return "\n".join(parts)
+
+    def _extract_docx(self, filepath: str) -> str:
+        """Extraire le texte d'un document Word (paragraphes et tableaux)"""
+        from docx import Document
+
+        doc = Document(filepath)
+        parts = [para.text for para in doc.paragraphs if para.text]
+
+        for table in doc.tables:
+            for row in table.rows:
+                for cell in row.cells:
+                    if cell.text:
+                        parts.append(cell.text)
+
+        return "\n".join(parts)
+
+    def _extract_xlsx(self, filepath: str) -> str:
+        """Extraire les valeurs des cellules d'un classeur Excel"""
+        import openpyxl
+
+        wb = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
+        parts = []
+        try:
+            for sheet_name in list(wb.sheetnames)[:self.MAX_XLSX_SHEETS]:
+                sheet = wb[sheet_name]
+                parts.append(sheet_name)
+                for row in sheet.iter_rows(max_row=self.MAX_XLSX_ROWS, values_only=True):
+                    values = [str(value) for value in row if value is not None]
+                    if values:
+                        parts.append(" ".join(values))
+        finally:
+            wb.close()
+
+        return "\n".join(parts)